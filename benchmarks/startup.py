@@ -0,0 +1,59 @@
+"""Measures the cold-start cost of the Bookeo client against a fixed budget.
+
+Usage: python benchmarks/startup.py [--runs N]
+
+Each statement runs in a fresh interpreter, so every import it triggers is
+paid in full. Exits with a non-zero status if a median exceeds its budget.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# Budgets in milliseconds.
+BUDGETS = {
+    # Importing the client must not pull in any API module or dependency.
+    "import bookeo.client": 10.0,
+    # First use of one API module loads only that module and the schemas.
+    "import bookeo.client; bookeo.client.BookeoClient('s', 'a').holds": 400.0,
+}
+
+
+def cold_start_ms(statement: str) -> float:
+    """Runs the statement in a new interpreter and returns its duration in ms."""
+    code = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        f"{statement}\n"
+        "print((time.perf_counter() - start) * 1000)\n"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        env=dict(os.environ, PYTHONPATH=SRC),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(proc.stdout.strip())
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+    for statement, budget in BUDGETS.items():
+        median = statistics.median(cold_start_ms(statement) for _ in range(args.runs))
+        status = "ok" if median <= budget else "OVER BUDGET"
+        print(f"{statement}: {median:.1f} ms (budget {budget:.0f} ms) {status}")
+        failed = failed or median > budget
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
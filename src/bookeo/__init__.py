@@ -0,0 +1,19 @@
+import importlib
+
+# Public names are resolved lazily so that importing the package stays cheap.
+_EXPORTS = {
+    "BookeoClient": "client",
+    "BookeoClientException": "client",
+    "BookeoRequestException": "request",
+}
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        module = importlib.import_module(f".{_EXPORTS[name]}", __name__)
+        return getattr(module, name)
+    if name.startswith("Bookeo"):
+        schemas = importlib.import_module(".schemas", __name__)
+        if hasattr(schemas, name):
+            return getattr(schemas, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,256 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError(
+        "bookeo.analytics requires numpy; install it with `pip install bookeo[analytics]`."
+    ) from e
+
+from .schemas import (
+    BookeoBooking,
+    BookeoPeopleCategory,
+    BookeoResource,
+    BookeoResourceBlock,
+    BookeoSeatBlock,
+    BookeoSlot,
+)
+
+
+@dataclass
+class BookeoOccupancy:
+    """Seat counts per product (rows) per time bucket (columns)."""
+
+    product_ids: list[str]
+    bucket_starts: np.ndarray
+    booked: np.ndarray
+    blocked: np.ndarray
+    available: np.ndarray
+
+    @property
+    def capacity(self) -> np.ndarray:
+        return self.booked + self.blocked + self.available
+
+    @property
+    def utilization(self) -> np.ndarray:
+        """Fraction of seats booked or blocked; NaN where there were no seats."""
+        capacity = self.capacity
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(
+                capacity > 0, (self.booked + self.blocked) / capacity, np.nan
+            )
+
+
+class _Buckets:
+    def __init__(self, start_time: datetime, end_time: datetime, bucket: timedelta):
+        self.origin = start_time.timestamp()
+        self.width = bucket.total_seconds()
+        if self.width <= 0:
+            raise ValueError("bucket must be a positive duration.")
+        self.count = int(np.ceil((end_time.timestamp() - self.origin) / self.width))
+
+    def index(self, epochs: np.ndarray) -> np.ndarray:
+        """Bucket of each epoch, or -1 if it falls outside the window."""
+        idx = np.floor((epochs - self.origin) / self.width).astype(np.int64)
+        idx[(idx < 0) | (idx >= self.count)] = -1
+        return idx
+
+    def starts(self) -> np.ndarray:
+        epochs = self.origin + self.width * np.arange(self.count)
+        return epochs.astype("datetime64[s]")
+
+
+def _product_index(ids: list[Optional[str]], product_ids: list[str]) -> np.ndarray:
+    """Row of each product id, or -1 for products that are not reported."""
+    rows = {pid: i for i, pid in enumerate(product_ids)}
+    return np.fromiter((rows.get(pid, -1) for pid in ids), np.int64, len(ids))
+
+
+def _accumulate(
+    grid: np.ndarray, rows: np.ndarray, buckets: np.ndarray, seats: np.ndarray
+):
+    keep = (rows >= 0) & (buckets >= 0)
+    np.add.at(grid, (rows[keep], buckets[keep]), seats[keep])
+
+
+def seat_occupancy(
+    start_time: datetime,
+    end_time: datetime,
+    bucket: timedelta,
+    slots: Iterable[BookeoSlot] = (),
+    bookings: Iterable[BookeoBooking] = (),
+    seat_blocks: Iterable[BookeoSeatBlock] = (),
+    people_categories: Iterable[BookeoPeopleCategory] = (),
+    product_ids: list[str] = None,
+) -> BookeoOccupancy:
+    """Computes seats booked, blocked and still available per product per bucket.
+
+    Bookings, slots and seat blocks are counted in the bucket containing their
+    start time; canceled bookings are ignored. A booking's seats are the sum
+    over its participant numbers of the count times the category's num_seats
+    (one seat for unknown categories). If product_ids is not given, every
+    product found in the data gets a row, in sorted order.
+    """
+    slots, bookings, seat_blocks = list(slots), list(bookings), list(seat_blocks)
+    bookings = [b for b in bookings if not b.canceled and b.start_time is not None]
+    seat_blocks = [sb for sb in seat_blocks if sb.start_time is not None]
+    if product_ids is None:
+        found = {s.product_id for s in slots}
+        found.update(b.product_id for b in bookings)
+        found.update(sb.product_id for sb in seat_blocks)
+        found.discard(None)
+        product_ids = sorted(found)
+    buckets = _Buckets(start_time, end_time, bucket)
+    shape = (len(product_ids), buckets.count)
+
+    # Seats taken by each booking, from its participant numbers.
+    categories = list(people_categories)
+    category_rows = {c.id: i for i, c in enumerate(categories)}
+    category_seats = np.array([c.num_seats for c in categories] + [1], np.int64)
+    owners, category_idx, counts = [], [], []
+    for i, b in enumerate(bookings):
+        for n in b.participants.numbers:
+            owners.append(i)
+            category_idx.append(category_rows.get(n.people_category_id, -1))
+            counts.append(n.number)
+    booking_seats = np.bincount(
+        np.array(owners, np.int64),
+        weights=np.array(counts, np.int64)
+        * category_seats[np.array(category_idx, np.int64)],
+        minlength=len(bookings),
+    ).astype(np.int64)
+
+    booked = np.zeros(shape, np.int64)
+    _accumulate(
+        booked,
+        _product_index([b.product_id for b in bookings], product_ids),
+        buckets.index(np.array([b.start_time.timestamp() for b in bookings])),
+        booking_seats,
+    )
+    blocked = np.zeros(shape, np.int64)
+    _accumulate(
+        blocked,
+        _product_index([sb.product_id for sb in seat_blocks], product_ids),
+        buckets.index(np.array([sb.start_time.timestamp() for sb in seat_blocks])),
+        np.array([sb.num_seats for sb in seat_blocks], np.int64),
+    )
+    available = np.zeros(shape, np.int64)
+    _accumulate(
+        available,
+        _product_index([s.product_id for s in slots], product_ids),
+        buckets.index(np.array([s.start_time.timestamp() for s in slots])),
+        np.array([s.num_seats_available for s in slots], np.int64),
+    )
+    return BookeoOccupancy(product_ids, buckets.starts(), booked, blocked, available)
+
+
+@dataclass
+class BookeoUtilization:
+    """Seconds each resource (rows) was busy, blocked or idle per time bucket (columns).
+
+    Busy time is covered by at least one booking, blocked time by a resource
+    block but no booking, and idle time by neither.
+    """
+
+    resource_ids: list[str]
+    bucket_starts: np.ndarray
+    busy: np.ndarray
+    blocked: np.ndarray
+    idle: np.ndarray
+
+    @property
+    def utilization(self) -> np.ndarray:
+        """Fraction of the time that was not blocked during which it was busy."""
+        open_time = self.busy + self.idle
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(open_time > 0, self.busy / open_time, np.nan)
+
+
+def _union(rows: np.ndarray, starts: np.ndarray, ends: np.ndarray, offset: float):
+    """Merges intervals per row into sorted disjoint segments on one shifted axis.
+
+    Each row's times are shifted by row * offset, so that the segments of
+    every row can be searched at once.
+    """
+    starts = starts + rows * offset
+    ends = ends + rows * offset
+    if not len(starts):
+        return starts, ends
+    order = np.argsort(starts, kind="stable")
+    starts, ends = starts[order], ends[order]
+    reach = np.maximum.accumulate(ends)
+    # A segment begins where an interval starts after everything before it.
+    first = np.flatnonzero(np.r_[True, starts[1:] > reach[:-1]])
+    return starts[first], np.maximum.reduceat(reach, first)
+
+
+def _covered(seg_starts: np.ndarray, seg_ends: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Total length of the segments before each time in t."""
+    lengths = np.r_[0.0, np.cumsum(seg_ends - seg_starts)]
+    k = np.searchsorted(seg_starts, t, side="right")
+    inside = np.zeros_like(t)
+    has = k > 0
+    last = k[has] - 1
+    inside[has] = np.minimum(t[has], seg_ends[last]) - seg_starts[last]
+    return lengths[np.maximum(k - 1, 0)] * has + inside
+
+
+def resource_utilization(
+    start_time: datetime,
+    end_time: datetime,
+    bucket: timedelta,
+    resources: Iterable[BookeoResource] = (),
+    resource_blocks: Iterable[BookeoResourceBlock] = (),
+    bookings: Iterable[BookeoBooking] = (),
+) -> BookeoUtilization:
+    """Computes busy, blocked and idle seconds per resource per bucket.
+
+    resources (such as the /settings/resources list) gives the rows, in
+    order; resources only found in blocks or bookings are added after them.
+    Canceled bookings are ignored, and overlapping bookings or blocks are
+    only counted once.
+    """
+    resource_ids = list(dict.fromkeys(r.id for r in resources))
+    rows = {rid: i for i, rid in enumerate(resource_ids)}
+    origin = start_time.timestamp()
+    span = end_time.timestamp() - origin
+
+    def intervals(items, kind):
+        row_idx, starts, ends = [], [], []
+        for item in items:
+            if kind == "booking" and (item.canceled or item.start_time is None):
+                continue
+            start = item.start_time.timestamp() - origin
+            end = (item.end_time or item.start_time).timestamp() - origin
+            for resource in item.resources or ():
+                row = rows.setdefault(resource.id, len(rows))
+                row_idx.append(row)
+                starts.append(start)
+                ends.append(end)
+        return (
+            np.array(row_idx, np.int64),
+            np.clip(np.array(starts, np.float64), 0, span),
+            np.clip(np.array(ends, np.float64), 0, span),
+        )
+
+    booked = intervals(bookings, "booking")
+    blocked = intervals(resource_blocks, "block")
+    resource_ids = list(rows)
+    buckets = _Buckets(start_time, end_time, bucket)
+    # Bucket edges of every row on the shifted axis.
+    edges = np.minimum(buckets.width * np.arange(buckets.count + 1), span)
+    offset = span + 1
+    grid = edges[None, :] + offset * np.arange(len(resource_ids))[:, None]
+
+    def per_bucket(*parts):
+        rows_, starts, ends = (np.concatenate(p) for p in zip(*parts))
+        seg_starts, seg_ends = _union(rows_, starts, ends, offset)
+        covered = _covered(seg_starts, seg_ends, grid.ravel()).reshape(grid.shape)
+        return np.diff(covered, axis=1)
+
+    busy = per_bucket(booked)
+    blocked_only = per_bucket(booked, blocked) - busy
+    idle = np.diff(grid, axis=1) - busy - blocked_only
+    return BookeoUtilization(resource_ids, buckets.starts(), busy, blocked_only, idle)
@@ -1,17 +1,45 @@
+import heapq
+from dataclasses import dataclass, field
 from datetime import datetime
+from itertools import groupby
 
-from .core import BookeoAPI, dt_to_bookeo_timestamp
+from .core import (
+    BookeoAPI,
+    BookeoBatchResult,
+    dt_to_bookeo_timestamp,
+    paginate,
+    run_concurrently,
+)
 from .request import BookeoRequestException
 from .schemas import (
     BookeoBookingOption,
     BookeoMatchingSlot,
     BookeoPagination,
     BookeoPeopleNumber,
-    BookeoProduct,
     BookeoResource,
+    BookeoSlot,
 )
 
 
+@dataclass
+class BookeoTimelineEntry:
+    """Slots of several products that share the same start and end times."""
+
+    start_time: datetime
+    end_time: datetime
+    # Product id -> its slots at these times; a product may have several,
+    # e.g. for different events or resources.
+    slots: dict[str, list[BookeoSlot]] = field(default_factory=dict)
+
+    @property
+    def seats(self) -> dict[str, int]:
+        """Number of seats available over all of a product's slots, by product id."""
+        return {
+            pid: sum(s.num_seats_available for s in slots)
+            for pid, slots in self.slots.items()
+        }
+
+
 class BookeoAvailability(BookeoAPI):
 
     def product_availability_info(
@@ -23,8 +51,23 @@ class BookeoAvailability(BookeoAPI):
         nav_token: str = None,
         page_number: int = None,
         mode: str = None,
-    ) -> tuple[list[BookeoProduct], BookeoPagination]:
+    ) -> tuple[list[BookeoSlot], BookeoPagination]:
         """Performs a basic search to find available slots and number of seats in each."""
+        cache = self.client.availability_cache
+        key = None
+        if cache is not None and nav_token is None:
+            key = (
+                "slots",
+                product_id,
+                start_time,
+                end_time,
+                items_per_page,
+                page_number,
+                mode,
+            )
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
         resp = self._request(
             "/availability/slots",
             params={
@@ -42,10 +85,60 @@ class BookeoAvailability(BookeoAPI):
                 f"Could not get product availability information.", resp.request.url
             )
         data = resp.json()
-        blocks = [BookeoProduct(**p) for p in data["data"]]
+        slots = [BookeoSlot(**s) for s in data["data"]]
         info = data["info"]
         pager = BookeoPagination(**info)
-        return (blocks, pager)
+        if key is not None:
+            cache.put(key, (slots, pager), product_id, start_time, end_time)
+        return (slots, pager)
+
+    def multi_product_availability(
+        self,
+        product_ids: list[str],
+        start_time: datetime,
+        end_time: datetime,
+        mode: str = None,
+        max_workers: int = 8,
+    ) -> tuple[list[BookeoTimelineEntry], list[BookeoBatchResult]]:
+        """Gets the availability of many products concurrently as one merged timeline.
+
+        Each product's slots are fetched (following pagination) on a thread
+        pool, subject to the client's rate limiter if it has one, and merged
+        into entries ordered by start time. A product whose slots cannot be
+        fetched is left out of the timeline; returns the timeline and a
+        BookeoBatchResult, with the product id as item, for each such
+        product.
+        """
+
+        def fetch(product_id: str) -> list[tuple[str, BookeoSlot]]:
+            slots = paginate(
+                self.product_availability_info,
+                product_id=product_id,
+                start_time=start_time,
+                end_time=end_time,
+                mode=mode,
+            )
+            key = lambda s: (s.start_time, s.end_time)
+            return [(product_id, s) for s in sorted(slots, key=key)]
+
+        per_product, failures = [], []
+        for i, (product_id, slots, error) in enumerate(
+            run_concurrently(fetch, dict.fromkeys(product_ids), max_workers)
+        ):
+            if error is not None:
+                failures.append(BookeoBatchResult(i, product_id, error=error))
+            else:
+                per_product.append(slots)
+
+        timeline = []
+        times = lambda pair: (pair[1].start_time, pair[1].end_time)
+        merged = heapq.merge(*per_product, key=times)
+        for (start, end), pairs in groupby(merged, key=times):
+            entry = BookeoTimelineEntry(start, end)
+            for product_id, slot in pairs:
+                entry.slots.setdefault(product_id, []).append(slot)
+            timeline.append(entry)
+        return (timeline, failures)
 
     def search_open_slots(
         self,
@@ -75,9 +168,9 @@ class BookeoAvailability(BookeoAPI):
                 "productId": product_id,
                 "startTime": dt_to_bookeo_timestamp(start_time),
                 "endTime": dt_to_bookeo_timestamp(end_time),
-                "peopleNumbers": [p.model_dump() for p in people_numbers],
-                "options": [o.model_dump() for o in options],
-                "resources": [r.model_dump() for r in resources],
+                "peopleNumbers": people_numbers,
+                "options": options,
+                "resources": resources,
             },
             method="POST",
         )
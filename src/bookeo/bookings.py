@@ -1,6 +1,12 @@
 from datetime import datetime
+from typing import Any, Iterable, Iterator
 
-from .core import BookeoAPI, dt_to_bookeo_timestamp
+from .core import (
+    BookeoAPI,
+    BookeoBatchResult,
+    dt_to_bookeo_timestamp,
+    run_concurrently,
+)
 from .request import BookeoRequestException
 from .schemas import (
     BookeoBooking,
@@ -65,18 +71,18 @@ class BookeoBookings(BookeoAPI):
                 "startTime": dt_to_bookeo_timestamp(start_time),
                 "endTime": dt_to_bookeo_timestamp(end_time),
                 "customerId": customer_id,
-                "customer": customer.model_dump(),
+                "customer": customer,
                 "externalRef": external_ref,
-                "participants": [p.model_dump() for p in participants],
-                "resources": [r.model_dump() for r in resources],
+                "participants": participants,
+                "resources": resources,
                 "sourceIp": source_ip,
                 "productId": product_id,
                 "options": options,
                 "privateEvent": private_event,
-                "priceAdjustments": [pa.model_dump() for pa in price_adjustments],
+                "priceAdjustments": price_adjustments,
                 "promotionCodeInput": promotion_code_input,
                 "giftVoucherCodeInput": gift_voucher_code_input,
-                "initialPayments": [ip.model_dump() for ip in initial_payments],
+                "initialPayments": initial_payments,
                 "source": source,
             },
             method="POST",
@@ -85,10 +91,38 @@ class BookeoBookings(BookeoAPI):
             raise BookeoRequestException(
                 f"Could not create booking for product with id {product_id}.",
                 resp.request.url,
+                resp.status_code,
             )
         location = resp.headers["Location"]
         data = resp.json()
-        return (location, BookeoBooking(**data))
+        booking = BookeoBooking(**data)
+        self._availability_changed(
+            product_id,
+            booking.start_time or start_time,
+            booking.end_time or end_time,
+            item_id=booking.booking_number,
+            previous_item_id=previous_hold_id,
+        )
+        return (location, booking)
+
+    def create_bookings(
+        self, bookings: Iterable[dict[str, Any]], max_workers: int = 8
+    ) -> Iterator[BookeoBatchResult]:
+        """Creates many bookings concurrently, yielding one result per booking in order.
+
+        Each item holds the keyword arguments of create_booking. A failed
+        booking is reported through the error of its result and does not stop
+        the rest of the batch. Requests are subject to the client's rate limiter.
+        """
+
+        def create(indexed: tuple[int, dict[str, Any]]) -> tuple[str, BookeoBooking]:
+            return self.create_booking(**indexed[1])
+
+        for (i, spec), created, error in run_concurrently(
+            create, enumerate(bookings), max_workers
+        ):
+            location, booking = created if error is None else (None, None)
+            yield BookeoBatchResult(i, spec, location, booking, error)
 
     def get_bookings(
         self,
@@ -145,7 +179,7 @@ class BookeoBookings(BookeoAPI):
         )
         if resp.status_code != 200:
             raise BookeoRequestException(
-                f"Could not get booking with id {id}.", resp.request.url
+                f"Could not get booking with id {booking_number}.", resp.request.url
             )
         data = resp.json()
         return BookeoBooking(**data)
@@ -196,18 +230,18 @@ class BookeoBookings(BookeoAPI):
                 "startTime": dt_to_bookeo_timestamp(start_time),
                 "endTime": dt_to_bookeo_timestamp(end_time),
                 "customerId": customer_id,
-                "customer": customer.model_dump(),
+                "customer": customer,
                 "externalRef": external_ref,
-                "participants": [p.model_dump() for p in participants],
-                "resources": [r.model_dump() for r in resources],
+                "participants": participants,
+                "resources": resources,
                 "sourceIp": source_ip,
                 "productId": product_id,
-                "options": [o.model_dump() for o in options],
+                "options": options,
                 "privateEvent": private_event,
-                "priceAdjustments": [pa.model_dump() for pa in price_adjustments],
+                "priceAdjustments": price_adjustments,
                 "promotionCodeInput": promotion_code_input,
                 "giftVoucherCodeInput": gift_voucher_code_input,
-                "initialPayments": [ip.model_dump() for ip in initial_payments],
+                "initialPayments": initial_payments,
                 "source": source,
             },
             method="PUT",
@@ -218,7 +252,15 @@ class BookeoBookings(BookeoAPI):
             )
         location = resp.headers["Location"]
         data = resp.json()
-        return (location, BookeoBooking(**data))
+        booking = BookeoBooking(**data)
+        self._availability_changed(
+            product_id,
+            booking.start_time or start_time,
+            booking.end_time or end_time,
+            item_id=booking_number,
+            previous_item_id=booking_number,
+        )
+        return (location, booking)
 
     def cancel_booking(
         self,
@@ -246,8 +288,9 @@ class BookeoBookings(BookeoAPI):
         )
         if resp.status_code != 204:
             raise BookeoRequestException(
-                f"Could not delete booking with id {id}.", resp.request.url
+                f"Could not delete booking with id {booking_number}.", resp.request.url
             )
+        self._availability_removed(booking_number)
         return
 
     def add_booking_payment(
@@ -259,7 +302,7 @@ class BookeoBookings(BookeoAPI):
             raise TypeError("payment cannot be None.")
         resp = self._request(
             f"/bookings/{booking_number}/payments",
-            data=payment.model_dump(),
+            data=payment,
             method="POST",
         )
         if resp.status_code != 201:
@@ -0,0 +1,362 @@
+import json
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from .bookings import BookeoBookings
+from .core import BookeoBatchResult, paginate, paginate_windows, run_concurrently
+from .ratelimit import BookeoRateLimiter
+from .schemas import BookeoBooking, BookeoSeatBlock
+
+if TYPE_CHECKING:
+    from .client import BookeoClient
+
+Progress = Callable[[int, int, BookeoBatchResult], None]
+
+
+class BookeoBulkBookingJob:
+    """Cancels or updates every booking matching a filter, in parallel.
+
+    If state_path is given, the selected bookings are saved there and the
+    outcome of each operation is appended to a progress log next to it, so
+    that an interrupted job picks up where it stopped when it is created
+    again with the same path: bookings already processed are skipped and
+    failed ones are retried.
+    """
+
+    def __init__(self, bookings: BookeoBookings, state_path: str = None):
+        self._api = bookings
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self.bookings: dict[str, BookeoBooking] = {}
+        self.done: set[str] = set()
+        self.errors: dict[str, str] = {}
+        if state_path is not None and os.path.exists(state_path):
+            self._load()
+
+    @property
+    def _progress_path(self) -> str:
+        return f"{self.state_path}.progress"
+
+    def _load(self):
+        with open(self.state_path) as f:
+            state = json.load(f)
+        self.bookings = {n: BookeoBooking(**b) for n, b in state["bookings"].items()}
+        if not os.path.exists(self._progress_path):
+            return
+        with open(self._progress_path) as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # Partially written when the job was interrupted.
+                self._record(**json.loads(line))
+
+    def _save_selection(self):
+        if self.state_path is None:
+            return
+        state = {
+            "bookings": {
+                n: b.model_dump(mode="json", by_alias=True, exclude_none=True)
+                for n, b in self.bookings.items()
+            }
+        }
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+        if os.path.exists(self._progress_path):
+            os.remove(self._progress_path)
+
+    def _record(self, booking_number: str, error: str = None):
+        if error is None:
+            self.done.add(booking_number)
+            self.errors.pop(booking_number, None)
+        else:
+            self.errors[booking_number] = error
+
+    def _save_outcome(self, booking_number: str, error: str = None):
+        if self.state_path is None:
+            return
+        line = json.dumps({"booking_number": booking_number, "error": error})
+        with open(self._progress_path, "a") as f:
+            f.write(line + "\n")
+
+    def select(self, **filters) -> list[BookeoBooking]:
+        """Selects the bookings to process, replacing any previous selection.
+
+        filters are keyword arguments of BookeoBookings.get_bookings; every
+        page of results is read.
+        """
+        filters.pop("nav_token", None)
+        filters.pop("page_number", None)
+        with self._lock:
+            self.bookings = {
+                b.booking_number: b for b in paginate(self._api.get_bookings, **filters)
+            }
+            self.done = set()
+            self.errors = {}
+            self._save_selection()
+            return list(self.bookings.values())
+
+    def pending(self) -> list[BookeoBooking]:
+        """Selected bookings that have not been processed successfully yet."""
+        return [b for n, b in self.bookings.items() if n not in self.done]
+
+    def cancel(
+        self,
+        dry_run: bool = False,
+        max_workers: int = 4,
+        progress: Progress = None,
+        limiter: BookeoRateLimiter = None,
+        **cancel_args,
+    ) -> list[BookeoBatchResult]:
+        """Cancels every pending booking.
+
+        cancel_args are passed on to BookeoBookings.cancel_booking. With
+        dry_run, nothing is sent and each result's value holds the arguments
+        that would have been used.
+        """
+        return self._run(
+            lambda b: dict(cancel_args),
+            self._api.cancel_booking,
+            dry_run,
+            max_workers,
+            progress,
+            limiter,
+        )
+
+    def update(
+        self,
+        changes: Callable[[BookeoBooking], dict[str, Any]],
+        dry_run: bool = False,
+        max_workers: int = 4,
+        progress: Progress = None,
+        limiter: BookeoRateLimiter = None,
+    ) -> list[BookeoBatchResult]:
+        """Updates every pending booking.
+
+        changes returns the keyword arguments of BookeoBookings.update_booking
+        (other than booking_number) for a booking. With dry_run, nothing is
+        sent and each result's value holds those arguments.
+        """
+        return self._run(
+            changes, self._api.update_booking, dry_run, max_workers, progress, limiter
+        )
+
+    def _run(
+        self,
+        arguments: Callable[[BookeoBooking], dict[str, Any]],
+        operation: Callable[..., Any],
+        dry_run: bool,
+        max_workers: int,
+        progress: Optional[Progress],
+        limiter: Optional[BookeoRateLimiter],
+    ) -> list[BookeoBatchResult]:
+        pending = self.pending()
+        if dry_run:
+            return [
+                BookeoBatchResult(i, b, value=arguments(b))
+                for i, b in enumerate(pending)
+            ]
+
+        def apply(booking: BookeoBooking) -> Any:
+            kwargs = arguments(booking)
+            if limiter is None:
+                return operation(booking.booking_number, **kwargs)
+            with limiter:
+                return operation(booking.booking_number, **kwargs)
+
+        results = []
+        for i, (booking, value, error) in enumerate(
+            run_concurrently(apply, pending, max_workers)
+        ):
+            location = None
+            if isinstance(value, tuple):
+                location, value = value
+            result = BookeoBatchResult(i, booking, location, value, error)
+            message = None if error is None else str(error)
+            with self._lock:
+                self._record(booking.booking_number, message)
+                self._save_outcome(booking.booking_number, message)
+            results.append(result)
+            if progress is not None:
+                progress(i + 1, len(pending), result)
+        return results
+
+
+@dataclass
+class BookeoSeatBlockResult(BookeoBatchResult):
+    # "create", "update", "delete" or "skip"
+    action: str = None
+
+
+class BookeoBulkSeatBlocks:
+    """Creates, updates or deletes the seat blocks of many events at once.
+
+    Every call covers a period, which bounds the searches: the events are
+    the product's slots in it, or given by id. Existing blocks are read
+    once with get_seat_blocks, a 31-day window at a time, events that
+    already have an equivalent block are skipped, and the remaining
+    requests run concurrently.
+    """
+
+    def __init__(self, client: "BookeoClient", max_workers: int = 8):
+        self.client = client
+        self.max_workers = max_workers
+
+    @staticmethod
+    def _check_window(start_time: datetime, end_time: datetime):
+        if start_time is None:
+            raise TypeError("start_time cannot be None.")
+        if end_time is None:
+            raise TypeError("end_time cannot be None.")
+
+    def _events(
+        self,
+        product_id: str,
+        event_ids: Optional[list[str]],
+        start_time: datetime,
+        end_time: datetime,
+        mode: Optional[str],
+    ) -> list[str]:
+        if event_ids is not None:
+            return list(dict.fromkeys(event_ids))
+        slots = paginate_windows(
+            self.client.availability.product_availability_info,
+            start_time,
+            end_time,
+            product_id=product_id,
+            mode=mode,
+        )
+        return list(dict.fromkeys(s.event_id for s in slots))
+
+    def _existing(
+        self,
+        product_id: str,
+        start_time: datetime,
+        end_time: datetime,
+        reason: Optional[str],
+    ) -> dict[str, list[BookeoSeatBlock]]:
+        """Existing blocks of the product by event id, only those with reason if given."""
+        blocks = {}
+        for block in paginate_windows(
+            self.client.seatblocks.get_seat_blocks,
+            start_time,
+            end_time,
+            product_id=product_id,
+            items_per_page=100,
+        ):
+            if reason is None or block.reason == reason:
+                blocks.setdefault(block.event_id, []).append(block)
+        return blocks
+
+    def _run(
+        self, plan: list[tuple[str, str, Optional[BookeoSeatBlock]]], apply
+    ) -> list[BookeoSeatBlockResult]:
+        results = []
+        for i, ((event_id, action, block), value, error) in enumerate(
+            run_concurrently(apply, plan, self.max_workers)
+        ):
+            location = None
+            if isinstance(value, tuple):
+                location, value = value
+            results.append(
+                BookeoSeatBlockResult(i, event_id, location, value, error, action)
+            )
+        return results
+
+    def apply(
+        self,
+        product_id: str,
+        num_seats: int,
+        reason: str = None,
+        event_ids: list[str] = None,
+        start_time: datetime = None,
+        end_time: datetime = None,
+        mode: str = None,
+        dry_run: bool = False,
+    ) -> list[BookeoSeatBlockResult]:
+        """Makes every event block num_seats seats, with one result per event.
+
+        Events are event_ids, or every slot of the product between start_time
+        and end_time (mode is passed to product_availability_info); existing
+        blocks are looked up between start_time and end_time either way. An
+        event whose block (with the same reason, if given) already has
+        num_seats is skipped, one with a different number is updated, and the
+        others get a new block. Blocked seats add up, so when an event has
+        several matching blocks, the extra ones are deleted, with one more
+        result each. With dry_run, nothing is sent.
+        """
+        if product_id is None:
+            raise TypeError("product_id cannot be None.")
+        if num_seats is None:
+            raise TypeError("num_seats cannot be None.")
+        self._check_window(start_time, end_time)
+        events = self._events(product_id, event_ids, start_time, end_time, mode)
+        existing = self._existing(product_id, start_time, end_time, reason)
+        plan = []
+        for event_id in events:
+            block, *extra = existing.get(event_id) or [None]
+            if block is None:
+                plan.append((event_id, "create", None))
+            elif block.num_seats != num_seats:
+                plan.append((event_id, "update", block))
+            else:
+                plan.append((event_id, "skip", block))
+            plan.extend((event_id, "delete", b) for b in extra)
+
+        def apply(step: tuple[str, str, Optional[BookeoSeatBlock]]) -> Any:
+            event_id, action, block = step
+            if action == "skip" or dry_run:
+                return block
+            if action == "create":
+                return self.client.seatblocks.create_seat_block(
+                    event_id, product_id, num_seats, reason
+                )
+            if action == "delete":
+                self.client.seatblocks.delete_seat_block(block.id)
+                return block
+            return self.client.seatblocks.update_seat_block(
+                block.id, event_id, product_id, num_seats, reason
+            )
+
+        return self._run(plan, apply)
+
+    def remove(
+        self,
+        product_id: str,
+        reason: str = None,
+        event_ids: list[str] = None,
+        start_time: datetime = None,
+        end_time: datetime = None,
+        dry_run: bool = False,
+    ) -> list[BookeoSeatBlockResult]:
+        """Deletes the blocks of the product's events (with reason, if given).
+
+        Blocks are looked up between start_time and end_time, and only those
+        of event_ids are deleted if it is given. There is one result per
+        block deleted, and a "skip" result for each event without one. With
+        dry_run, nothing is sent.
+        """
+        if product_id is None:
+            raise TypeError("product_id cannot be None.")
+        self._check_window(start_time, end_time)
+        existing = self._existing(product_id, start_time, end_time, reason)
+        if event_ids is None:
+            event_ids = list(existing)
+        plan = []
+        for event_id in dict.fromkeys(event_ids):
+            blocks = existing.get(event_id)
+            if blocks:
+                plan.extend((event_id, "delete", b) for b in blocks)
+            else:
+                plan.append((event_id, "skip", None))
+
+        def delete(step: tuple[str, str, Optional[BookeoSeatBlock]]) -> Any:
+            _, action, block = step
+            if action == "delete" and not dry_run:
+                self.client.seatblocks.delete_seat_block(block.id)
+            return block
+
+        return self._run(plan, delete)
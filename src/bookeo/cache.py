@@ -0,0 +1,414 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from .core import bookeo_timestamp_to_dt
+from .storage import BookeoSqlite
+
+# Default time-to-live, in seconds, of each kind of cached settings item.
+DEFAULT_SETTINGS_TTLS = {
+    "apikeyinfo": 3600,
+    "business": 3600,
+    "customfields": 900,
+    "languages": 86400,
+    "peoplecategories": 3600,
+    "products": 300,
+    "resources": 900,
+    "taxes": 3600,
+}
+
+
+class _Entry:
+    __slots__ = ("raw", "value", "fetched")
+
+    def __init__(self, raw: Any, value: Any, fetched: float):
+        self.raw = raw
+        self.value = value
+        self.fetched = fetched
+
+
+class _DiskStore:
+    """SQLite-backed store that can be shared by every process on a host."""
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries
+            (key TEXT PRIMARY KEY, value TEXT NOT NULL, fetched REAL NOT NULL);
+        CREATE TABLE IF NOT EXISTS leases
+            (key TEXT PRIMARY KEY, expires REAL NOT NULL);
+    """
+
+    def __init__(self, path: str):
+        self._db = BookeoSqlite(path, self._SCHEMA)
+
+    def load(self, key: str) -> Optional[tuple[Any, float]]:
+        rows = self._db.query(
+            "SELECT value, fetched FROM entries WHERE key = ?", (key,)
+        )
+        if not rows:
+            return None
+        return (json.loads(rows[0][0]), rows[0][1])
+
+    def save(self, key: str, raw: Any, fetched: float):
+        value = json.dumps(raw, separators=(",", ":"))
+        self._db.execute(
+            "INSERT OR REPLACE INTO entries (key, value, fetched) VALUES (?, ?, ?)",
+            (key, value, fetched),
+        )
+
+    def delete(self, prefix: str):
+        self._db.execute(
+            "DELETE FROM entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+        )
+
+    def acquire(self, key: str, duration: float) -> bool:
+        """Takes a host-wide lease on refreshing the key, if nobody else holds one."""
+        now = time.time()
+        with self._db.transaction() as conn:
+            conn.execute("DELETE FROM leases WHERE key = ? AND expires < ?", (key, now))
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO leases (key, expires) VALUES (?, ?)",
+                (key, now + duration),
+            )
+            return cur.rowcount == 1
+
+    def release(self, key: str):
+        self._db.execute("DELETE FROM leases WHERE key = ?", (key,))
+
+
+class BookeoSettingsCache:
+    """Caches settings responses with per-item TTLs.
+
+    Entries younger than their TTL are served directly. Entries that are less
+    than ``stale_ttl`` seconds past their TTL are served while a single
+    background refresh runs; older entries are refreshed before returning.
+    Concurrent misses on the same key share one request. If ``path`` is given,
+    raw responses are also kept in a SQLite database there so that every
+    process on the host shares them, and only one process refreshes a key at
+    a time. At most ``max_entries`` entries are kept in memory, evicting the
+    least recently used.
+    """
+
+    def __init__(
+        self,
+        path: str = None,
+        ttls: dict[str, float] = None,
+        stale_ttl: float = 300,
+        lease_duration: float = 30,
+        max_entries: int = 1024,
+    ):
+        self.ttls = dict(DEFAULT_SETTINGS_TTLS)
+        self.ttls.update(ttls or {})
+        self.stale_ttl = stale_ttl
+        self.lease_duration = lease_duration
+        self.max_entries = max_entries
+        self._disk = _DiskStore(path) if path is not None else None
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _ttl(self, key: str) -> float:
+        # Keys look like "<namespace>/<item>[/<params>]".
+        item = key.split("/")[1] if "/" in key else key
+        return self.ttls.get(item, 0)
+
+    def _store(self, key: str, entry: _Entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _lookup(self, key: str, parse: Callable[[Any], Any]) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if self._disk is None:
+            return entry
+        if entry is not None and time.time() - entry.fetched < self._ttl(key):
+            return entry
+        # Another process may have refreshed the key since we last looked.
+        stored = self._disk.load(key)
+        if stored is not None and (entry is None or stored[1] > entry.fetched):
+            entry = _Entry(stored[0], parse(stored[0]), stored[1])
+            self._store(key, entry)
+        return entry
+
+    def get(
+        self,
+        key: str,
+        fetch: Callable[[], Any],
+        parse: Callable[[Any], Any] = lambda raw: raw,
+        force: bool = False,
+    ) -> Any:
+        """Returns the parsed value for key, fetching the raw JSON data if needed."""
+        entry = None if force else self._lookup(key, parse)
+        if entry is not None:
+            age = time.time() - entry.fetched
+            if age < self._ttl(key):
+                return entry.value
+            if age < self._ttl(key) + self.stale_ttl:
+                self._refresh(key, fetch, parse, background=True)
+                return entry.value
+        return self._refresh(key, fetch, parse).result()
+
+    def invalidate(self, prefix: str = ""):
+        """Drops every entry whose key starts with prefix."""
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+        if self._disk is not None:
+            self._disk.delete(prefix)
+
+    def _refresh(
+        self,
+        key: str,
+        fetch: Callable[[], Any],
+        parse: Callable[[Any], Any],
+        background: bool = False,
+    ) -> Future:
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+            future = self._inflight[key] = Future()
+        if background:
+            threading.Thread(
+                target=self._run_refresh, args=(key, fetch, parse, future), daemon=True
+            ).start()
+        else:
+            self._run_refresh(key, fetch, parse, future)
+        return future
+
+    def _run_refresh(
+        self,
+        key: str,
+        fetch: Callable[[], Any],
+        parse: Callable[[Any], Any],
+        future: Future,
+    ):
+        started = time.time()
+        try:
+            entry = self._fetch_shared(key, fetch, parse, started)
+            self._store(key, entry)
+            future.set_result(entry.value)
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def _fetch_shared(
+        self,
+        key: str,
+        fetch: Callable[[], Any],
+        parse: Callable[[Any], Any],
+        started: float,
+    ) -> _Entry:
+        if self._disk is None:
+            raw = fetch()
+            return _Entry(raw, parse(raw), time.time())
+        deadline = started + self.lease_duration
+        leased = self._disk.acquire(key, self.lease_duration)
+        while not leased and time.time() < deadline:
+            # Another process is refreshing; wait for it to finish.
+            time.sleep(0.05)
+            leased = self._disk.acquire(key, self.lease_duration)
+        try:
+            # Use the result of a refresh that finished while we waited.
+            stored = self._disk.load(key)
+            if stored is not None and stored[1] >= started:
+                return _Entry(stored[0], parse(stored[0]), stored[1])
+            raw = fetch()
+            fetched = time.time()
+            self._disk.save(key, raw, fetched)
+        finally:
+            if leased:
+                self._disk.release(key)
+        return _Entry(raw, parse(raw), fetched)
+
+
+def _overlaps(
+    start_a: Optional[datetime],
+    end_a: Optional[datetime],
+    start_b: Optional[datetime],
+    end_b: Optional[datetime],
+) -> bool:
+    """Whether two time windows overlap. Missing bounds are open-ended."""
+    if start_a is not None and end_b is not None and start_a > end_b:
+        return False
+    if start_b is not None and end_a is not None and start_b > end_a:
+        return False
+    return True
+
+
+class BookeoAvailabilityCache:
+    """Short-lived cache of availability results keyed by product and time window.
+
+    Entries are dropped when they expire, or as soon as a booking, hold, seat
+    block or resource block touching their product and time window changes,
+    either through a client using this cache or as reported by a webhook.
+    """
+
+    def __init__(self, ttl: float = 30, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # key -> (expires, product_id, start_time, end_time, value)
+        self._entries: dict[tuple, tuple] = {}
+        self._by_product: dict[Optional[str], set[tuple]] = {}
+        # Windows of items changed through the client, so that later changes
+        # made by id alone (e.g. deleting a hold) can be invalidated precisely.
+        self._items: OrderedDict[str, tuple] = OrderedDict()
+
+    def get(self, key: tuple) -> Any:
+        """Returns the cached value for key, or None if it is missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[4]
+
+    def put(
+        self,
+        key: tuple,
+        value: Any,
+        product_id: str = None,
+        start_time: datetime = None,
+        end_time: datetime = None,
+    ):
+        with self._lock:
+            self._discard(key)
+            if len(self._entries) >= self.max_entries:
+                self._discard(next(iter(self._entries)))
+            expires = time.monotonic() + self.ttl
+            self._entries[key] = (expires, product_id, start_time, end_time, value)
+            self._by_product.setdefault(product_id, set()).add(key)
+
+    def _discard(self, key: tuple):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._by_product[entry[1]].discard(key)
+
+    def invalidate(
+        self,
+        product_id: str = None,
+        start_time: datetime = None,
+        end_time: datetime = None,
+    ):
+        """Drops entries for the product (or every product) overlapping the window."""
+        with self._lock:
+            if product_id is None:
+                products = list(self._by_product)
+            else:
+                products = [product_id, None]
+            for product in products:
+                for key in list(self._by_product.get(product, ())):
+                    _, _, entry_start, entry_end, _ = self._entries[key]
+                    if _overlaps(entry_start, entry_end, start_time, end_time):
+                        self._discard(key)
+
+    def track(
+        self,
+        item_id: str,
+        product_id: str = None,
+        start_time: datetime = None,
+        end_time: datetime = None,
+    ):
+        """Remembers the product and window of a booking, hold or block by id."""
+        if item_id is None:
+            return
+        with self._lock:
+            self._items[item_id] = (product_id, start_time, end_time)
+            self._items.move_to_end(item_id)
+            if len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def invalidate_item(self, item_id: str, product_id: str = None):
+        """Invalidates the window of a tracked item and forgets it.
+
+        For unknown items every window of product_id is invalidated, or every
+        entry if product_id is None as well.
+        """
+        with self._lock:
+            window = self._items.pop(item_id, None)
+        if window is None:
+            self.invalidate(product_id)
+        else:
+            self.invalidate(*window)
+
+    def handle_webhook(self, payload: dict):
+        """Invalidates availability affected by a Bookeo webhook notification.
+
+        payload is the decoded JSON body of the notification, with the
+        "domain", "type", "itemId" and (for creations and updates) "item" keys.
+        """
+        domain = payload.get("domain")
+        if domain not in ("bookings", "seatblocks", "resourceblocks"):
+            return
+        item_id = payload.get("itemId")
+        item = payload.get("item")
+        if not item:
+            self.invalidate_item(item_id)
+            return
+        product_id = item.get("productId")
+        start_time = bookeo_timestamp_to_dt(item.get("startTime"))
+        end_time = bookeo_timestamp_to_dt(item.get("endTime")) or start_time
+        if payload.get("type") == "updated":
+            # The item may have moved, so its old window is stale as well.
+            self.invalidate_item(item_id, product_id)
+        self.invalidate(product_id, start_time, end_time)
+        self.track(item_id, product_id, start_time, end_time)
+
+
+class BookeoLRUCache:
+    """Thread-safe mapping that evicts its least recently used entries.
+
+    Entries optionally expire ``ttl`` seconds after they were stored.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # key -> (stored, value)
+        self._entries: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if self.ttl is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Any, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Any, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __contains__(self, key: Any) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_MISSING = object()
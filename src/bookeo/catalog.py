@@ -0,0 +1,118 @@
+import threading
+from datetime import timedelta
+from typing import Iterator, Optional
+
+from .schemas import BookeoBookingLimit, BookeoProduct, BookeoProductType
+from .settings import BookeoSettings
+
+
+def _people_category_ids(product: BookeoProduct) -> set[str]:
+    ids = {l.people_category_id for l in product.booking_limits}
+    ids.update(r.people_category_id for r in product.default_rates or [])
+    ids.discard(None)
+    return ids
+
+
+class ProductCatalog:
+    """In-memory index of every product in the account.
+
+    Lookups by id, code, type and people category are dictionary reads.
+    Durations and booking limits are precomputed when a product is indexed.
+    """
+
+    def __init__(self, settings: BookeoSettings, lang: str = None):
+        self._settings = settings
+        self._lang = lang
+        self._lock = threading.RLock()
+        self._products: dict[str, BookeoProduct] = {}
+        self._by_code: dict[str, BookeoProduct] = {}
+        self._by_type: dict[BookeoProductType, dict[str, BookeoProduct]] = {}
+        self._by_category: dict[str, dict[str, BookeoProduct]] = {}
+        self._durations: dict[str, timedelta] = {}
+        self._limits: dict[tuple[str, Optional[str]], BookeoBookingLimit] = {}
+        self.refresh()
+
+    def refresh(self, use_cached: bool = True) -> set[str]:
+        """Reloads every page of products and reindexes only those that changed.
+
+        Returns the ids of products that were added, updated or removed.
+        """
+        fetched = {
+            p.product_id: p
+            for p in self._settings.all_products(lang=self._lang, use_cached=use_cached)
+        }
+        with self._lock:
+            changed = set()
+            for product_id in self._products.keys() - fetched.keys():
+                self._remove(product_id)
+                changed.add(product_id)
+            for product_id, product in fetched.items():
+                current = self._products.get(product_id)
+                if current == product:
+                    continue
+                if current is not None:
+                    self._remove(product_id)
+                self._add(product)
+                changed.add(product_id)
+            return changed
+
+    def _add(self, product: BookeoProduct):
+        product_id = product.product_id
+        self._products[product_id] = product
+        self._by_code[product.product_code] = product
+        self._by_type.setdefault(product.type, {})[product_id] = product
+        for category_id in _people_category_ids(product):
+            self._by_category.setdefault(category_id, {})[product_id] = product
+        self._durations[product_id] = product.duration.to_timedelta()
+        for limit in product.booking_limits:
+            self._limits[(product_id, limit.people_category_id)] = limit
+
+    def _remove(self, product_id: str):
+        product = self._products.pop(product_id)
+        if self._by_code.get(product.product_code) is product:
+            del self._by_code[product.product_code]
+        self._by_type[product.type].pop(product_id, None)
+        for category_id in _people_category_ids(product):
+            self._by_category[category_id].pop(product_id, None)
+        del self._durations[product_id]
+        for limit in product.booking_limits:
+            self._limits.pop((product_id, limit.people_category_id), None)
+
+    def get(self, product_id: str) -> Optional[BookeoProduct]:
+        return self._products.get(product_id)
+
+    def get_by_code(self, product_code: str) -> Optional[BookeoProduct]:
+        return self._by_code.get(product_code)
+
+    def get_by_type(self, product_type: BookeoProductType) -> list[BookeoProduct]:
+        with self._lock:
+            return list(self._by_type.get(product_type, {}).values())
+
+    def get_by_people_category(self, people_category_id: str) -> list[BookeoProduct]:
+        with self._lock:
+            return list(self._by_category.get(people_category_id, {}).values())
+
+    def duration(self, product_id: str) -> Optional[timedelta]:
+        return self._durations.get(product_id)
+
+    def booking_limit(
+        self, product_id: str, people_category_id: str = None
+    ) -> Optional[BookeoBookingLimit]:
+        """Returns the booking limit for a people category of a product.
+
+        Falls back to the product-wide limit (one without a people category).
+        """
+        limit = self._limits.get((product_id, people_category_id))
+        if limit is None and people_category_id is not None:
+            limit = self._limits.get((product_id, None))
+        return limit
+
+    def __contains__(self, product_id: str) -> bool:
+        return product_id in self._products
+
+    def __iter__(self) -> Iterator[BookeoProduct]:
+        with self._lock:
+            return iter(list(self._products.values()))
+
+    def __len__(self) -> int:
+        return len(self._products)
@@ -0,0 +1,309 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Optional
+
+from .core import BookeoBatchResult, run_concurrently
+from .encoding import BookeoFragment
+from .metrics import BookeoLatencyHistogram
+from .schemas import (
+    BookeoBooking,
+    BookeoBookingOption,
+    BookeoCustomer,
+    BookeoCustomerSearchField,
+    BookeoHold,
+    BookeoMatchingSlot,
+    BookeoParticipants,
+    BookeoPayment,
+    BookeoPriceAdjustment,
+    BookeoResource,
+)
+
+if TYPE_CHECKING:
+    from .client import BookeoClient
+
+SlotChooser = Callable[[list[BookeoMatchingSlot]], Optional[BookeoMatchingSlot]]
+
+DEFAULT_STAGE_TIMEOUTS = {
+    "search": 10.0,
+    "customer": 10.0,
+    "hold": 10.0,
+    "booking": 20.0,
+}
+
+
+@dataclass
+class BookeoCheckoutResult:
+    slot: BookeoMatchingSlot
+    hold: BookeoHold
+    location: str
+    booking: BookeoBooking
+    # Id of the customer booked, when one was looked up or created.
+    customer_id: Optional[str] = None
+
+
+class BookeoCheckout:
+    """Runs the search, customer, hold and booking calls of a checkout as one pipeline.
+
+    Each stage runs on a thread pool and is abandoned after its timeout in
+    timeouts (seconds, by stage name, counted from when the stage begins
+    running), raising TimeoutError. A hold whose
+    request completes after its stage timed out, or whose booking fails, is
+    deleted in the background. The time taken by every stage, successful or
+    not, is recorded in latencies, and failures are counted in failures.
+
+    A customer given without an id is looked up by email address, or
+    created, while the search and hold run; the booking then refers to it
+    by id.
+
+    The matching slot found by the search provides the event, times and
+    resources of the hold and booking, and the participants and customer are
+    serialized once and sent with both requests. A payment is sent as the
+    booking's initial payment, so it takes no extra request.
+    """
+
+    STAGES = ("search", "customer", "hold", "booking")
+
+    def __init__(
+        self,
+        client: "BookeoClient",
+        timeouts: dict[str, float] = None,
+        hold_duration_secs: int = None,
+        max_workers: int = 8,
+    ):
+        self.client = client
+        self.timeouts = {**DEFAULT_STAGE_TIMEOUTS, **(timeouts or {})}
+        self.hold_duration_secs = hold_duration_secs
+        self.max_workers = max_workers
+        self.latencies = {stage: BookeoLatencyHistogram() for stage in self.STAGES}
+        self.failures = {stage: 0 for stage in self.STAGES}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def _stage(
+        self,
+        stage: str,
+        cleanup: Callable[[Any], None],
+        func: Callable[..., Any],
+        *args,
+        **kwargs,
+    ) -> Any:
+        """Runs func as the given stage; cleanup is applied to a late result."""
+        return self._wait(stage, cleanup, *self._start(func, *args, **kwargs))
+
+    def _start(
+        self, func: Callable[..., Any], *args, **kwargs
+    ) -> tuple[Future, Future]:
+        """Submits func; also returns a future of the time it begins running."""
+        started = Future()
+
+        def run():
+            started.set_result(time.monotonic())
+            return func(*args, **kwargs)
+
+        return (self._executor.submit(run), started)
+
+    def _wait(
+        self,
+        stage: str,
+        cleanup: Callable[[Any], None],
+        future: Future,
+        started: Future,
+    ) -> Any:
+        """Waits for a stage started with _start until its timeout.
+
+        The timeout counts from when the stage begins running, so time spent
+        queued behind other checkouts' stages is not held against it.
+        """
+        timeout = self.timeouts.get(stage)
+        began = started.result()
+        remaining = None if timeout is None else timeout - (time.monotonic() - began)
+        try:
+            return future.result(timeout=remaining)
+        except FutureTimeoutError:
+            if cleanup is not None:
+                future.add_done_callback(lambda f: self._cleanup_late(f, cleanup))
+            self._failed(stage)
+            raise TimeoutError(
+                f"Checkout stage {stage} timed out after {timeout} seconds."
+            ) from None
+        except Exception:
+            self._failed(stage)
+            raise
+        finally:
+            self.latencies[stage].observe(time.monotonic() - began)
+
+    def _failed(self, stage: str):
+        with self._lock:
+            self.failures[stage] += 1
+
+    @staticmethod
+    def _cleanup_late(future: Future, cleanup: Callable[[Any], None]):
+        if future.exception() is None:
+            try:
+                cleanup(future.result())
+            except Exception:
+                pass
+
+    def _release(self, hold_id: str):
+        def delete():
+            try:
+                self.client.holds.delete_hold(hold_id)
+            except Exception:
+                pass  # The hold expires on its own.
+
+        try:
+            self._executor.submit(delete)
+        except RuntimeError:
+            delete()  # The pool is shutting down.
+
+    def _resolve_customer(self, customer: BookeoCustomer) -> str:
+        """Returns the id of the customer with the same email address, creating it if needed."""
+        email = (customer.email_address or "").strip().lower()
+        if email:
+            found, _ = self.client.customers.get_customers(
+                search_field=BookeoCustomerSearchField.Email,
+                search_text=email,
+                items_per_page=10,
+            )
+            for existing in found:
+                if (existing.email_address or "").strip().lower() == email:
+                    return existing.id
+        _, created = self.client.customers.create_new_customer(customer)
+        return created.id
+
+    def checkout(
+        self,
+        product_id: str,
+        start_time: datetime,
+        end_time: datetime,
+        participants: BookeoParticipants,
+        choose: SlotChooser = None,
+        customer_id: str = None,
+        customer: BookeoCustomer = None,
+        payment: BookeoPayment = None,
+        resources: list[BookeoResource] = [],
+        options: list[BookeoBookingOption] = [],
+        price_adjustments: list[BookeoPriceAdjustment] = [],
+        external_ref: str = None,
+        source_ip: str = None,
+        source: str = None,
+        **booking_args,
+    ) -> BookeoCheckoutResult:
+        """Searches for a slot between start_time and end_time, holds it and books it.
+
+        choose picks the slot to book from the first page of matching slots
+        (the first one by default). booking_args are passed on to
+        BookeoBookings.create_booking.
+        """
+        if participants is None:
+            raise TypeError("participants cannot be None.")
+        pending_customer = None
+        if customer_id is None and customer is not None:
+            if getattr(customer, "id", None):
+                customer_id = customer.id
+            else:
+                # The customer does not depend on the slot, so it is resolved
+                # while the search and hold run.
+                pending_customer = self._start(self._resolve_customer, customer)
+        slots, _, _ = self._stage(
+            "search",
+            None,
+            self.client.availability.search_open_slots,
+            product_id,
+            start_time,
+            end_time,
+            participants.numbers,
+            options=options,
+            resources=resources,
+        )
+        slot = (choose or (lambda s: s[0] if s else None))(slots)
+        if slot is None:
+            raise LookupError(
+                f"No open slot for product with id {product_id} between {start_time} and {end_time}."
+            )
+
+        shared = {
+            "participants": BookeoFragment(participants),
+            "customer": None if customer is None else BookeoFragment(customer),
+            "customer_id": customer_id,
+            "resources": BookeoFragment(slot.resources or resources),
+            "options": options,
+            "price_adjustments": price_adjustments,
+            "event_id": slot.event_id,
+            "start_time": slot.start_time,
+            "end_time": slot.end_time,
+            "external_ref": external_ref,
+            "source_ip": source_ip,
+            "source": source,
+        }
+        _, hold = self._stage(
+            "hold",
+            lambda result: self._release(result[1].id),
+            self.client.holds.create_hold,
+            product_id,
+            hold_duration_secs=self.hold_duration_secs,
+            **shared,
+        )
+
+        if pending_customer is not None:
+            try:
+                customer_id = self._wait("customer", None, *pending_customer)
+            except Exception:
+                self._release(hold.id)
+                raise
+        # Per-booking arguments take precedence over the shared ones.
+        kwargs = {
+            **shared,
+            "previous_hold_id": hold.id,
+            "initial_payments": [] if payment is None else [payment],
+        }
+        if customer_id is not None:
+            kwargs.update(customer=None, customer_id=customer_id)
+        kwargs.update(booking_args)
+        try:
+            location, booking = self._stage(
+                "booking",
+                None,
+                self.client.bookings.create_booking,
+                product_id,
+                **kwargs,
+            )
+        except TimeoutError:
+            raise  # The booking may still go through, consuming the hold.
+        except Exception:
+            self._release(hold.id)
+            raise
+        return BookeoCheckoutResult(slot, hold, location, booking, customer_id)
+
+    def checkout_many(
+        self, checkouts: Iterable[dict[str, Any]]
+    ) -> Iterator[BookeoBatchResult]:
+        """Runs many checkouts concurrently, so that their stages overlap.
+
+        Each item holds the keyword arguments of one checkout call. Yields
+        a BookeoBatchResult per checkout, in input order, with the
+        BookeoCheckoutResult as its value.
+        """
+        for i, ((_, kwargs), result, error) in enumerate(
+            run_concurrently(
+                lambda pair: self.checkout(**pair[1]),
+                enumerate(checkouts),
+                self.max_workers,
+            )
+        ):
+            location = None if result is None else result.location
+            yield BookeoBatchResult(i, kwargs, location, result, error)
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Latency summary and failure count of every stage."""
+        return {
+            stage: {**self.latencies[stage].summary(), "failures": self.failures[stage]}
+            for stage in self.STAGES
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=True)
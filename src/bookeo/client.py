@@ -1,16 +1,13 @@
-import requests
+import importlib
+from functools import lru_cache
+from typing import TYPE_CHECKING
 
-from .availability import BookeoAvailability
-from .bookings import BookeoBookings
-from .customers import BookeoCustomers
-from .holds import BookeoHolds
-from .payments import BookeoPayments
-from .resourceblocks import BookeoResourceBlocks
-from .seatblocks import BookeoSeatblocks
-from .settings import BookeoSettings
-from .setup import VERSION
-from .subaccounts import BookeoSubaccounts
-from .webhooks import BookeoWebhooks
+from .ratelimit import BookeoRateLimiter
+
+if TYPE_CHECKING:
+    import requests
+
+    from .cache import BookeoAvailabilityCache, BookeoSettingsCache
 
 
 class BookeoClientException(Exception):
@@ -21,23 +18,77 @@ class BookeoClientException(Exception):
         return self.error_msg
 
 
+@lru_cache(maxsize=None)
+def _version() -> str:
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version("bookeo")
+    except PackageNotFoundError:
+        return "dev"
+
+
+class _APIModule:
+    """Imports and instantiates an API module the first time it is accessed."""
+
+    def __init__(self, module: str, class_name: str):
+        self.module = module
+        self.class_name = class_name
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, client, owner=None):
+        if client is None:
+            return self
+        module = importlib.import_module(f".{self.module}", __package__)
+        api = getattr(module, self.class_name)(client)
+        # Cache on the instance so later lookups bypass the descriptor.
+        client.__dict__[self.name] = api
+        return api
+
+
 class BookeoClient:
-    def __init__(self, secret_key: str, api_key: str):
+    # API modules
+    availability = _APIModule("availability", "BookeoAvailability")
+    bookings = _APIModule("bookings", "BookeoBookings")
+    customers = _APIModule("customers", "BookeoCustomers")
+    holds = _APIModule("holds", "BookeoHolds")
+    payments = _APIModule("payments", "BookeoPayments")
+    resourceblocks = _APIModule("resourceblocks", "BookeoResourceBlocks")
+    seatblocks = _APIModule("seatblocks", "BookeoSeatblocks")
+    settings = _APIModule("settings", "BookeoSettings")
+    subaccounts = _APIModule("subaccounts", "BookeoSubaccounts")
+    webhooks = _APIModule("webhooks", "BookeoWebhooks")
+
+    def __init__(
+        self,
+        secret_key: str,
+        api_key: str,
+        settings_cache: "BookeoSettingsCache" = None,
+        availability_cache: "BookeoAvailabilityCache" = None,
+        rate_limiter: BookeoRateLimiter = None,
+        timeout: float = None,
+        session: "requests.Session" = None,
+    ):
         if secret_key is None or api_key is None:
             raise BookeoClientException("Must initialize secret_key and api_key")
         self._secret_key = secret_key
         self._api_key = api_key
-        # API modules
-        self.availability = BookeoAvailability(self)
-        self.bookings = BookeoBookings(self)
-        self.customers = BookeoCustomers(self)
-        self.holds = BookeoHolds(self)
-        self.payments = BookeoPayments(self)
-        self.resourceblocks = BookeoResourceBlocks(self)
-        self.seatblocks = BookeoSeatblocks(self)
-        self.settings = BookeoSettings(self)
-        self.subaccounts = BookeoSubaccounts(self)
-        self.webhooks = BookeoWebhooks(self)
+        # Shared cache for /settings responses; a private in-memory cache is
+        # used when none is given.
+        self.settings_cache = settings_cache
+        # Optional cache of availability results, invalidated by changes made
+        # through this client.
+        self.availability_cache = availability_cache
+        # Optional limiter throttling every request made by this client;
+        # requests are not throttled without one.
+        self.rate_limiter = rate_limiter
+        # Seconds to wait for the server before giving up on a request.
+        self.timeout = timeout
+        # Optional requests.Session whose connection pool is used for every
+        # request; several clients may share one.
+        self.session = session
 
     def query_dict(self) -> dict:
         """Returns the base query dictionary for Bookeo API requests."""
@@ -51,7 +102,7 @@ class BookeoClient:
         """Returns the standard headers for Bookeo API requests."""
         return {
             "Cache-Control": "no-cache",
-            "User-Agent": f"PythonBookeo/{VERSION}",
+            "User-Agent": f"PythonBookeo/{_version()}",
             "Accept": "text/html,application/json",
             "Accept-Encoding": "gzip, deflate, br",
             "Connection": "keep-alive",
@@ -1,52 +1,73 @@
-from datetime import datetime
-from typing import Optional
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Optional
 
-import pytz
-import requests
-
-from .client import BookeoClient
 from .request import BookeoRequest
 
-# TODO: Decide how to handle pagination
-# Idea: something like below
-# def some_method(
-#     *args,
-#     nav_token: Optional[str],
-#     page_number: Optional[int],
-#     items_per_page: Optional[int],
-#     use_paging: bool = True,
-#     use_iterator: bool = False,
-# ):
-#     params = {...}
-#     iterator = BookeoRequestIterable(request(params))
-#     if use_iterator:
-#         return iterator
-#     if use_paging:
-#         params.update(
-#             {
-#                 "pageNavigationToken": nav_token,
-#                 "pageNumber": page_number,
-#                 "itemsPerPage": items_per_page,
-#             }
-#         )
-#     else:
-#         data = []
-#         while iterator.has_next():
-#             data.extend(iterator.next())
+if TYPE_CHECKING:
+    import requests
+
+    from .client import BookeoClient
+
+
+# Longest period a single Bookeo search by time may cover.
+MAX_SEARCH_WINDOW = timedelta(days=31)
 
 
 class BookeoAPI:
-    def __init__(self, client: BookeoClient):
+    def __init__(self, client: "BookeoClient"):
         self.client = client
 
-    def _request(self, *args, **kwargs) -> requests.Response:
+    def _request(self, *args, **kwargs) -> "requests.Response":
         r = BookeoRequest(self.client, *args, **kwargs)
         return r.request()
 
+    def _availability_changed(
+        self,
+        product_id: str = None,
+        start_time: datetime = None,
+        end_time: datetime = None,
+        item_id: str = None,
+        previous_item_id: str = None,
+    ):
+        """Invalidates cached availability after a change made through this client."""
+        cache = self.client.availability_cache
+        if cache is None:
+            return
+        if previous_item_id is not None:
+            cache.invalidate_item(previous_item_id, product_id)
+        cache.invalidate(product_id, start_time, end_time)
+        cache.track(item_id, product_id, start_time, end_time)
+
+    def _availability_removed(self, item_id: str):
+        """Invalidates cached availability after an item is deleted through this client."""
+        cache = self.client.availability_cache
+        if cache is not None:
+            cache.invalidate_item(item_id)
+
+
+@dataclass
+class BookeoBatchResult:
+    """Outcome of one item of a batch operation."""
+
+    index: int
+    item: Any
+    location: Optional[str] = None
+    value: Any = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
 
 def bookeo_timestamp_to_dt(timestamp: Optional[str]) -> Optional[datetime]:
     if timestamp is None:
         return None
+    import pytz
+
     dt = datetime.strptime(timestamp, r"%Y-%m-%dT%H:%M:%SZ")
     return pytz.utc.localize(dt)
 
@@ -54,5 +75,85 @@ def bookeo_timestamp_to_dt(timestamp: Optional[str]) -> Optional[datetime]:
 def dt_to_bookeo_timestamp(dt: Optional[datetime]) -> Optional[str]:
     if dt is None:
         return None
+    import pytz
+
     utc_dt = dt.astimezone(pytz.utc)
     return datetime.strftime(utc_dt, r"%Y-%m-%dT%H:%M:%SZ")
+
+
+def paginate(fetch_page: Callable[..., tuple], **kwargs) -> Iterator[Any]:
+    """Yields every item of a paged API method, following its navigation token.
+
+    fetch_page must accept nav_token and page_number keyword arguments and
+    return a tuple whose first element is the page of items and whose last
+    element is the BookeoPagination of that page.
+    """
+    page = fetch_page(**kwargs)
+    yield from page[0]
+    pager = page[-1]
+    nav_token = pager.page_navigation_token
+    page_number = pager.current_page
+    while page_number < pager.total_pages:
+        page_number += 1
+        page = fetch_page(
+            **{**kwargs, "nav_token": nav_token, "page_number": page_number}
+        )
+        yield from page[0]
+        pager = page[-1]
+        nav_token = pager.page_navigation_token or nav_token
+
+
+def time_windows(
+    start_time: datetime, end_time: datetime, window: timedelta = None
+) -> Iterator[tuple[datetime, datetime]]:
+    """Splits [start_time, end_time) into consecutive periods of at most window."""
+    window = window or MAX_SEARCH_WINDOW
+    while start_time < end_time:
+        window_end = min(start_time + window, end_time)
+        yield (start_time, window_end)
+        start_time = window_end
+
+
+def paginate_windows(
+    fetch_page: Callable[..., tuple],
+    start_time: datetime,
+    end_time: datetime,
+    window: timedelta = None,
+    **kwargs,
+) -> Iterator[Any]:
+    """Like paginate(), for a search split into periods of at most window.
+
+    Most Bookeo searches (bookings, payments, blocks) cover at most
+    MAX_SEARCH_WINDOW, so longer periods are read one window at a time.
+    """
+    for window_start, window_end in time_windows(start_time, end_time, window):
+        yield from paginate(
+            fetch_page, start_time=window_start, end_time=window_end, **kwargs
+        )
+
+
+def _outcome(item: Any, future: Future) -> tuple[Any, Any, Optional[Exception]]:
+    try:
+        return (item, future.result(), None)
+    except Exception as e:
+        return (item, None, e)
+
+
+def run_concurrently(
+    func: Callable[[Any], Any], items: Iterable[Any], max_workers: int = 8
+) -> Iterator[tuple[Any, Any, Optional[Exception]]]:
+    """Applies func to every item on a thread pool.
+
+    Yields (item, result, error) tuples in input order as they complete, with
+    error set instead of result when func raised. items are consumed lazily,
+    so at most about 2 * max_workers calls are queued at any time. Requests
+    made by func are still subject to the client's rate limiter.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append((item, executor.submit(func, item)))
+            if len(pending) >= 2 * max_workers:
+                yield _outcome(*pending.popleft())
+        while pending:
+            yield _outcome(*pending.popleft())
@@ -0,0 +1,266 @@
+import bisect
+import re
+import threading
+import unicodedata
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from .core import paginate
+from .customers import BookeoCustomers
+from .schemas import BookeoCustomer
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+_NON_DIGIT = re.compile(r"[^0-9]+")
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Lowercases text, strips accents and turns punctuation into single spaces."""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _NON_ALNUM.sub(" ", text).strip()
+
+
+def normalize_email(email: Optional[str]) -> str:
+    return (email or "").strip().casefold()
+
+
+def normalize_phone(number: Optional[str]) -> str:
+    """Digits of a phone number, without an international "00" or "+" prefix."""
+    digits = _NON_DIGIT.sub("", number or "")
+    return digits[2:] if digits.startswith("00") else digits
+
+
+def trigrams(text: str) -> set[str]:
+    """Trigrams of normalized text, padded so that word starts weigh more."""
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class BookeoCustomerIndex:
+    """In-memory index of customers for exact and typeahead lookups.
+
+    Customers are found by exact (case-insensitive) email address, by phone
+    number digits, and by name: search matches every query word as a prefix
+    of a name word, falling back to trigram similarity for misspelled or
+    partial names. The index is filled from get_customers with sync and kept
+    fresh with upsert, remove and handle_webhook; sync only picks up
+    customers created since the previous sync, so changes to existing
+    customers should be fed through webhooks.
+    """
+
+    def __init__(self, customers: BookeoCustomers = None):
+        self._api = customers
+        self._lock = threading.RLock()
+        self._customers: dict[str, BookeoCustomer] = {}
+        self._keys: dict[str, tuple[str, list[str], tuple[str, ...]]] = {}
+        self._emails: dict[str, set[str]] = {}
+        self._phones: dict[str, set[str]] = {}
+        self._words: dict[str, set[str]] = {}
+        self._sorted_words: list[str] = []
+        # Words added by update() but not yet merged into _sorted_words.
+        self._new_words: Optional[set[str]] = None
+        self._trigrams: dict[str, set[str]] = {}
+        self.synced_at: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._customers)
+
+    def __contains__(self, id: str) -> bool:
+        return id in self._customers
+
+    def get(self, id: str) -> Optional[BookeoCustomer]:
+        return self._customers.get(id)
+
+    def sync(self, full: bool = False, items_per_page: int = 100) -> int:
+        """Indexes customers created since the last sync (or all, with full).
+
+        Returns the number of customers read.
+        """
+        if self._api is None:
+            raise TypeError("The index was created without a customers API.")
+        started = datetime.now(timezone.utc)
+        created_since = None if full else self.synced_at
+        # Read every page first, so that the lock is not held across requests.
+        customers = list(
+            paginate(
+                self._api.get_customers,
+                created_since=created_since,
+                items_per_page=items_per_page,
+            )
+        )
+        self.update(customers)
+        self.synced_at = started
+        return len(customers)
+
+    def upsert(self, customer: BookeoCustomer):
+        with self._lock:
+            self._unindex(customer.id)
+            name = normalize_text(
+                " ".join(
+                    n
+                    for n in (
+                        customer.first_name,
+                        customer.middle_name,
+                        customer.last_name,
+                    )
+                    if n
+                )
+            )
+            email = normalize_email(customer.email_address)
+            phones = [normalize_phone(p.number) for p in customer.phone_numbers or []]
+            phones = [p for p in phones if p]
+            words = tuple(dict.fromkeys(name.split()))
+            self._customers[customer.id] = customer
+            self._keys[customer.id] = (email, phones, words)
+            if email:
+                self._emails.setdefault(email, set()).add(customer.id)
+            for phone in phones:
+                self._phones.setdefault(phone, set()).add(customer.id)
+            for word in words:
+                ids = self._words.get(word)
+                if ids is None:
+                    ids = self._words[word] = set()
+                    if self._new_words is not None:
+                        self._new_words.add(word)
+                    else:
+                        bisect.insort(self._sorted_words, word)
+                ids.add(customer.id)
+            for trigram in trigrams(" ".join(words)):
+                self._trigrams.setdefault(trigram, set()).add(customer.id)
+
+    def update(self, customers: Iterable[BookeoCustomer]):
+        """Upserts many customers, sorting the new name words once at the end."""
+        with self._lock:
+            self._new_words = set()
+            try:
+                for customer in customers:
+                    self.upsert(customer)
+            finally:
+                self._sorted_words.extend(self._new_words)
+                self._sorted_words.sort()
+                self._new_words = None
+
+    def remove(self, id: str):
+        with self._lock:
+            self._unindex(id)
+
+    def _unindex(self, id: str):
+        keys = self._keys.pop(id, None)
+        self._customers.pop(id, None)
+        if keys is None:
+            return
+        email, phones, words = keys
+        _discard(self._emails, email, id)
+        for phone in phones:
+            _discard(self._phones, phone, id)
+        for word in words:
+            if not _discard(self._words, word, id):
+                continue
+            if self._new_words is not None and word in self._new_words:
+                self._new_words.discard(word)
+            else:
+                i = bisect.bisect_left(self._sorted_words, word)
+                del self._sorted_words[i]
+        for trigram in trigrams(" ".join(words)):
+            _discard(self._trigrams, trigram, id)
+
+    def handle_webhook(self, payload: dict):
+        """Applies a Bookeo webhook notification for the customers domain.
+
+        payload is the decoded JSON body of the notification; notifications
+        for other domains are ignored.
+        """
+        if payload.get("domain") != "customers":
+            return
+        item = payload.get("item")
+        if payload.get("type") == "deleted" or not item:
+            self.remove(payload.get("itemId"))
+        else:
+            self.upsert(BookeoCustomer(**item))
+
+    def by_email(self, email: str) -> list[BookeoCustomer]:
+        with self._lock:
+            ids = self._emails.get(normalize_email(email), ())
+            return [self._customers[id] for id in ids]
+
+    def by_phone(self, number: str) -> list[BookeoCustomer]:
+        with self._lock:
+            ids = self._phones.get(normalize_phone(number), ())
+            return [self._customers[id] for id in ids]
+
+    def search(
+        self, text: str, limit: int = 20, min_similarity: float = 0.5
+    ) -> list[BookeoCustomer]:
+        """Finds customers by name, best matches first.
+
+        Customers with a name word starting with every word of text come
+        first, in alphabetical order of the matched word. If there are none,
+        customers sharing at least min_similarity of the trigrams of text
+        are returned instead, most similar first.
+        """
+        query = normalize_text(text)
+        if not query or limit <= 0:
+            return []
+        with self._lock:
+            found = self._prefix_matches(query.split(), limit)
+            if not found:
+                found = self._similar(query, min_similarity)[:limit]
+            return [self._customers[id] for id in found]
+
+    def _word_range(self, prefix: str) -> tuple[int, int]:
+        lo = bisect.bisect_left(self._sorted_words, prefix)
+        hi = bisect.bisect_left(self._sorted_words, prefix + "\uffff", lo)
+        return (lo, hi)
+
+    def _prefix_matches(self, query: list[str], limit: int) -> dict[str, None]:
+        # Walk the words matching the most selective query word in order, and
+        # check the other query words against each candidate's own words.
+        ranges = [(self._word_range(q), q) for q in query]
+        (lo, hi), first = min(ranges, key=lambda r: r[0][1] - r[0][0])
+        rest = [q for q in query if q != first]
+        found: dict[str, None] = {}
+        for word in self._sorted_words[lo:hi]:
+            for id in self._words[word]:
+                if id in found:
+                    continue
+                words = self._keys[id][2]
+                if all(any(w.startswith(q) for w in words) for q in rest):
+                    found[id] = None
+                    if len(found) == limit:
+                        return found
+        return found
+
+    def _similar(self, query: str, min_similarity: float) -> list[str]:
+        wanted = trigrams(query)
+        postings = sorted(
+            (self._trigrams[t] for t in wanted if t in self._trigrams), key=len
+        )
+        needed = max(1, int(min_similarity * len(wanted) + 0.999))
+        scores = Counter()
+        # A candidate must share one of the rarest trigrams, or it cannot reach
+        # the needed count from the remaining ones; those are then only
+        # checked for the candidates already found.
+        cutoff = len(postings) - needed
+        for i, ids in enumerate(postings):
+            if i <= cutoff:
+                scores.update(ids)
+            else:
+                for id in scores:
+                    if id in ids:
+                        scores[id] += 1
+        return [id for id, score in scores.most_common() if score >= needed]
+
+
+def _discard(index: dict[str, set[str]], key: str, id: str) -> bool:
+    """Removes id from the set at key, and the key once empty; True if removed."""
+    ids = index.get(key)
+    if ids is None:
+        return False
+    ids.discard(id)
+    if not ids:
+        del index[key]
+        return True
+    return False
@@ -23,7 +23,7 @@ class BookeoCustomers(BookeoAPI):
         current_members: bool = True,
         current_non_members: bool = True,
         created_since: datetime = None,
-        search_field: BookeoCustomerSearchField = "name",
+        search_field: BookeoCustomerSearchField = None,
         search_text: str = None,
         items_per_page: int = None,
         nav_token=None,
@@ -35,9 +35,13 @@ class BookeoCustomers(BookeoAPI):
                 "currentMembers": current_members,
                 "currentNonMembers": current_non_members,
                 "createdSince": dt_to_bookeo_timestamp(created_since),
-                "searchField": search_field.value,
+                "searchField": (
+                    None
+                    if search_field is None
+                    else BookeoCustomerSearchField(search_field).value
+                ),
                 "searchText": search_text,
-                "items_per_page": items_per_page,
+                "itemsPerPage": items_per_page,
                 "pageNavigationToken": nav_token,
                 "pageNumber": page_number,
             },
@@ -55,7 +59,7 @@ class BookeoCustomers(BookeoAPI):
     ) -> tuple[str, BookeoCustomer]:
         if customer is None:
             raise TypeError("customer cannot be None.")
-        resp = self._request("/customers", data=customer.model_dump(), method="POST")
+        resp = self._request("/customers", data=customer, method="POST")
         if resp.status_code != 201:
             raise BookeoRequestException(
                 "Could not create requested customer.", resp.request.url
@@ -103,11 +107,11 @@ class BookeoCustomers(BookeoAPI):
                 "middleName": middle_name,
                 "lastName": last_name,
                 "emailAddress": email,
-                "phoneNumbers": [pn.model_dump() for pn in phone_numbers],
-                "streetAddress": street_address.model_dump(),
+                "phoneNumbers": phone_numbers,
+                "streetAddress": street_address,
                 "dateOfBirth": date_of_birth,
-                "customFields": [cf.model_dump() for cf in custom_fields],
-                "gender": gender.value,
+                "customFields": custom_fields,
+                "gender": gender,
             },
             method="PUT",
         )
@@ -169,11 +173,11 @@ class BookeoCustomers(BookeoAPI):
                 "middleName": middle_name,
                 "lastName": last_name,
                 "emailAddress": email,
-                "phoneNumbers": [pn.model_dump() for pn in phone_numbers],
-                "streetAddress": street_address.model_dump(),
+                "phoneNumbers": phone_numbers,
+                "streetAddress": street_address,
                 "dateOfBirth": date_of_birth,
-                "customFields": [cf.model_dump() for cf in custom_fields],
-                "gender": gender.value,
+                "customFields": custom_fields,
+                "gender": gender,
                 "facebookId": facebook_id,
                 "languageCode": language_code,
                 "acceptSmsReminders": accept_sms_reminders,
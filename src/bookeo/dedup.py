@@ -0,0 +1,243 @@
+import json
+import os
+import shutil
+import tempfile
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import chain, groupby, islice
+from typing import Iterable, Optional
+
+from .customerindex import normalize_email, normalize_phone, normalize_text, trigrams
+from .schemas import BookeoCustomer
+from .storage import BookeoSqlite
+
+# Weight of each signal in the score of a candidate pair.
+WEIGHTS = {
+    "name": 0.4,
+    "email": 0.3,
+    "phone": 0.2,
+    "date_of_birth": 0.3,
+    "address": 0.2,
+}
+
+
+_SHARED_KEYS_QUERY = """
+    SELECT key, record FROM blocks
+    WHERE key IN (SELECT key FROM blocks GROUP BY key HAVING COUNT(*) > 1)
+    ORDER BY key, name
+"""
+
+
+@dataclass
+class BookeoDuplicateCandidate:
+    """Two customers that are likely the same person."""
+
+    customer_ids: tuple[str, str]
+    score: float
+    # Signals on which the two customers agree.
+    matches: list[str] = field(default_factory=list)
+
+
+def _email_key(email: Optional[str]) -> str:
+    """Normalized email address, without a "+tag" in its local part."""
+    email = normalize_email(email)
+    local, at, domain = email.partition("@")
+    return local.split("+", 1)[0] + at + domain
+
+
+def _record(customer: BookeoCustomer) -> dict:
+    """The fields of customer used for blocking and scoring."""
+    address = customer.street_address
+    return {
+        "id": customer.id,
+        "first": normalize_text(customer.first_name),
+        "last": normalize_text(customer.last_name),
+        "email": _email_key(customer.email_address),
+        # Trailing digits only, so that numbers with and without a country
+        # code agree.
+        "phones": sorted(
+            {normalize_phone(p.number)[-9:] for p in customer.phone_numbers or []}
+            - {""}
+        ),
+        "dob": (
+            customer.date_of_birth.date().isoformat() if customer.date_of_birth else ""
+        ),
+        "address": normalize_text(
+            " ".join(filter(None, (address.address_1, address.postcode)))
+            if address
+            else ""
+        ),
+    }
+
+
+def _block_keys(record: dict) -> set[str]:
+    keys = set()
+    if record["email"]:
+        keys.add(f"e:{record['email']}")
+    for phone in record["phones"]:
+        keys.add(f"p:{phone}")
+    if record["last"]:
+        keys.add(f"n:{record['last']}:{record['first'][:1]}")
+    if record["dob"]:
+        keys.add(f"d:{record['dob']}:{record['first'][:1]}")
+    return keys
+
+
+class _Profile:
+    """A customer record prepared for scoring."""
+
+    __slots__ = ("id", "name", "name_grams", "email", "phones", "dob", "address")
+
+    def __init__(self, record: dict):
+        self.id = record["id"]
+        self.name = f"{record['first']} {record['last']}".strip()
+        self.name_grams = trigrams(self.name)
+        self.email = record["email"]
+        self.phones = set(record["phones"])
+        self.dob = record["dob"]
+        self.address = record["address"]
+
+
+def _similarity(a: str, b: str, grams_a: set = None, grams_b: set = None) -> float:
+    """Jaccard similarity of the trigrams of two normalized strings."""
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    grams_a = grams_a or trigrams(a)
+    grams_b = grams_b or trigrams(b)
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
+
+
+def _score(a: _Profile, b: _Profile) -> tuple[float, list[str]]:
+    """Weighted similarity of two customers, and the signals that agree.
+
+    Signals missing from either customer do not count; a differing date of
+    birth counts fully against the pair.
+    """
+    signals = {"name": _similarity(a.name, b.name, a.name_grams, b.name_grams)}
+    if a.email and b.email:
+        signals["email"] = float(a.email == b.email)
+    if a.phones and b.phones:
+        signals["phone"] = float(not a.phones.isdisjoint(b.phones))
+    if a.dob and b.dob:
+        signals["date_of_birth"] = float(a.dob == b.dob)
+    if a.address and b.address:
+        signals["address"] = _similarity(a.address, b.address)
+    total = score = 0.0
+    for signal, value in signals.items():
+        total += WEIGHTS[signal]
+        score += WEIGHTS[signal] * value
+    return (score / total, [s for s, v in signals.items() if v >= 0.8])
+
+
+class BookeoCustomerDeduplicator:
+    """Finds likely duplicate customers without comparing every pair.
+
+    Customers are streamed into an on-disk table under one or more blocking
+    keys (normalized email address, phone number, last name with first
+    initial, and date of birth with first initial), and only customers
+    sharing a key are compared. Blocks larger than max_block_size are sorted
+    by name, streamed, and each customer is only compared with the next
+    window ones. Memory use is bounded by max_block_size customers plus the
+    candidates found.
+    """
+
+    def __init__(
+        self,
+        min_score: float = 0.75,
+        max_block_size: int = 100,
+        window: int = 20,
+        work_dir: str = None,
+    ):
+        self.min_score = min_score
+        self.max_block_size = max_block_size
+        self.window = window
+        self.work_dir = work_dir
+
+    def find(
+        self, customers: Iterable[BookeoCustomer], batch_size: int = 5000
+    ) -> list[BookeoDuplicateCandidate]:
+        """Returns the candidate pairs scoring at least min_score, best first.
+
+        customers may be any iterable, such as
+        paginate(client.customers.get_customers).
+        """
+        work_dir = tempfile.mkdtemp(dir=self.work_dir)
+        db = None
+        try:
+            db = BookeoSqlite(
+                os.path.join(work_dir, "blocks.db"),
+                "CREATE TABLE blocks (key TEXT, name TEXT, record TEXT);",
+            )
+            it = iter(customers)
+            while batch := list(islice(it, batch_size)):
+                rows = []
+                for customer in batch:
+                    record = _record(customer)
+                    encoded = json.dumps(record)
+                    name = f"{record['last']} {record['first']}"
+                    rows.extend((key, name, encoded) for key in _block_keys(record))
+                with db.transaction() as conn:
+                    conn.executemany("INSERT INTO blocks VALUES (?, ?, ?)", rows)
+            db.execute("CREATE INDEX blocks_key ON blocks (key, name)")
+            candidates = self._compare(db)
+        finally:
+            if db is not None:
+                db.close()
+            shutil.rmtree(work_dir, ignore_errors=True)
+        return sorted(candidates.values(), key=lambda c: -c.score)
+
+    def _compare(self, db: BookeoSqlite) -> dict[tuple, BookeoDuplicateCandidate]:
+        candidates = {}
+        rows = db.execute(_SHARED_KEYS_QUERY)
+        for _, block in groupby(rows, key=lambda row: row[0]):
+            profiles = (_Profile(json.loads(record)) for _, record in block)
+            head = list(islice(profiles, self.max_block_size + 1))
+            if len(head) <= self.max_block_size:
+                # Small blocks are compared in full.
+                for i, a in enumerate(head):
+                    for b in head[i + 1 :]:
+                        self._compare_pair(a, b, candidates)
+                continue
+            # Each customer of a large block is compared with the previous
+            # window ones, keeping only those in memory.
+            recent = deque(maxlen=self.window)
+            for b in chain(head, profiles):
+                for a in recent:
+                    self._compare_pair(a, b, candidates)
+                recent.append(b)
+        return candidates
+
+    def _compare_pair(
+        self,
+        a: _Profile,
+        b: _Profile,
+        candidates: dict[tuple, BookeoDuplicateCandidate],
+    ):
+        pair = (a.id, b.id) if a.id < b.id else (b.id, a.id)
+        if a.id == b.id or pair in candidates:
+            return
+        score, matches = _score(a, b)
+        if score >= self.min_score:
+            candidates[pair] = BookeoDuplicateCandidate(pair, score, matches)
+
+
+def duplicate_groups(candidates: Iterable[BookeoDuplicateCandidate]) -> list[set[str]]:
+    """Groups customers linked by candidate pairs, largest groups first."""
+    parent: dict[str, str] = {}
+
+    def find(id: str) -> str:
+        parent.setdefault(id, id)
+        while parent[id] != id:
+            parent[id] = parent[parent[id]]
+            id = parent[id]
+        return id
+
+    for candidate in candidates:
+        a, b = candidate.customer_ids
+        parent[find(a)] = find(b)
+    groups: dict[str, set[str]] = {}
+    for id in parent:
+        groups.setdefault(find(id), set()).add(id)
+    return sorted(groups.values(), key=len, reverse=True)
@@ -0,0 +1,91 @@
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any
+
+from pydantic import BaseModel
+
+JSON_CONTENT_TYPE = "application/json; charset=utf-8"
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+class BookeoFragment:
+    """A reusable part of a request body that is serialized only once.
+
+    Wrap values that are sent with many requests (participant templates,
+    resource lists, etc.) and pass the fragment in place of the value; its
+    JSON text is spliced into each body as is.
+    """
+
+    __slots__ = ("value", "json")
+
+    def __init__(self, value: Any):
+        self.value = compact(value)
+        self.json = _dumps(self.value)
+
+    def __repr__(self):
+        return f"BookeoFragment({self.value!r})"
+
+
+def compact(value: Any) -> Any:
+    """Converts a request value into JSON-ready primitives, dropping null fields."""
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, BookeoFragment):
+        return value.value
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", by_alias=True, exclude_none=True)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        from .core import dt_to_bookeo_timestamp
+
+        return dt_to_bookeo_timestamp(value)
+    if isinstance(value, dict):
+        return {k: compact(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [compact(v) for v in value]
+    raise TypeError(f"Cannot encode value of type {type(value).__name__}.")
+
+
+class _Raw(str):
+    """JSON text of a value containing fragments, already serialized."""
+
+
+def _splice(value: Any) -> Any:
+    """Like compact(), but serializes the containers holding fragments.
+
+    Fragments become their cached JSON text, so only the parts of a body
+    around them are passed to json.dumps.
+    """
+    if isinstance(value, BookeoFragment):
+        return _Raw(value.json)
+    if isinstance(value, dict):
+        items = {k: _splice(v) for k, v in value.items() if v is not None}
+        if not any(isinstance(v, _Raw) for v in items.values()):
+            return items
+        return _Raw(
+            "{"
+            + ",".join(
+                f"{_dumps(str(k))}:{v if isinstance(v, _Raw) else _dumps(v)}"
+                for k, v in items.items()
+            )
+            + "}"
+        )
+    if isinstance(value, (list, tuple)):
+        items = [_splice(v) for v in value]
+        if not any(isinstance(v, _Raw) for v in items):
+            return items
+        return _Raw(
+            "[" + ",".join(v if isinstance(v, _Raw) else _dumps(v) for v in items) + "]"
+        )
+    return compact(value)
+
+
+def encode_body(data: Any) -> bytes:
+    """Encodes a request body as compact UTF-8 JSON."""
+    value = _splice(data)
+    return (value if isinstance(value, _Raw) else _dumps(value)).encode("utf-8")
@@ -0,0 +1,227 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Hashable, Optional
+
+from .holds import BookeoHolds
+from .request import BookeoRequestException
+from .schemas import BookeoHold
+
+# Statuses of failed renewals worth retrying: rate limiting, server errors
+# and timeouts.
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+def _is_transient(error: Exception) -> bool:
+    # Network errors from requests derive from OSError, as do timeouts.
+    if isinstance(error, OSError):
+        return True
+    return (
+        isinstance(error, BookeoRequestException)
+        and error.status_code in TRANSIENT_STATUS_CODES
+    )
+
+
+class _TimerWheel:
+    """Hashed timer wheel: O(1) scheduling and cancellation.
+
+    Deadlines are rounded up to whole ticks. A deadline further away than one
+    revolution stays in its bucket until the wheel has turned enough times.
+    """
+
+    def __init__(self, tick: float, num_buckets: int):
+        self.tick = tick
+        self._buckets: list[dict[Hashable, int]] = [{} for _ in range(num_buckets)]
+        self._where: dict[Hashable, int] = {}
+        self._current = self._to_tick(time.monotonic())
+
+    def _to_tick(self, t: float) -> int:
+        return int(-(-t // self.tick))
+
+    def schedule(self, item: Hashable, deadline: float):
+        self.cancel(item)
+        due = max(self._to_tick(deadline), self._current + 1)
+        bucket = due % len(self._buckets)
+        self._buckets[bucket][item] = due
+        self._where[item] = bucket
+
+    def cancel(self, item: Hashable):
+        bucket = self._where.pop(item, None)
+        if bucket is not None:
+            del self._buckets[bucket][item]
+
+    def advance(self, now: float) -> list[Hashable]:
+        """Moves the wheel up to now and returns the items that became due."""
+        target = self._to_tick(now)
+        due = []
+        while self._current < target:
+            self._current += 1
+            bucket = self._buckets[self._current % len(self._buckets)]
+            for item in [i for i, t in bucket.items() if t <= self._current]:
+                del bucket[item]
+                del self._where[item]
+                due.append(item)
+        return due
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+
+class BookeoManagedHold:
+    """A hold kept alive by a BookeoHoldManager until it is completed or released."""
+
+    def __init__(self, manager: "BookeoHoldManager", location: str, hold: BookeoHold):
+        self._manager = manager
+        self._lock = threading.Lock()
+        self.location = location
+        self.hold = hold
+        self.last_touched = time.monotonic()
+        self.active = True
+        # Last renewal error; the hold stays active while it is retried.
+        self.error: Optional[Exception] = None
+        self._failures = 0
+
+    @property
+    def hold_id(self) -> str:
+        return self.hold.id
+
+    def touch(self):
+        """Marks the hold as still in use, so that it is not considered abandoned."""
+        self.last_touched = time.monotonic()
+
+    def complete(self) -> str:
+        """Stops tracking the hold and returns its current id.
+
+        Pass the id as previous_hold_id when creating the booking.
+        """
+        with self._lock:
+            self._manager._untrack(self)
+            self.active = False
+            return self.hold.id
+
+    def release(self):
+        """Stops tracking the hold and deletes it."""
+        with self._lock:
+            if not self.active:
+                return
+            self._manager._untrack(self)
+            self.active = False
+            self._manager._holds.delete_hold(self.hold.id)
+
+
+class BookeoHoldManager:
+    """Keeps many holds alive and releases abandoned ones.
+
+    Each hold is renewed (by creating a new hold with previous_hold_id) once,
+    renew_before seconds before it expires, and deleted at that point instead
+    if it has not been touched for abandon_after seconds. Deadlines are kept
+    in a timer wheel driven by one background thread, and renewals and
+    deletions run on a pool of at most max_workers threads. A renewal that
+    fails transiently (rate limiting, a server error, a timeout) is retried
+    with exponential backoff from retry_backoff seconds for as long as the
+    hold has not expired; only a definitive rejection stops tracking it.
+    """
+
+    def __init__(
+        self,
+        holds: BookeoHolds,
+        renew_before: float = 30,
+        abandon_after: float = 600,
+        max_workers: int = 4,
+        tick: float = 1.0,
+        retry_backoff: float = 1.0,
+    ):
+        self._holds = holds
+        self.renew_before = renew_before
+        self.abandon_after = abandon_after
+        self.retry_backoff = retry_backoff
+        self._wheel = _TimerWheel(tick, 1024)
+        self._tracked: dict[int, tuple[BookeoManagedHold, dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def create(self, **kwargs) -> BookeoManagedHold:
+        """Creates a hold with BookeoHolds.create_hold and starts tracking it."""
+        location, hold = self._holds.create_hold(**kwargs)
+        managed = BookeoManagedHold(self, location, hold)
+        kwargs.pop("previous_hold_id", None)
+        with self._lock:
+            self._tracked[id(managed)] = (managed, kwargs)
+            self._schedule(managed)
+        return managed
+
+    def _remaining(self, managed: BookeoManagedHold) -> float:
+        """Seconds until the hold expires."""
+        remaining = managed.hold.expiration - datetime.now(timezone.utc)
+        return remaining.total_seconds()
+
+    def _schedule(self, managed: BookeoManagedHold):
+        deadline = time.monotonic() + self._remaining(managed) - self.renew_before
+        self._wheel.schedule(id(managed), deadline)
+
+    def _untrack(self, managed: BookeoManagedHold):
+        with self._lock:
+            self._tracked.pop(id(managed), None)
+            self._wheel.cancel(id(managed))
+
+    def __len__(self) -> int:
+        return len(self._tracked)
+
+    def _run(self):
+        while not self._stopped.wait(self._wheel.tick):
+            with self._lock:
+                due = [
+                    self._tracked[key]
+                    for key in self._wheel.advance(time.monotonic())
+                    if key in self._tracked
+                ]
+            for managed, kwargs in due:
+                self._executor.submit(self._renew_or_release, managed, kwargs)
+
+    def _renew_or_release(self, managed: BookeoManagedHold, kwargs: dict[str, Any]):
+        with managed._lock:
+            if not managed.active:
+                return
+            try:
+                if time.monotonic() - managed.last_touched > self.abandon_after:
+                    managed.active = False
+                    self._untrack(managed)
+                    self._holds.delete_hold(managed.hold.id)
+                    return
+                managed.location, managed.hold = self._holds.create_hold(
+                    **kwargs, previous_hold_id=managed.hold.id
+                )
+                managed.error = None
+                managed._failures = 0
+                with self._lock:
+                    if id(managed) in self._tracked:
+                        self._schedule(managed)
+            except Exception as e:
+                managed.error = e
+                delay = self.retry_backoff * 2**managed._failures
+                if _is_transient(e) and delay < self._remaining(managed):
+                    managed._failures += 1
+                    with self._lock:
+                        if id(managed) in self._tracked:
+                            self._wheel.schedule(id(managed), time.monotonic() + delay)
+                    return
+                managed.active = False
+                self._untrack(managed)
+
+    def close(self, release: bool = False):
+        """Stops the manager, optionally deleting every hold it still tracks."""
+        self._stopped.set()
+        self._thread.join()
+        if release:
+            with self._lock:
+                tracked = [managed for managed, _ in self._tracked.values()]
+            for managed in tracked:
+                try:
+                    managed.release()
+                except Exception as e:
+                    managed.error = e
+        self._executor.shutdown(wait=True)
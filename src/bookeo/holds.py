@@ -60,27 +60,35 @@ class BookeoHolds(BookeoAPI):
                 "customerId": customer_id,
                 "customer": customer,
                 "externalRef": external_ref,
-                "participants": participants.model_dump(),
-                "resources": [r.model_dump() for r in resources],
+                "participants": participants,
+                "resources": resources,
                 "sourceIp": source_ip,
                 "productId": product_id,
-                "options": [o.model_dump() for o in options],
+                "options": options,
                 "privateEvent": private_event,
-                "priceAdjustments": [pa.model_dump() for pa in price_adjustments],
-                "promotionCodeInput": ",".join(promotion_codes),
-                "giftVoucherCodeInput": ",".join(gift_voucher_codes),
-                "initialPayments": [ip.model_dump() for ip in initial_payments],
+                "priceAdjustments": price_adjustments,
+                "promotionCodeInput": ",".join(promotion_codes) or None,
+                "giftVoucherCodeInput": ",".join(gift_voucher_codes) or None,
+                "initialPayments": initial_payments,
                 "source": source,
             },
             method="POST",
         )
         if resp.status_code != 201:
             raise BookeoRequestException(
-                "Could not create specified hold.", resp.request.url
+                "Could not create specified hold.", resp.request.url, resp.status_code
             )
         location = resp.headers["Location"]
         data = resp.json()
-        return (location, BookeoHold(**data))
+        hold = BookeoHold(**data)
+        self._availability_changed(
+            product_id,
+            start_time,
+            end_time,
+            item_id=hold.id,
+            previous_item_id=previous_hold_id,
+        )
+        return (location, hold)
 
     def get_hold(self, id: str) -> BookeoHold:
         """Retrieves a previously-generated hold by its id."""
@@ -103,4 +111,5 @@ class BookeoHolds(BookeoAPI):
             raise BookeoRequestException(
                 f"Could not delete hold with id {id}.", resp.request.url
             )
+        self._availability_removed(id)
         return
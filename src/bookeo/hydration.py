@@ -0,0 +1,151 @@
+import math
+from datetime import timedelta
+from typing import TYPE_CHECKING, Iterable
+
+from .cache import BookeoLRUCache
+from .core import run_concurrently, time_windows
+from .schemas import BookeoBooking, BookeoCustomer
+
+if TYPE_CHECKING:
+    from .client import BookeoClient
+
+
+class BookeoCustomerHydrator:
+    """Fills in the customer of many bookings with as few requests as possible.
+
+    Customers already in the cache are used as they are. The others are
+    either read from a re-query of the bookings' period with expand_customer,
+    or fetched one by one on a thread pool, whichever takes fewer requests.
+    A re-query stops after its first pages if the period turns out to hold
+    too many other bookings. Every customer read is added to the cache, which
+    may be shared by several hydrators.
+    """
+
+    def __init__(
+        self,
+        client: "BookeoClient",
+        cache: BookeoLRUCache = None,
+        max_workers: int = 8,
+        items_per_page: int = 100,
+    ):
+        self.client = client
+        self.cache = cache if cache is not None else BookeoLRUCache(10000, ttl=300)
+        self.max_workers = max_workers
+        self.items_per_page = items_per_page
+
+    def hydrate(self, bookings: Iterable[BookeoBooking]) -> list[BookeoBooking]:
+        """Returns copies of bookings with their customer set.
+
+        Bookings that already have a customer, or have no customer_id, are
+        returned unchanged.
+        """
+        bookings = list(bookings)
+        wanted = {b.customer_id for b in bookings if b.customer is None} - {None}
+        customers = {}
+        for id in wanted:
+            customer = self.cache.get(id)
+            if customer is not None:
+                customers[id] = customer
+        missing = wanted - customers.keys()
+        if missing:
+            requery = [
+                b
+                for b in bookings
+                if b.customer_id in missing and b.start_time is not None
+            ]
+            if requery and self._requery_cost(requery) < len(missing):
+                customers.update(self._requery(requery, missing))
+            customers.update(self._fetch(missing - customers.keys()))
+        return [
+            (
+                b.model_copy(update={"customer": customers[b.customer_id]})
+                if b.customer is None and b.customer_id in customers
+                else b
+            )
+            for b in bookings
+        ]
+
+    def _windows(self, bookings: list[BookeoBooking]) -> list[tuple]:
+        start = min(b.start_time for b in bookings)
+        end = max(b.start_time for b in bookings) + timedelta(seconds=1)
+        return list(time_windows(start, end))
+
+    def _requery_cost(self, bookings: list[BookeoBooking]) -> int:
+        """Fewest requests a re-query can take, if nothing else was booked."""
+        return len(self._windows(bookings)) + math.ceil(
+            len(bookings) / self.items_per_page
+        )
+
+    def _requery(
+        self, bookings: list[BookeoBooking], missing: set[str]
+    ) -> dict[str, BookeoCustomer]:
+        """Reads the customers of bookings from a re-query of their period.
+
+        The first page of every window gives the real number of pages, which
+        may be far more than the bookings need when other products or
+        customers are booked too. The other pages are only read if that takes
+        fewer requests than fetching the customers still missing one by one.
+        """
+        products = {b.product_id for b in bookings}
+        product_id = products.pop() if len(products) == 1 else None
+        include_canceled = any(b.canceled for b in bookings)
+        customers = {}
+
+        def search(window: tuple, **page) -> tuple:
+            return self.client.bookings.get_bookings(
+                start_time=window[0],
+                end_time=window[1],
+                product_id=product_id,
+                include_canceled=include_canceled,
+                expand_customer=True,
+                items_per_page=self.items_per_page,
+                **page,
+            )
+
+        def collect(found: list[BookeoBooking]):
+            for booking in found:
+                if booking.customer is not None and booking.customer_id in missing:
+                    customers[booking.customer_id] = booking.customer
+
+        def rest(first: tuple) -> list[BookeoBooking]:
+            window, (_, pager) = first
+            found = []
+            nav_token = pager.page_navigation_token
+            page_number = pager.current_page
+            while page_number < pager.total_pages:
+                page_number += 1
+                page, pager = search(
+                    window, nav_token=nav_token, page_number=page_number
+                )
+                found.extend(page)
+                nav_token = pager.page_navigation_token or nav_token
+            return found
+
+        firsts = []
+        for window, page, error in run_concurrently(
+            search, self._windows(bookings), self.max_workers
+        ):
+            if error is not None:
+                raise error
+            collect(page[0])
+            firsts.append((window, page))
+        remaining = sum(p[-1].total_pages - p[-1].current_page for _, p in firsts)
+        if remaining < len(missing - customers.keys()):
+            for _, found, error in run_concurrently(rest, firsts, self.max_workers):
+                if error is not None:
+                    raise error
+                collect(found)
+        for id, customer in customers.items():
+            self.cache.put(id, customer)
+        return customers
+
+    def _fetch(self, ids: set[str]) -> dict[str, BookeoCustomer]:
+        customers = {}
+        for id, customer, error in run_concurrently(
+            self.client.customers.get_customer, sorted(ids), self.max_workers
+        ):
+            if error is not None:
+                raise error
+            customers[id] = customer
+            self.cache.put(id, customer)
+        return customers
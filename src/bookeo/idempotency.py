@@ -0,0 +1,225 @@
+import json
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from .bookings import BookeoBookings
+from .core import paginate
+from .request import BookeoRequestException
+from .schemas import BookeoBooking
+from .storage import BookeoSqlite
+
+
+class BookeoIdempotencyStore:
+    """Local record of booking requests by idempotency key.
+
+    A key is recorded as pending before its request is sent, and completed
+    with the resulting booking afterwards. While pending, the key is leased
+    to the caller sending the request; others wait for the lease to expire
+    before taking it over. Backed by SQLite, so one store can be shared by
+    every process on a host.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS requests (
+            key TEXT PRIMARY KEY,
+            started REAL NOT NULL,
+            owner TEXT,
+            lease_expires REAL,
+            location TEXT,
+            booking TEXT
+        );
+    """
+
+    def __init__(self, path: str):
+        self._db = BookeoSqlite(path, self._SCHEMA)
+
+    def begin(
+        self, key: str, owner: str, lease: float
+    ) -> tuple[str, float, Optional[str], Optional[BookeoBooking]]:
+        """Records key as pending and leases it to owner for lease seconds.
+
+        Returns the state of the key, the time it was first recorded, and the
+        location and booking if its request already completed. The state is
+        "new" for a key not seen before, "expired" when an earlier lease ran
+        out and owner took the key over, "pending" while another owner holds
+        a live lease, and "completed".
+        """
+        now = time.time()
+        with self._db.transaction() as conn:
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO requests (key, started, owner, lease_expires)"
+                " VALUES (?, ?, ?, ?)",
+                (key, now, owner, now + lease),
+            )
+            if cur.rowcount == 1:
+                return ("new", now, None, None)
+            started, current, expires, location, booking = conn.execute(
+                "SELECT started, owner, lease_expires, location, booking"
+                " FROM requests WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if booking is not None:
+                booking = BookeoBooking(**json.loads(booking))
+                return ("completed", started, location, booking)
+            if current != owner and expires is not None and expires > now:
+                return ("pending", started, None, None)
+            conn.execute(
+                "UPDATE requests SET owner = ?, lease_expires = ? WHERE key = ?",
+                (owner, now + lease, key),
+            )
+            return ("expired", started, None, None)
+
+    def renew(self, key: str, owner: str, lease: float) -> bool:
+        """Extends owner's lease on key; returns False if owner lost it."""
+        cur = self._db.execute(
+            "UPDATE requests SET lease_expires = ?"
+            " WHERE key = ? AND owner = ? AND booking IS NULL",
+            (time.time() + lease, key, owner),
+        )
+        return cur.rowcount == 1
+
+    def complete(self, key: str, location: Optional[str], booking: BookeoBooking):
+        data = booking.model_dump(mode="json", by_alias=True, exclude_none=True)
+        self._db.execute(
+            "UPDATE requests SET location = ?, booking = ?, owner = NULL,"
+            " lease_expires = NULL WHERE key = ?",
+            (location, json.dumps(data), key),
+        )
+
+    def forget(self, key: str, owner: str = None):
+        """Drops a key whose request definitely failed, so it can be sent again.
+
+        If owner is given, the key is only dropped while owner holds it.
+        """
+        if owner is None:
+            self._db.execute("DELETE FROM requests WHERE key = ?", (key,))
+        else:
+            self._db.execute(
+                "DELETE FROM requests WHERE key = ? AND owner = ? AND booking IS NULL",
+                (key, owner),
+            )
+
+
+def _is_definitive(error: Exception) -> bool:
+    """Whether a failed request certainly did not create the booking.
+
+    Only a 4xx response rules the booking out; any other error, including
+    one raised while reading a successful response, may follow a booking
+    that went through.
+    """
+    return (
+        isinstance(error, BookeoRequestException)
+        and error.status_code is not None
+        and 400 <= error.status_code < 500
+    )
+
+
+class BookeoIdempotentBookings:
+    """Creates bookings at most once per idempotency key.
+
+    The key is the booking's external_ref unless one is given explicitly, in
+    which case it is also sent as the external_ref. Before sending, the key is
+    recorded in the store and leased to this call for lease seconds, which
+    must exceed the client timeout so that the lease outlives the request. If
+    the booking completed earlier, it is returned without a request; while
+    another caller holds the lease, the store is polled until that caller
+    completes or its lease expires. The key is dropped only when the API
+    rejects the request with a 4xx status. After any other error, or when a
+    key is taken over from an expired lease, bookings changed since the key
+    was recorded are searched for its external_ref before anything is sent
+    again.
+    """
+
+    def __init__(
+        self,
+        bookings: BookeoBookings,
+        store: BookeoIdempotencyStore,
+        retries: int = 2,
+        lookup_margin: timedelta = timedelta(minutes=5),
+        lease: float = 120,
+        poll_interval: float = 0.5,
+    ):
+        timeout = bookings.client.timeout
+        if timeout is None or timeout >= lease:
+            raise ValueError(
+                f"The client timeout ({timeout}) must be set and shorter than the lease ({lease})."
+            )
+        self._bookings = bookings
+        self._store = store
+        self.retries = retries
+        self.lookup_margin = lookup_margin
+        self.lease = lease
+        self.poll_interval = poll_interval
+
+    def _find_existing(
+        self, key: str, product_id: str, started: float
+    ) -> Optional[BookeoBooking]:
+        since = datetime.fromtimestamp(started, timezone.utc) - self.lookup_margin
+        for booking in paginate(
+            self._bookings.get_bookings,
+            last_updated_start_time=since,
+            last_updated_end_time=datetime.now(timezone.utc) + self.lookup_margin,
+            product_id=product_id,
+            items_per_page=100,
+        ):
+            if booking.external_ref == key:
+                return booking
+        return None
+
+    def _claim(
+        self, key: str, owner: str
+    ) -> tuple[str, float, Optional[str], Optional[BookeoBooking]]:
+        """Begins key, waiting while another caller holds a live lease on it."""
+        while True:
+            claimed = self._store.begin(key, owner, self.lease)
+            if claimed[0] != "pending":
+                return claimed
+            time.sleep(self.poll_interval)
+
+    def create_booking(
+        self, idempotency_key: str = None, **kwargs: Any
+    ) -> tuple[Optional[str], BookeoBooking]:
+        """Creates a booking with BookeoBookings.create_booking, at most once per key.
+
+        When an earlier attempt turns out to have succeeded, the location is
+        the one recorded then, or None if the booking was found by searching.
+        """
+        key = idempotency_key or kwargs.get("external_ref")
+        if key is None:
+            raise TypeError("Either idempotency_key or external_ref is required.")
+        kwargs["external_ref"] = key
+        product_id = kwargs.get("product_id")
+        if product_id is None:
+            raise TypeError("product_id cannot be None.")
+
+        owner = uuid.uuid4().hex
+        state, started, location, booking = self._claim(key, owner)
+        if state == "completed":
+            return (location, booking)
+        # A key taken over from an expired lease may have gone through.
+        must_check = state == "expired"
+        for attempt in range(self.retries + 1):
+            if must_check:
+                booking = self._find_existing(key, product_id, started)
+                if booking is not None:
+                    self._store.complete(key, None, booking)
+                    return (None, booking)
+            if attempt and not self._store.renew(key, owner, self.lease):
+                # Our lease expired and another caller took the key over.
+                raise BookeoRequestException(
+                    f"Lost the lease on idempotency key {key} while retrying."
+                )
+            try:
+                location, booking = self._bookings.create_booking(**kwargs)
+            except Exception as e:
+                if _is_definitive(e):
+                    self._store.forget(key, owner)
+                    raise
+                if attempt == self.retries:
+                    raise
+                must_check = True
+                continue
+            self._store.complete(key, location, booking)
+            return (location, booking)
@@ -0,0 +1,266 @@
+import math
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Any, Hashable, Iterable, Iterator, Optional, Union
+
+from .schemas import BookeoMatchingSlot, BookeoSlot
+
+
+def _epoch(t: Union[datetime, float]) -> float:
+    return t.timestamp() if isinstance(t, datetime) else float(t)
+
+
+class BookeoIntervalIndex:
+    """Half-open intervals kept in arrays sorted by start time.
+
+    Two max segment trees over the sorted arrays, one of end times and one of
+    weights, find the intervals that start before a query ends and end after
+    it starts while skipping every subtree that cannot contain one. Overlap
+    queries take O((k + 1) log n) time, k being the number of overlapping
+    intervals, and next-interval queries O(log n). Each interval carries a
+    numeric weight, so "at least this weight" filters need no linear scan.
+
+    Inserting or removing an interval costs O(n) (it shifts the arrays and
+    rebuilds the segment trees on the next query); changing a weight costs
+    O(log n).
+    """
+
+    def __init__(self):
+        self._starts: list[float] = []
+        self._entries: list[tuple[float, int, float, Hashable]] = []
+        self._ends: list[float] = []
+        self._weights: list[float] = []
+        self._values: list[Any] = []
+        self._spans: dict[Hashable, tuple[float, float]] = {}
+        self._counter = 0
+        # Max segment trees over the weights and the end times.
+        self._tree: Optional[list[float]] = None
+        self._end_tree: Optional[list[float]] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._spans
+
+    def _position(self, key: Hashable) -> int:
+        start = self._spans[key][0]
+        i = bisect_left(self._starts, start)
+        while self._entries[i][3] != key:
+            i += 1
+        return i
+
+    def add(
+        self,
+        key: Hashable,
+        start: Union[datetime, float],
+        end: Union[datetime, float],
+        value: Any = None,
+        weight: float = 0,
+    ):
+        """Adds an interval, replacing any interval already stored under key."""
+        start, end = _epoch(start), _epoch(end)
+        if end < start:
+            raise ValueError("end cannot be before start.")
+        if key in self._spans:
+            current = self._spans[key]
+            if current == (start, end):
+                i = self._position(key)
+                self._values[i] = value
+                self.set_weight(key, weight)
+                return
+            self.remove(key)
+        # The counter keeps entries with equal starts in insertion order.
+        entry = (start, self._counter, end, key)
+        self._counter += 1
+        i = bisect_right(self._entries, entry)
+        self._entries.insert(i, entry)
+        self._starts.insert(i, start)
+        self._ends.insert(i, end)
+        self._weights.insert(i, weight)
+        self._values.insert(i, value)
+        self._spans[key] = (start, end)
+        self._tree = None
+
+    def remove(self, key: Hashable) -> Any:
+        """Removes the interval stored under key and returns its value."""
+        i = self._position(key)
+        del self._spans[key]
+        del self._entries[i]
+        del self._starts[i]
+        del self._ends[i]
+        del self._weights[i]
+        value = self._values.pop(i)
+        self._tree = None
+        return value
+
+    def set_weight(self, key: Hashable, weight: float):
+        i = self._position(key)
+        self._weights[i] = weight
+        if self._tree is not None:
+            node = self._size + i
+            self._tree[node] = weight
+            node //= 2
+            while node:
+                self._tree[node] = max(self._tree[2 * node], self._tree[2 * node + 1])
+                node //= 2
+
+    def _build_tree(self):
+        self._size = 1
+        while self._size < len(self._weights):
+            self._size *= 2
+
+        def build(leaves: list[float]) -> list[float]:
+            tree = [-math.inf] * (2 * self._size)
+            tree[self._size : self._size + len(leaves)] = leaves
+            for node in range(self._size - 1, 0, -1):
+                tree[node] = max(tree[2 * node], tree[2 * node + 1])
+            return tree
+
+        self._tree = build(self._weights)
+        self._end_tree = build(self._ends)
+
+    def _first_at_least(self, lo: int, hi: int, weight: float) -> int:
+        """Returns the first position in [lo, hi) with at least weight, or hi."""
+        if self._tree is None:
+            self._build_tree()
+        tree, size = self._tree, self._size
+        # Walk up from lo until a subtree on the right contains a match.
+        node = lo + size
+        if lo >= hi:
+            return hi
+        if tree[node] >= weight:
+            return lo
+        while True:
+            if node & 1 == 0 and tree[node + 1] >= weight:
+                node += 1
+                break
+            node //= 2
+            if node <= 1:
+                return hi
+        # Then walk down to the leftmost matching leaf.
+        while node < size:
+            node = 2 * node if tree[2 * node] >= weight else 2 * node + 1
+        return min(node - size, hi)
+
+    def _positions(
+        self, lo: int, hi: int, min_weight: Optional[float]
+    ) -> Iterator[int]:
+        if min_weight is None:
+            yield from range(lo, hi)
+            return
+        i = self._first_at_least(lo, hi, min_weight)
+        while i < hi:
+            yield i
+            i = self._first_at_least(i + 1, hi, min_weight)
+
+    def _ending_after(
+        self, hi: int, t: float, min_weight: Optional[float]
+    ) -> Iterator[int]:
+        """Yields the positions in [0, hi) of intervals ending after t, in order."""
+        if self._tree is None:
+            self._build_tree()
+        tree, end_tree, size = self._tree, self._end_tree, self._size
+        # (node, first position it covers), left subtrees popped first.
+        stack = [(1, 0)]
+        while stack:
+            node, lo = stack.pop()
+            if lo >= hi or end_tree[node] <= t:
+                continue
+            if min_weight is not None and tree[node] < min_weight:
+                continue
+            if node >= size:
+                yield lo
+                continue
+            half = size // (1 << node.bit_length())
+            stack.append((2 * node + 1, lo + half))
+            stack.append((2 * node, lo))
+
+    def overlapping(
+        self,
+        start: Union[datetime, float],
+        end: Union[datetime, float],
+        min_weight: float = None,
+    ) -> list[Any]:
+        """Returns the values of intervals overlapping [start, end), by start time."""
+        start, end = _epoch(start), _epoch(end)
+        # Intervals starting before start overlap if they end after it; those
+        # starting in [start, end) always do.
+        mid = bisect_left(self._starts, start)
+        hi = bisect_left(self._starts, end)
+        positions = list(self._ending_after(min(mid, hi), start, min_weight))
+        positions.extend(self._positions(mid, hi, min_weight))
+        return [self._values[i] for i in positions]
+
+    def next_after(
+        self, t: Union[datetime, float], min_weight: float = None
+    ) -> Optional[Any]:
+        """Returns the value of the first interval starting at or after t."""
+        lo = bisect_left(self._starts, _epoch(t))
+        for i in self._positions(lo, len(self._starts), min_weight):
+            return self._values[i]
+        return None
+
+    def items(self) -> Iterator[tuple[Hashable, Any]]:
+        """Yields (key, value) pairs ordered by start time."""
+        for entry, value in zip(self._entries, self._values):
+            yield (entry[3], value)
+
+
+Slot = Union[BookeoSlot, BookeoMatchingSlot]
+
+
+class BookeoSlotIndex:
+    """Index of availability slots for fast local queries.
+
+    Slots from product_availability_info carry their number of available
+    seats. Matching slots from search_open_slots do not, so they are indexed
+    with an unknown (-1) seat count and never satisfy a min_seats filter.
+    """
+
+    def __init__(self, slots: Iterable[Slot] = (), product_id: str = None):
+        self._index = BookeoIntervalIndex()
+        self.update(slots, product_id)
+
+    @staticmethod
+    def _key(slot: Slot, product_id: Optional[str]) -> tuple:
+        product_id = getattr(slot, "product_id", None) or product_id
+        return (product_id, slot.event_id, slot.start_time)
+
+    def update(self, slots: Iterable[Slot], product_id: str = None):
+        """Adds slots, or updates them if they are already indexed.
+
+        product_id is used for slots that do not name their own product.
+        """
+        for slot in slots:
+            seats = getattr(slot, "num_seats_available", None)
+            self._index.add(
+                self._key(slot, product_id),
+                slot.start_time,
+                slot.end_time,
+                slot,
+                -1 if seats is None else seats,
+            )
+
+    def remove(self, slots: Iterable[Slot], product_id: str = None):
+        for slot in slots:
+            key = self._key(slot, product_id)
+            if key in self._index:
+                self._index.remove(key)
+
+    def overlapping(
+        self, start_time: datetime, end_time: datetime, min_seats: int = None
+    ) -> list[Slot]:
+        """Returns slots overlapping the window, optionally with enough seats."""
+        return self._index.overlapping(start_time, end_time, min_seats)
+
+    def next_slot(self, after: datetime, min_seats: int = None) -> Optional[Slot]:
+        """Returns the first slot starting at or after the given time."""
+        return self._index.next_after(after, min_seats)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __iter__(self) -> Iterator[Slot]:
+        return (slot for _, slot in self._index.items())
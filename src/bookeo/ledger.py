@@ -0,0 +1,173 @@
+import json
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Optional
+
+from .core import paginate_windows
+from .payments import BookeoPayments
+from .schemas import BookeoPayment, BookeoPaymentMethod
+from .storage import BookeoSqlite
+
+
+class BookeoPaymentLedger:
+    """Durable local copy of the payments received, refreshed incrementally.
+
+    Payments are appended to a SQLite database and deduplicated by id, with
+    indexes on received time, customer and payment method so that finance
+    queries never go back to /payments. sync() only reads the payments
+    received since the end of the previous sync, minus an overlap for
+    payments recorded late.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS payments (
+            id TEXT PRIMARY KEY,
+            received_time REAL NOT NULL,
+            customer_id TEXT,
+            payment_method TEXT NOT NULL,
+            currency TEXT NOT NULL,
+            amount TEXT NOT NULL,
+            payment TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS payments_received_time ON payments (received_time);
+        CREATE INDEX IF NOT EXISTS payments_customer_id
+            ON payments (customer_id, received_time);
+        CREATE INDEX IF NOT EXISTS payments_payment_method
+            ON payments (payment_method, received_time);
+        CREATE TABLE IF NOT EXISTS sync (
+            id INTEGER PRIMARY KEY CHECK (id = 0),
+            synced_until REAL NOT NULL
+        );
+    """
+
+    def __init__(
+        self,
+        payments: BookeoPayments,
+        path: str,
+        overlap: timedelta = timedelta(days=1),
+    ):
+        self._api = payments
+        self._db = BookeoSqlite(path, self._SCHEMA)
+        self.overlap = overlap
+
+    @property
+    def synced_until(self) -> Optional[datetime]:
+        rows = self._db.query("SELECT synced_until FROM sync")
+        return datetime.fromtimestamp(rows[0][0], timezone.utc) if rows else None
+
+    def __len__(self) -> int:
+        return self._db.query("SELECT COUNT(*) FROM payments")[0][0]
+
+    def add(self, payments: list[BookeoPayment]) -> int:
+        """Appends payments not yet in the ledger; returns how many were new."""
+        rows = [
+            (
+                p.id,
+                p.received_time.timestamp(),
+                p.customer_id,
+                p.payment_method.value,
+                p.amount.currency,
+                p.amount.amount,
+                json.dumps(p.model_dump(mode="json", by_alias=True, exclude_none=True)),
+            )
+            for p in payments
+        ]
+        with self._db.transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO payments VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            return conn.total_changes - before
+
+    def refresh(self, start_time: datetime, end_time: datetime) -> int:
+        """Reads the payments received in a period; returns how many were new."""
+        added = 0
+        page = []
+        for payment in paginate_windows(
+            self._api.get_payments_received,
+            start_time,
+            end_time,
+            items_per_page=100,
+        ):
+            page.append(payment)
+            if len(page) == 1000:
+                added += self.add(page)
+                page = []
+        return added + self.add(page)
+
+    def sync(self, since: datetime = None) -> int:
+        """Reads the payments received since the last sync (or since since).
+
+        The first sync must be given since. Returns how many payments were new.
+        """
+        now = datetime.now(timezone.utc)
+        synced_until = self.synced_until
+        if synced_until is not None:
+            start_time = synced_until - self.overlap
+            if since is not None:
+                start_time = min(start_time, since)
+        elif since is not None:
+            start_time = since
+        else:
+            raise TypeError("since cannot be None before the first sync.")
+        added = self.refresh(start_time, now)
+        self._db.execute(
+            "INSERT OR REPLACE INTO sync VALUES (0, ?)", (now.timestamp(),)
+        )
+        return added
+
+    def _where(
+        self,
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+        customer_id: Optional[str],
+        payment_method: Optional[BookeoPaymentMethod],
+    ) -> tuple[str, tuple]:
+        clauses, params = [], []
+        if start_time is not None:
+            clauses.append("received_time >= ?")
+            params.append(start_time.timestamp())
+        if end_time is not None:
+            clauses.append("received_time < ?")
+            params.append(end_time.timestamp())
+        if customer_id is not None:
+            clauses.append("customer_id = ?")
+            params.append(customer_id)
+        if payment_method is not None:
+            clauses.append("payment_method = ?")
+            params.append(BookeoPaymentMethod(payment_method).value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return (where, tuple(params))
+
+    def payments(
+        self,
+        start_time: datetime = None,
+        end_time: datetime = None,
+        customer_id: str = None,
+        payment_method: BookeoPaymentMethod = None,
+    ) -> list[BookeoPayment]:
+        """Payments in the ledger matching every filter given, oldest first."""
+        where, params = self._where(start_time, end_time, customer_id, payment_method)
+        rows = self._db.query(
+            f"SELECT payment FROM payments {where} ORDER BY received_time, id", params
+        )
+        return [BookeoPayment(**json.loads(row[0])) for row in rows]
+
+    def totals_by_method(
+        self,
+        start_time: datetime = None,
+        end_time: datetime = None,
+        customer_id: str = None,
+    ) -> dict[tuple[str, str], Decimal]:
+        """Exact total of the matching payments per (payment method, currency)."""
+        where, params = self._where(start_time, end_time, customer_id, None)
+        totals = {}
+        for method, currency, amount in self._db.query(
+            f"SELECT payment_method, currency, amount FROM payments {where}", params
+        ):
+            key = (method, currency)
+            totals[key] = totals.get(key, Decimal(0)) + Decimal(amount)
+        return totals
+
+    def close(self):
+        self._db.close()
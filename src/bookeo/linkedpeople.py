@@ -0,0 +1,69 @@
+from typing import Iterable, Optional
+
+from .cache import BookeoLRUCache
+from .core import paginate, run_concurrently
+from .customers import BookeoCustomers
+from .schemas import BookeoLinkedPerson
+
+
+class BookeoLinkedPeopleLoader:
+    """Loads the linked people of many customers at once.
+
+    The people of each customer are read concurrently (following
+    pagination) and cached by customer id, so that building several rosters
+    with overlapping customers only reads each customer once.
+    """
+
+    def __init__(
+        self,
+        customers: BookeoCustomers,
+        cache: BookeoLRUCache = None,
+        max_workers: int = 8,
+        items_per_page: int = 100,
+    ):
+        self._api = customers
+        self.cache = cache if cache is not None else BookeoLRUCache(10000, ttl=300)
+        self.max_workers = max_workers
+        self.items_per_page = items_per_page
+
+    def _read(self, customer_id: str) -> list[BookeoLinkedPerson]:
+        return list(
+            paginate(
+                self._api.get_linked_people,
+                id=customer_id,
+                items_per_page=self.items_per_page,
+            )
+        )
+
+    def load(
+        self, customer_ids: Iterable[str], use_cached: bool = True
+    ) -> dict[str, list[BookeoLinkedPerson]]:
+        """Returns the linked people of every customer, by customer id."""
+        people = {}
+        missing = []
+        for id in dict.fromkeys(customer_ids):
+            cached = self.cache.get(id) if use_cached else None
+            if cached is not None:
+                people[id] = cached
+            else:
+                missing.append(id)
+        for id, found, error in run_concurrently(self._read, missing, self.max_workers):
+            if error is not None:
+                raise error
+            self.cache.put(id, found)
+            people[id] = found
+        return people
+
+    def get(self, customer_id: str, id: str) -> Optional[BookeoLinkedPerson]:
+        """Returns one linked person, reading the customer's people if needed."""
+        for person in self.load([customer_id])[customer_id]:
+            if person.id == id:
+                return person
+        return None
+
+    def invalidate(self, customer_id: str = None):
+        """Forgets the cached people of a customer, or of every customer."""
+        if customer_id is None:
+            self.cache.clear()
+        else:
+            self.cache.pop(customer_id)
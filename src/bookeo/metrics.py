@@ -0,0 +1,62 @@
+import bisect
+import math
+import threading
+
+
+class BookeoLatencyHistogram:
+    """Thread-safe histogram of latencies in seconds, with log-spaced buckets.
+
+    Bucket bounds grow by growth from min_latency up to max_latency, so
+    quantiles are accurate to within that factor. Slower observations fall in
+    a final overflow bucket.
+    """
+
+    def __init__(
+        self, min_latency: float = 0.001, max_latency: float = 120, growth: float = 1.2
+    ):
+        if min_latency <= 0 or max_latency <= min_latency or growth <= 1:
+            raise ValueError("Invalid histogram bounds.")
+        count = math.ceil(math.log(max_latency / min_latency, growth)) + 1
+        self.bounds = [min_latency * growth**i for i in range(count)]
+        self.counts = [0] * (count + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        i = bisect.bisect_left(self.bounds, seconds)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile (0 <= q <= 1)."""
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1.")
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = max(1, math.ceil(q * self.count))
+            seen = 0
+            for i, n in enumerate(self.counts):
+                seen += n
+                if seen >= rank and i < len(self.bounds):
+                    return min(self.bounds[i], self.max)
+        return self.max
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+        }
@@ -0,0 +1,144 @@
+from datetime import date, timezone, tzinfo
+from decimal import Decimal
+from functools import lru_cache
+from typing import Hashable, Iterable
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError(
+        "bookeo.money requires numpy; install it with `pip install bookeo[analytics]`."
+    ) from e
+
+from .schemas import BookeoBooking, BookeoMoney, BookeoPayment, BookeoPrice
+
+
+@lru_cache(maxsize=None)
+def currency_exponent(currency: str) -> int:
+    """Number of decimal places of a currency's minor unit (2 for USD)."""
+    import iso4217
+
+    return iso4217.Currency(currency).exponent or 0
+
+
+def to_minor_units(amount: str, exponent: int) -> int:
+    """Parses a decimal amount string exactly into an integer of minor units.
+
+    Raises ValueError if the amount has more decimal places than the
+    currency allows.
+    """
+    whole, _, fraction = amount.strip().partition(".")
+    extra = fraction[exponent:]
+    if extra.strip("0"):
+        raise ValueError(f"{amount} has more than {exponent} decimal places.")
+    return int(whole + fraction[:exponent].ljust(exponent, "0"))
+
+
+def from_minor_units(minor: int, exponent: int) -> Decimal:
+    return Decimal(int(minor)).scaleb(-exponent)
+
+
+class BookeoMoneyColumn:
+    """Many money amounts as fixed-point int64 minor units, with their currencies.
+
+    Totals and group-bys are computed on integer arrays, so they are exact
+    and never mix currencies.
+    """
+
+    def __init__(
+        self, minor: np.ndarray, currency_codes: np.ndarray, currencies: list[str]
+    ):
+        self.minor = minor
+        self.currency_codes = currency_codes
+        self.currencies = currencies
+
+    @classmethod
+    def from_money(cls, amounts: Iterable[BookeoMoney]) -> "BookeoMoneyColumn":
+        minor, codes, currencies = [], [], {}
+        for money in amounts:
+            code = currencies.setdefault(money.currency, len(currencies))
+            codes.append(code)
+            minor.append(
+                to_minor_units(money.amount, currency_exponent(money.currency))
+            )
+        return cls(
+            np.array(minor, np.int64),
+            np.array(codes, np.int64),
+            list(currencies),
+        )
+
+    def __len__(self) -> int:
+        return len(self.minor)
+
+    def _decimal(self, minor: int, code: int) -> Decimal:
+        return from_minor_units(minor, currency_exponent(self.currencies[code]))
+
+    def totals(self) -> dict[str, Decimal]:
+        """Total amount per currency."""
+        sums = np.zeros(len(self.currencies), np.int64)
+        np.add.at(sums, self.currency_codes, self.minor)
+        return {c: self._decimal(sums[i], i) for i, c in enumerate(self.currencies)}
+
+    def sum_by(self, keys: Iterable[Hashable]) -> dict[tuple[Hashable, str], Decimal]:
+        """Total amount per (key, currency); keys has one key per amount."""
+        groups: dict[Hashable, int] = {}
+        key_codes = np.fromiter(
+            (groups.setdefault(k, len(groups)) for k in keys), np.int64, len(self)
+        )
+        if not len(self):
+            return {}
+        combined = key_codes * len(self.currencies) + self.currency_codes
+        order = np.argsort(combined, kind="stable")
+        combined = combined[order]
+        starts = np.flatnonzero(np.r_[True, combined[1:] != combined[:-1]])
+        sums = np.add.reduceat(self.minor[order], starts)
+        group_keys = list(groups)
+        totals = {}
+        for group, total in zip(combined[starts], sums):
+            key_code, currency_code = divmod(int(group), len(self.currencies))
+            totals[(group_keys[key_code], self.currencies[currency_code])] = (
+                self._decimal(total, currency_code)
+            )
+        return totals
+
+
+def revenue_by_product(
+    bookings: Iterable[BookeoBooking],
+    field: str = "total_gross",
+    include_canceled: bool = False,
+) -> dict[tuple[str, str], Decimal]:
+    """Sum of a BookeoPrice field of bookings, per (product id, currency)."""
+    bookings = [
+        b
+        for b in bookings
+        if b.price is not None and (include_canceled or not b.canceled)
+    ]
+    column = BookeoMoneyColumn.from_money(getattr(b.price, field) for b in bookings)
+    return column.sum_by(b.product_id for b in bookings)
+
+
+def payments_by_method(
+    payments: Iterable[BookeoPayment],
+) -> dict[tuple[str, str], Decimal]:
+    """Sum of payments per (payment method, currency)."""
+    payments = list(payments)
+    column = BookeoMoneyColumn.from_money(p.amount for p in payments)
+    return column.sum_by(p.payment_method.value for p in payments)
+
+
+def payments_by_day(
+    payments: Iterable[BookeoPayment], tz: tzinfo = None
+) -> dict[tuple[date, str], Decimal]:
+    """Sum of payments per (day received, currency), in tz (default UTC)."""
+    payments = list(payments)
+    column = BookeoMoneyColumn.from_money(p.amount for p in payments)
+    return column.sum_by(
+        p.received_time.astimezone(tz or timezone.utc).date() for p in payments
+    )
+
+
+def tax_breakdown(prices: Iterable[BookeoPrice]) -> dict[tuple[str, str], Decimal]:
+    """Sum of taxes per (tax id, currency)."""
+    taxes = [t for price in prices for t in price.taxes]
+    column = BookeoMoneyColumn.from_money(t.amount for t in taxes)
+    return column.sum_by(t.tax_id for t in taxes)
@@ -0,0 +1,83 @@
+import threading
+import time
+
+
+class BookeoRateLimiter:
+    """Limits the rate and concurrency of requests made to the Bookeo API.
+
+    Requests draw from a token bucket that refills at ``requests_per_second``
+    and holds at most ``burst`` tokens, and at most ``max_concurrent``
+    requests may be in flight at once. One limiter may be shared by several
+    clients that use the same API key.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float = 10,
+        burst: int = None,
+        max_concurrent: int = 10,
+    ):
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second must be positive.")
+        self.requests_per_second = requests_per_second
+        self.burst = burst if burst is not None else max(1, int(requests_per_second))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._in_flight = 0
+        self._drained = threading.Condition(self._lock)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst,
+            self._tokens + (now - self._updated) * self.requests_per_second,
+        )
+        self._updated = now
+
+    def _take_token(self):
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self._in_flight += 1
+                    return
+                wait = (1 - self._tokens) / self.requests_per_second
+            time.sleep(wait)
+
+    def acquire(self):
+        """Blocks until a request may be sent."""
+        self._slots.acquire()
+        try:
+            self._take_token()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self):
+        """Marks a request acquired with acquire() as finished."""
+        with self._lock:
+            self._in_flight -= 1
+            if not self._in_flight:
+                self._drained.notify_all()
+        self._slots.release()
+
+    def idle(self) -> bool:
+        """True if no request is in flight and the bucket is full again."""
+        with self._lock:
+            self._refill()
+            return not self._in_flight and self._tokens >= self.burst
+
+    def drain(self, timeout: float = None) -> bool:
+        """Waits until no request is in flight; False if timeout expired first."""
+        with self._lock:
+            return self._drained.wait_for(lambda: not self._in_flight, timeout)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
@@ -0,0 +1,206 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+
+from .core import paginate, paginate_windows, run_concurrently, time_windows
+from .schemas import BookeoBooking, BookeoPayment
+
+if TYPE_CHECKING:
+    from .client import BookeoClient
+
+
+@dataclass
+class BookeoBookingBalance:
+    """Amounts due and paid for a booking, from its price and its payments."""
+
+    booking_number: str
+    customer_id: Optional[str]
+    currency: str
+    total_gross: Decimal
+    total_paid: Decimal
+    # Sum of the booking's payments, listed or matched by amount.
+    received: Decimal
+    canceled: bool = False
+
+    @property
+    def balance(self) -> Decimal:
+        """Amount still owed; negative when the booking is over-paid."""
+        return self.total_gross - self.total_paid
+
+
+@dataclass
+class BookeoReconciliation:
+    # Payment id -> booking number, for payments received in the period.
+    matched: dict[str, str] = field(default_factory=dict)
+    # Payments received in the period that belong to none of the bookings.
+    unmatched_payments: list[BookeoPayment] = field(default_factory=list)
+    # Payments listed for a booking and received in the period, but missing
+    # from the payments received, as (booking number, payment).
+    missing_payments: list[tuple[str, BookeoPayment]] = field(default_factory=list)
+    overpaid: list[BookeoBookingBalance] = field(default_factory=list)
+    underpaid: list[BookeoBookingBalance] = field(default_factory=list)
+    # Bookings whose total_paid differs from the sum of their payments.
+    paid_mismatch: list[BookeoBookingBalance] = field(default_factory=list)
+    # Likely owners of unmatched payments, as (payment id, booking number):
+    # bookings of the same customer whose balance equals the amount.
+    suggestions: list[tuple[str, str]] = field(default_factory=list)
+
+
+def _amount(money) -> Decimal:
+    return Decimal(money.amount)
+
+
+class BookeoPaymentReconciler:
+    """Matches the payments received in a period against bookings.
+
+    Both sides are streamed page by page, a 31-day window at a time: the
+    payments received, and the bookings changed in the period (or the
+    bookings given). A booking whose total paid equals the amount of exactly
+    one payment received from its customer, and no other booking of that
+    customer with the same amount, is matched to that payment directly. The
+    payments of every other booking with something paid are listed
+    concurrently and joined to the payments received by payment id; so are
+    those of a directly matched booking whose payment turns up in another
+    booking's list. Payments left over are joined to bookings with an
+    outstanding balance by customer id and amount.
+    """
+
+    def __init__(self, client: "BookeoClient", max_workers: int = 8):
+        self.client = client
+        self.max_workers = max_workers
+
+    def _booking_payments(self, booking_number: str) -> list[BookeoPayment]:
+        return list(
+            paginate(
+                self.client.bookings.get_received_payments,
+                booking_number=booking_number,
+                items_per_page=100,
+            )
+        )
+
+    def _list_payments(self, numbers: list[str]) -> dict[str, list[BookeoPayment]]:
+        listed = {}
+        for number, payments, error in run_concurrently(
+            self._booking_payments, numbers, self.max_workers
+        ):
+            if error is not None:
+                raise error
+            listed[number] = payments
+        return listed
+
+    def _changed_bookings(
+        self, start_time: datetime, end_time: datetime
+    ) -> Iterator[BookeoBooking]:
+        for window_start, window_end in time_windows(start_time, end_time):
+            yield from paginate(
+                self.client.bookings.get_bookings,
+                last_updated_start_time=window_start,
+                last_updated_end_time=window_end,
+                include_canceled=True,
+                items_per_page=100,
+            )
+
+    @staticmethod
+    def _match_by_amount(
+        bookings: list[BookeoBooking], received: dict[str, BookeoPayment]
+    ) -> dict[str, BookeoPayment]:
+        """Bookings paid by the only received payment of their customer and amount."""
+        by_key = {}
+        for payment in received.values():
+            key = (
+                payment.customer_id,
+                payment.amount.currency,
+                _amount(payment.amount),
+            )
+            by_key.setdefault(key, []).append(payment)
+        keys = {
+            b.booking_number: (
+                b.customer_id,
+                b.price.total_paid.currency,
+                _amount(b.price.total_paid),
+            )
+            for b in bookings
+            if b.customer_id is not None
+        }
+        counts = Counter(keys.values())
+        return {
+            number: by_key[key][0]
+            for number, key in keys.items()
+            if counts[key] == 1 and len(by_key.get(key, ())) == 1
+        }
+
+    def reconcile(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        bookings: Iterable[BookeoBooking] = None,
+    ) -> BookeoReconciliation:
+        """Reconciles the payments received between start_time and end_time."""
+        received = {
+            p.id: p
+            for p in paginate_windows(
+                self.client.payments.get_payments_received,
+                start_time,
+                end_time,
+                items_per_page=100,
+            )
+        }
+        if bookings is None:
+            bookings = self._changed_bookings(start_time, end_time)
+        priced = [b for b in bookings if b.price is not None]
+        paid = [b for b in priced if _amount(b.price.total_paid) != 0]
+        direct = self._match_by_amount(paid, received)
+        listed = self._list_payments(
+            [b.booking_number for b in paid if b.booking_number not in direct]
+        )
+        # A payment listed for another booking cannot be this one's.
+        claimed = {p.id for payments in listed.values() for p in payments}
+        doubtful = [n for n, p in direct.items() if p.id in claimed]
+        listed.update(self._list_payments(doubtful))
+        for number, payment in direct.items():
+            listed.setdefault(number, [payment])
+
+        result = BookeoReconciliation()
+        for booking in priced:
+            number = booking.booking_number
+            payments = listed.get(number, [])
+            price = booking.price
+            balance = BookeoBookingBalance(
+                number,
+                booking.customer_id,
+                price.total_gross.currency,
+                _amount(price.total_gross),
+                _amount(price.total_paid),
+                sum((_amount(p.amount) for p in payments), Decimal(0)),
+                bool(booking.canceled),
+            )
+            for payment in payments:
+                if payment.id in received:
+                    result.matched[payment.id] = number
+                elif start_time <= payment.received_time < end_time:
+                    result.missing_payments.append((number, payment))
+            if balance.received != balance.total_paid:
+                result.paid_mismatch.append(balance)
+            if balance.balance < 0 or (balance.canceled and balance.total_paid > 0):
+                result.overpaid.append(balance)
+            elif balance.balance > 0 and not balance.canceled:
+                result.underpaid.append(balance)
+
+        result.unmatched_payments = [
+            p for id, p in received.items() if id not in result.matched
+        ]
+        outstanding = {}
+        for balance in result.underpaid:
+            key = (balance.customer_id, balance.currency, balance.balance)
+            outstanding.setdefault(key, []).append(balance.booking_number)
+        for payment in result.unmatched_payments:
+            key = (
+                payment.customer_id,
+                payment.amount.currency,
+                _amount(payment.amount),
+            )
+            for number in outstanding.get(key, ()):
+                result.suggestions.append((payment.id, number))
+        return result
@@ -1,23 +1,27 @@
 import json
-from typing import Optional, Union
+from typing import TYPE_CHECKING, Optional, Union
 from urllib.parse import urljoin
 
-import requests
+from .encoding import JSON_CONTENT_TYPE, encode_body
 
-from .client import BookeoClient
+if TYPE_CHECKING:
+    import requests
+
+    from .client import BookeoClient
 
 
 class BookeoRequestException(Exception):
     """Class for errors relating to Bookeo API calls."""
 
-    def __init__(self, error_msg: str = "", url: str = None):
+    def __init__(self, error_msg: str = "", url: str = None, status_code: int = None):
         self.error_msg = error_msg
         self.url = url
+        self.status_code = status_code
 
     def __str__(self):
         if self.url is None:
             return f"{self.error_msg}"
-        return f"{self.error_msg} : {self.error_msg}"
+        return f"{self.error_msg} : {self.url}"
 
 
 class BookeoRequest:
@@ -25,43 +29,49 @@ class BookeoRequest:
 
     def __init__(
         self,
-        client: BookeoClient,
+        client: "BookeoClient",
         path: str,
-        params: dict,
-        data: Union[dict, str],
+        params: dict = None,
+        data: Union[dict, str] = None,
         method: str = "GET",
     ):
-        self.params = params
+        self.params = dict(params or {})
         self.params.update(client.query_dict())
-        self.data = data
-        if self.data is str:
-            self.data = json.loads(self.data)
-        self.host = client.base_url()
         self.headers = client.headers()
+        if isinstance(data, str):
+            data = json.loads(data)
+        self.data = None
+        if data is not None:
+            self.data = encode_body(data)
+            self.headers["Content-Type"] = JSON_CONTENT_TYPE
+        self.host = client.base_url()
+        self.rate_limiter = client.rate_limiter
+        self.timeout = client.timeout
+        self.session = client.session
         self.path = path
         self.method = method.upper()
         if self.method not in self._HTTP_METHODS:
             raise ValueError(f"{self.method} is not a valid HTTP method.")
 
-    def request(self) -> requests.Response:
+    def request(self) -> "requests.Response":
+        if self.rate_limiter is None:
+            return self._send()
+        with self.rate_limiter:
+            return self._send()
+
+    def _send(self) -> "requests.Response":
+        import requests
+
         url = urljoin(self.host, self.path)
-        match self.method:
-            case "GET":
-                return requests.get(
-                    url, params=self.params, headers=self.headers, data=self.data
-                )
-            case "POST":
-                return requests.post(
-                    url, params=self.params, headers=self.headers, data=self.data
-                )
-            case "PUT":
-                return requests.put(
-                    url, params=self.params, headers=self.headers, data=self.data
-                )
-            case "DELETE":
-                return requests.delete(
-                    url, params=self.params, headers=self.headers, data=self.data
-                )
+        transport = self.session if self.session is not None else requests
+        return transport.request(
+            self.method,
+            url,
+            params=self.params,
+            headers=self.headers,
+            data=self.data,
+            timeout=self.timeout,
+        )
 
 
 class BookeoRequestPager:
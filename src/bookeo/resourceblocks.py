@@ -21,11 +21,11 @@ class BookeoResourceBlocks(BookeoAPI):
         resp = self._request(
             "/resourceblocks",
             params={
-                "startTime": start_time,
-                "endTime": end_time,
-                "lastUpdatedStartTime": last_updated_start_time,
-                "lastUpdatedEndTime": last_updated_end_time,
-                "resource_id": resource_id,
+                "startTime": dt_to_bookeo_timestamp(start_time),
+                "endTime": dt_to_bookeo_timestamp(end_time),
+                "lastUpdatedStartTime": dt_to_bookeo_timestamp(last_updated_start_time),
+                "lastUpdatedEndTime": dt_to_bookeo_timestamp(last_updated_end_time),
+                "resourceId": resource_id,
                 "itemsPerPage": items_per_page,
                 "pageNavigationToken": nav_token,
                 "pageNumber": page_number,
@@ -61,7 +61,7 @@ class BookeoResourceBlocks(BookeoAPI):
                 "startTime": dt_to_bookeo_timestamp(start_time),
                 "endTime": dt_to_bookeo_timestamp(end_time),
                 "reason": reason,
-                "resources": [r.model_dump() for r in resources],
+                "resources": resources,
             },
             method="POST",
         )
@@ -71,7 +71,10 @@ class BookeoResourceBlocks(BookeoAPI):
             )
         location = resp.headers["Location"]
         data = resp.json()
-        return (location, BookeoResourceBlock(**data))
+        block = BookeoResourceBlock(**data)
+        # Resource blocks can affect any product that uses the resources.
+        self._availability_changed(None, start_time, end_time, item_id=block.id)
+        return (location, block)
 
     def get_resource_block(self, id: str) -> BookeoResourceBlock:
         """Retrieves a resource block by its id."""
@@ -106,7 +109,7 @@ class BookeoResourceBlocks(BookeoAPI):
                 "startTime": dt_to_bookeo_timestamp(start_time),
                 "endTime": dt_to_bookeo_timestamp(end_time),
                 "reason": reason,
-                "resources": [r.model_dump() for r in resources],
+                "resources": resources,
             },
             method="PUT",
         )
@@ -114,6 +117,9 @@ class BookeoResourceBlocks(BookeoAPI):
             raise BookeoRequestException(
                 f"Could not update resource block with id {id}.", resp.request.url
             )
+        self._availability_changed(
+            None, start_time, end_time, item_id=id, previous_item_id=id
+        )
         return
 
     def delete_resource_block(self, id: str) -> None:
@@ -125,4 +131,5 @@ class BookeoResourceBlocks(BookeoAPI):
             raise BookeoRequestException(
                 f"Could not delete resource block with id {id}", resp.request.url
             )
+        self._availability_removed(id)
         return
@@ -0,0 +1,241 @@
+import itertools
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from .core import paginate_windows
+from .intervals import BookeoIntervalIndex
+from .schemas import BookeoBooking, BookeoResource, BookeoResourceBlock
+
+if TYPE_CHECKING:
+    from .client import BookeoClient
+
+
+@dataclass
+class BookeoResourceConflict:
+    """A block or booking using a resource during a requested period."""
+
+    resource_id: str
+    # "block", "booking", or "pending" for a block being created or updated
+    # through the index.
+    kind: str
+    id: str
+    start_time: datetime
+    end_time: datetime
+
+
+class BookeoResourceConflictException(Exception):
+    """Raised when a resource block would overlap existing blocks or bookings."""
+
+    def __init__(self, error_msg: str, conflicts: list[BookeoResourceConflict]):
+        self.error_msg = error_msg
+        self.conflicts = conflicts
+
+    def __str__(self):
+        return self.error_msg
+
+
+class BookeoResourceIndex:
+    """Per-resource interval index of resource blocks and bookings.
+
+    load() fills the index for a period, and it is kept up to date by the
+    create_block, update_block and delete_block wrappers, by handle_webhook,
+    and by the add and remove methods. Overlap queries on a resource take
+    O((k + 1) log n) time for k overlapping items. The index is thread-safe.
+    The create and update wrappers check for conflicts and reserve the new
+    period as one step, then make the API call without holding the lock, so
+    concurrent blocks cannot both pass the check and queries are not blocked
+    by the request.
+    """
+
+    def __init__(self, client: "BookeoClient" = None):
+        self.client = client
+        self._lock = threading.RLock()
+        self._resources: dict[str, BookeoIntervalIndex] = {}
+        # (kind, id) -> ids of the resources it uses.
+        self._items: dict[tuple[str, str], list[str]] = {}
+        self._reservations = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _add(
+        self,
+        kind: str,
+        id: str,
+        start_time: datetime,
+        end_time: datetime,
+        resources: Iterable[BookeoResource],
+    ):
+        resource_ids = list(dict.fromkeys(r.id for r in resources))
+        conflict = (kind, id, start_time, end_time)
+        with self._lock:
+            self.remove(kind, id)
+            for resource_id in resource_ids:
+                index = self._resources.setdefault(resource_id, BookeoIntervalIndex())
+                index.add((kind, id), start_time, end_time, conflict)
+            self._items[(kind, id)] = resource_ids
+
+    def add_block(self, block: BookeoResourceBlock):
+        self._add("block", block.id, block.start_time, block.end_time, block.resources)
+
+    def add_booking(self, booking: BookeoBooking):
+        if booking.canceled or not booking.resources or booking.start_time is None:
+            self.remove("booking", booking.booking_number)
+            return
+        self._add(
+            "booking",
+            booking.booking_number,
+            booking.start_time,
+            booking.end_time or booking.start_time,
+            booking.resources,
+        )
+
+    def remove(self, kind: str, id: str):
+        with self._lock:
+            for resource_id in self._items.pop((kind, id), ()):
+                index = self._resources[resource_id]
+                index.remove((kind, id))
+                if not len(index):
+                    del self._resources[resource_id]
+
+    def load(self, start_time: datetime, end_time: datetime):
+        """Indexes the resource blocks and bookings of a period."""
+        for block in paginate_windows(
+            self.client.resourceblocks.get_resource_blocks,
+            start_time,
+            end_time,
+            items_per_page=100,
+        ):
+            self.add_block(block)
+        for booking in paginate_windows(
+            self.client.bookings.get_bookings,
+            start_time,
+            end_time,
+            items_per_page=100,
+        ):
+            self.add_booking(booking)
+
+    def conflicts(
+        self,
+        resources: Iterable[BookeoResource],
+        start_time: datetime,
+        end_time: datetime,
+        ignore_block: str = None,
+    ) -> list[BookeoResourceConflict]:
+        """Blocks and bookings that use any of resources during [start_time, end_time).
+
+        ignore_block excludes a block, typically the one being updated.
+        """
+        found = []
+        with self._lock:
+            for resource in resources:
+                index = self._resources.get(resource.id)
+                if index is None:
+                    continue
+                for kind, id, start, end in index.overlapping(start_time, end_time):
+                    if (kind == "block" and id == ignore_block) or not (
+                        start < end_time and end > start_time
+                    ):
+                        continue
+                    found.append(
+                        BookeoResourceConflict(resource.id, kind, id, start, end)
+                    )
+        return found
+
+    def _check(
+        self,
+        resources: list[BookeoResource],
+        start_time: datetime,
+        end_time: datetime,
+        ignore_block: str = None,
+    ):
+        conflicts = self.conflicts(resources, start_time, end_time, ignore_block)
+        if conflicts:
+            raise BookeoResourceConflictException(
+                f"Resource block would overlap {len(conflicts)} existing block(s) or booking(s).",
+                conflicts,
+            )
+
+    def create_block(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        resources: list[BookeoResource],
+        reason: str = None,
+        allow_conflicts: bool = False,
+    ) -> tuple[str, BookeoResourceBlock]:
+        """Creates a resource block after checking it against the index."""
+        reservation = self._reserve(
+            resources, start_time, end_time, None, allow_conflicts
+        )
+        try:
+            location, block = self.client.resourceblocks.create_new_resource_block(
+                start_time, end_time, resources, reason
+            )
+        except BaseException:
+            self.remove("pending", reservation)
+            raise
+        with self._lock:
+            self.remove("pending", reservation)
+            self.add_block(block)
+        return (location, block)
+
+    def update_block(
+        self,
+        id: str,
+        start_time: datetime,
+        end_time: datetime,
+        resources: list[BookeoResource],
+        reason: str = None,
+        allow_conflicts: bool = False,
+    ) -> None:
+        """Updates a resource block after checking it against the index."""
+        reservation = self._reserve(
+            resources, start_time, end_time, id, allow_conflicts
+        )
+        try:
+            self.client.resourceblocks.update_resource_block(
+                id, start_time, end_time, resources, reason
+            )
+        except BaseException:
+            self.remove("pending", reservation)
+            raise
+        with self._lock:
+            self.remove("pending", reservation)
+            self._add("block", id, start_time, end_time, resources)
+
+    def _reserve(
+        self,
+        resources: list[BookeoResource],
+        start_time: datetime,
+        end_time: datetime,
+        ignore_block: Optional[str],
+        allow_conflicts: bool,
+    ) -> str:
+        """Checks a block's period and holds it in the index until its request ends."""
+        with self._lock:
+            if not allow_conflicts:
+                self._check(resources, start_time, end_time, ignore_block)
+            reservation = str(next(self._reservations))
+            self._add("pending", reservation, start_time, end_time, resources)
+        return reservation
+
+    def delete_block(self, id: str) -> None:
+        self.client.resourceblocks.delete_resource_block(id)
+        self.remove("block", id)
+
+    def handle_webhook(self, payload: dict):
+        """Applies a Bookeo webhook notification for resource blocks or bookings."""
+        domain = payload.get("domain")
+        kind = {"resourceblocks": "block", "bookings": "booking"}.get(domain)
+        if kind is None:
+            return
+        item = payload.get("item")
+        if payload.get("type") == "deleted" or not item:
+            self.remove(kind, payload.get("itemId"))
+        elif kind == "block":
+            self.add_block(BookeoResourceBlock(**item))
+        else:
+            self.add_booking(BookeoBooking(**item))
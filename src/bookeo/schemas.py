@@ -1,8 +1,6 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
 
-import iso3166
-import iso4217
 from pydantic import (
     BaseModel,
     ConfigDict,
@@ -86,10 +84,11 @@ BookeoDatetime = Annotated[
 
 
 class BookeoSchema(BaseModel):
-    model_config = ConfigDict(alias_generator=alias_generators.to_camel)
-
-    class Config:
-        validate_schema: True
+    # Validators are built on first use rather than at import, so touching
+    # one API module does not pay for every schema.
+    model_config = ConfigDict(
+        alias_generator=alias_generators.to_camel, defer_build=True
+    )
 
 
 class BookeoAPIKeyInfo(BookeoSchema):
@@ -110,6 +109,8 @@ class BookeoPhoneNumber(BookeoSchema):
 
 
 def check_country_code(code: str):
+    import iso3166
+
     assert (
         iso3166.countries_by_alpha2.get(code) is not None
     ), f"{code} is not a valid ISO 3166-1 (alpha-2) country code."
@@ -226,14 +227,18 @@ class BookeoBookingLimit(BookeoSchema):
     max: int
 
 
-# TODO: Should there be a conversion from this class to timedelta?
 class BookeoDuration(BookeoSchema):
     days: int
     hours: int
     minutes: int
 
+    def to_timedelta(self) -> timedelta:
+        return timedelta(days=self.days, hours=self.hours, minutes=self.minutes)
+
 
 def check_currency(currency: str):
+    import iso4217
+
     assert (
         iso4217.Currency(currency) is not None
     ), f"{currency} is not a valid ISO 4217 currency code."
@@ -263,7 +268,7 @@ class BookeoPayment(BookeoSchema):
     gateway_name: str = None
     transaction_id: str = None
 
-    @model_validator(mode="before")
+    @model_validator(mode="after")
     def other_payment_method(self) -> Self:
         if self.payment_method == BookeoPaymentMethod.Other:
             assert (
@@ -399,6 +404,19 @@ class BookeoMatchingSlot(BookeoSchema):
     resources: list[BookeoResource] = None
 
 
+class BookeoSlot(BookeoSchema):
+    """An available slot of a product, as returned by /availability/slots."""
+
+    event_id: str
+    start_time: BookeoDatetime
+    end_time: BookeoDatetime
+    num_seats_available: int
+    product_id: str = None
+    price: BookeoMoney = None
+    course_schedule: BookeoCourseSchedule = None
+    resources: list[BookeoResource] = None
+
+
 class BookeoHold(BookeoSchema):
     id: str
     price: BookeoPrice
@@ -463,9 +481,9 @@ class BookeoParticipant(BookeoSchema):
     category_index: int = Field(ge=1)
     person_details: BookeoLinkedPerson = None
 
-    @model_validator(mode="before")
+    @model_validator(mode="after")
     def verify_person_details(self) -> Self:
-        if self.person_id not in ["PSELF", "PNEW" "PUNKNOWN"]:
+        if self.person_id not in ["PSELF", "PNEW", "PUNKNOWN"]:
             assert (
                 self.person_details is not None
             ), f"personDetails cannot be null when personId is known."
@@ -514,7 +532,7 @@ class BookeoBooking(BookeoSchema):
     customer_id: str = None
     customer: BookeoCustomer = None
     title: str
-    external_ref: HttpUrl = None
+    external_ref: str = None
     participants: BookeoParticipants
     resources: list[BookeoResource] = None
     canceled: bool = None
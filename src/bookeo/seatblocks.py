@@ -25,7 +25,7 @@ class BookeoSeatblocks(BookeoAPI):
                 "endTime": dt_to_bookeo_timestamp(end_time),
                 "lastUpdatedStartTime": dt_to_bookeo_timestamp(last_updated_start_time),
                 "lastUpdatedEndTime": dt_to_bookeo_timestamp(last_updated_end_time),
-                "productId": str(product_id),
+                "productId": product_id,
                 "itemsPerPage": items_per_page,
                 "pageNavigationToken": nav_token,
                 "pageNumber": page_number,
@@ -67,7 +67,14 @@ class BookeoSeatblocks(BookeoAPI):
             )
         location = resp.headers["Location"]
         data = resp.json()
-        return (location, BookeoSeatBlock(**data))
+        seat_block = BookeoSeatBlock(**data)
+        self._availability_changed(
+            product_id,
+            seat_block.start_time,
+            seat_block.start_time,
+            item_id=seat_block.id,
+        )
+        return (location, seat_block)
 
     def get_seat_block(self, id: str) -> BookeoSeatBlock:
         """Retrieves a seat block by its id."""
@@ -82,8 +89,15 @@ class BookeoSeatblocks(BookeoAPI):
         return BookeoSeatBlock(**data)
 
     def update_seat_block(
-        self, event_id: str, product_id: str, num_seats: int, reason: str = None
+        self,
+        id: str,
+        event_id: str,
+        product_id: str,
+        num_seats: int,
+        reason: str = None,
     ) -> tuple[str, BookeoSeatBlock]:
+        if id is None:
+            raise TypeError("id cannot be None.")
         if event_id is None:
             raise TypeError("event_id cannot be None.")
         if product_id is None:
@@ -106,7 +120,15 @@ class BookeoSeatblocks(BookeoAPI):
             )
         location = resp.headers["Location"]
         data = resp.json()
-        return (location, BookeoSeatBlock(**data))
+        seat_block = BookeoSeatBlock(**data)
+        self._availability_changed(
+            product_id,
+            seat_block.start_time,
+            seat_block.start_time,
+            item_id=id,
+            previous_item_id=id,
+        )
+        return (location, seat_block)
 
     def delete_seat_block(self, id: str) -> None:
         """Deletes a seat block."""
@@ -117,4 +139,5 @@ class BookeoSeatblocks(BookeoAPI):
             raise BookeoRequestException(
                 f"Could not delete seat block with id {id}.", resp.request.url
             )
+        self._availability_removed(id)
         return
@@ -1,3 +1,8 @@
+import hashlib
+from typing import TYPE_CHECKING, Any, Callable
+from urllib.parse import urlencode
+
+from .cache import BookeoSettingsCache
 from .core import BookeoAPI
 from .request import BookeoRequestException
 from .schemas import (
@@ -16,99 +21,136 @@ from .schemas import (
     BookeoTextField,
 )
 
+if TYPE_CHECKING:
+    from .client import BookeoClient
+
 
 class BookeoSettings(BookeoAPI):
+    def __init__(self, client: "BookeoClient"):
+        super().__init__(client)
+        self._cache = client.settings_cache
+        if self._cache is None:
+            self._cache = BookeoSettingsCache()
+        # Namespace cache keys by API key so that accounts never share entries.
+        self._namespace = hashlib.sha256(client._api_key.encode()).hexdigest()[:16]
 
-    def api_key_info(self, use_cached=True) -> BookeoAPIKeyInfo:
-        if not use_cached or self._api_key_info is None:
-            resp = self._request("/settings/apikeyinfo")
+    def _cached(
+        self,
+        item: str,
+        path: str,
+        error_msg: str,
+        parse: Callable[[Any], Any],
+        use_cached: bool = True,
+        params: dict = None,
+    ) -> Any:
+        """Fetches a settings endpoint through the settings cache."""
+
+        def fetch():
+            resp = self._request(path, params=params)
             if resp.status_code != 200:
-                raise BookeoRequestException(
-                    "Could not get API key information.", resp.request.url
-                )
-            data = resp.json()
-            self._api_key_info = BookeoAPIKeyInfo(**data)
-        return self._api_key_info
+                raise BookeoRequestException(error_msg, resp.request.url)
+            return resp.json()
+
+        return self._cache.get(
+            self._key(item, params), fetch, parse, force=not use_cached
+        )
+
+    def _key(self, item: str, params: dict = None) -> str:
+        key = f"{self._namespace}/{item}"
+        params = sorted((k, v) for k, v in (params or {}).items() if v is not None)
+        if params:
+            key += "/" + urlencode(params)
+        return key
+
+    def invalidate_cache(self, item: str = None):
+        """Drops cached settings, either for one item (e.g. "products") or all of them."""
+        prefix = f"{self._namespace}/"
+        if item is not None:
+            prefix += item
+        self._cache.invalidate(prefix)
+
+    def api_key_info(self, use_cached=True) -> BookeoAPIKeyInfo:
+        return self._cached(
+            "apikeyinfo",
+            "/settings/apikeyinfo",
+            "Could not get API key information.",
+            lambda data: BookeoAPIKeyInfo(**data),
+            use_cached,
+        )
 
     def business_info(self, use_cached=True) -> BookeoBusinessInfo:
-        if not use_cached or self._business_info is None:
-            resp = self._request("/settings/business")
-            if resp.status_code != 200:
-                raise BookeoRequestException(
-                    "Could not get business information.", resp.request.url
-                )
-            data = resp.json()
-            self._business_info = BookeoBusinessInfo(**data)
-        return self._business_info
+        return self._cached(
+            "business",
+            "/settings/business",
+            "Could not get business information.",
+            lambda data: BookeoBusinessInfo(**data),
+            use_cached,
+        )
 
-    def _fetch_customer_participant_info(self):
-        resp = self._request("/settings/customercustomfields")
-        if resp.status_code != 200:
-            raise BookeoRequestException(
-                "Unable to fetch custom field information.", resp.request.url
-            )
-        self._custom_fields = resp.json()
+    def _custom_fields(self, use_cached: bool) -> dict[str, list]:
+        return self._cached(
+            "customfields",
+            "/settings/customercustomfields",
+            "Unable to fetch custom field information.",
+            lambda data: {
+                "choiceFields": [
+                    BookeoChoiceField(**f) for f in data.get("choiceFields", [])
+                ],
+                "numberFields": [
+                    BookeoNumberField(**f) for f in data.get("numberFields", [])
+                ],
+                "onOffFields": [
+                    BookeoOnOffField(**f) for f in data.get("onOffFields", [])
+                ],
+                "textFields": [
+                    BookeoTextField(**f) for f in data.get("textFields", [])
+                ],
+            },
+            use_cached,
+        )
 
     def get_choice_fields(self, use_cached=True) -> list[BookeoChoiceField]:
-        if not use_cached or self._choice_fields is None:
-            self._fetch_customer_participant_info()
-            fields = self._custom_fields.get("choiceFields")
-            self._choice_fields = [BookeoChoiceField(**f) for f in fields]
-        return self._choice_fields
+        return self._custom_fields(use_cached)["choiceFields"]
 
     def get_number_fields(self, use_cached=True) -> list[BookeoNumberField]:
-        if not use_cached or self._number_fields is None:
-            self._fetch_customer_participant_info()
-            fields = self._custom_fields.get("numberFields")
-            self._number_fields = [BookeoNumberField(**f) for f in fields]
-        return self._number_fields
+        return self._custom_fields(use_cached)["numberFields"]
 
     def get_onoff_fields(self, use_cached=True) -> list[BookeoOnOffField]:
-        if not use_cached or self._onoff_fields is None:
-            self._fetch_customer_participant_info()
-            fields = self._custom_fields.get("onOffFields")
-            self._onoff_fields = [BookeoOnOffField(**f) for f in fields]
-        return self._onoff_fields
+        return self._custom_fields(use_cached)["onOffFields"]
 
     def get_text_fields(self, use_cached=True) -> list[BookeoTextField]:
-        if not use_cached or self._text_fields is None:
-            self._fetch_customer_participant_info()
-            fields = self._custom_fields.get("textFields")
-            self._text_fields = [BookeoTextField(**f) for f in fields]
-        return self._text_fields
+        return self._custom_fields(use_cached)["textFields"]
 
     def get_langs(self, use_cached=True) -> list[BookeoLanguage]:
-        if not use_cached or self._languages is None:
-            resp = self._request("/settings/languages")
-            if resp.status_code != 200:
-                raise BookeoRequestException(
-                    "Could not get supported languages.", resp.request.url
-                )
-            self._languages = [BookeoLanguage(**lang) for lang in resp.json()]
-        return self._languages
+        return self._cached(
+            "languages",
+            "/settings/languages",
+            "Could not get supported languages.",
+            lambda data: [BookeoLanguage(**lang) for lang in data],
+            use_cached,
+        )
 
     def get_people_categories(self, use_cached=True) -> list[BookeoPeopleCategory]:
-        if not use_cached or self._people_categories is None:
-            resp = self._request("/settings/peoplecategories")
-            if resp.status_code != 200:
-                raise BookeoRequestException(
-                    "Could not get people categories.", resp.request.url
-                )
-            self._people_categories = [BookeoPeopleCategory(**c) for c in resp.json()]
-        return self._people_categories
+        return self._cached(
+            "peoplecategories",
+            "/settings/peoplecategories",
+            "Could not get people categories.",
+            lambda data: [BookeoPeopleCategory(**c) for c in data],
+            use_cached,
+        )
 
-    def get_products(
+    def _products_page(
         self,
         product_type: BookeoProductType = None,
         items_per_page: int = None,
         nav_token: str = None,
         page_number: int = None,
         lang: str = None,
-    ) -> tuple[list[BookeoProduct], BookeoPagination]:
+    ) -> dict:
         resp = self._request(
             "/settings/products",
             params={
-                "type": product_type.value,
+                "type": product_type.value if product_type is not None else None,
                 "itemsPerPage": items_per_page,
                 "pageNavigationToken": nav_token,
                 "pageNumber": page_number,
@@ -119,30 +161,81 @@ class BookeoSettings(BookeoAPI):
             raise BookeoRequestException(
                 "Could not get available products.", resp.request.url
             )
-        data = resp.json()
+        return resp.json()
+
+    def get_products(
+        self,
+        product_type: BookeoProductType = None,
+        items_per_page: int = None,
+        nav_token: str = None,
+        page_number: int = None,
+        lang: str = None,
+    ) -> tuple[list[BookeoProduct], BookeoPagination]:
+        """Returns one page of products; pages are never cached.
+
+        Navigation tokens are short-lived, so use all_products() for a cached
+        listing.
+        """
+        data = self._products_page(
+            product_type, items_per_page, nav_token, page_number, lang
+        )
         products = [BookeoProduct(**p) for p in data["data"]]
-        info = data["info"]
-        pager = BookeoPagination(**info)
-        return (products, pager)
+        return (products, BookeoPagination(**data["info"]))
 
-    def get_resources(self) -> tuple[list[BookeoProduct], BookeoPagination]:
-        resp = self._request("/settings/resources")
-        if resp.status_code != 200:
-            raise BookeoRequestException("Could not get resources.", resp.request.url)
-        data = resp.json()
-        resources = [BookeoResource(**p) for p in data["data"]]
-        info = data["info"]
-        pager = BookeoPagination(**info)
-        return (resources, pager)
-
-    def get_taxes(self) -> tuple[list[BookeoTax], BookeoPagination]:
-        resp = self._request("/settings/taxes")
-        if resp.status_code != 200:
-            raise BookeoRequestException(
-                "Could not get applicable taxes.", resp.request.url
-            )
-        data = resp.json()
-        taxes = [BookeoTax(**t) for t in data["data"]]
-        info = data["info"]
-        pager = BookeoPagination(**info)
-        return (taxes, pager)
+    def all_products(
+        self,
+        product_type: BookeoProductType = None,
+        lang: str = None,
+        use_cached=True,
+    ) -> list[BookeoProduct]:
+        """Returns every product, caching the assembled list as one entry."""
+
+        def fetch():
+            data = self._products_page(product_type, 100, lang=lang)
+            products = list(data["data"])
+            info = data["info"]
+            nav_token = info.get("pageNavigationToken")
+            for page_number in range(info["currentPage"] + 1, info["totalPages"] + 1):
+                data = self._products_page(
+                    product_type, 100, nav_token, page_number, lang
+                )
+                products.extend(data["data"])
+                nav_token = data["info"].get("pageNavigationToken") or nav_token
+            return products
+
+        params = {
+            "type": product_type.value if product_type is not None else None,
+            "lang": lang,
+        }
+        return self._cache.get(
+            self._key("products", params),
+            fetch,
+            lambda data: [BookeoProduct(**p) for p in data],
+            force=not use_cached,
+        )
+
+    def get_resources(
+        self, use_cached=True
+    ) -> tuple[list[BookeoResource], BookeoPagination]:
+        return self._cached(
+            "resources",
+            "/settings/resources",
+            "Could not get resources.",
+            lambda data: (
+                [BookeoResource(**r) for r in data["data"]],
+                BookeoPagination(**data["info"]),
+            ),
+            use_cached,
+        )
+
+    def get_taxes(self, use_cached=True) -> tuple[list[BookeoTax], BookeoPagination]:
+        return self._cached(
+            "taxes",
+            "/settings/taxes",
+            "Could not get applicable taxes.",
+            lambda data: (
+                [BookeoTax(**t) for t in data["data"]],
+                BookeoPagination(**data["info"]),
+            ),
+            use_cached,
+        )
@@ -0,0 +1,230 @@
+import threading
+import time
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from .availability import BookeoAvailability
+from .cache import BookeoLRUCache
+from .schemas import (
+    BookeoBookingOption,
+    BookeoMatchingSlot,
+    BookeoPagination,
+    BookeoPeopleNumber,
+    BookeoResource,
+)
+
+
+def search_key(
+    product_id: str,
+    start_time: datetime,
+    end_time: datetime,
+    people_numbers: Iterable[BookeoPeopleNumber],
+    options: Iterable[BookeoBookingOption] = (),
+    resources: Iterable[BookeoResource] = (),
+    mode: str = None,
+    items_per_page: int = None,
+) -> tuple:
+    """Returns a key that is equal for searches that must have equal results.
+
+    People numbers are summed by category (zero counts dropped), and options
+    and resources are compared by every field they are sent with, regardless
+    of their order.
+    """
+    people = {}
+    for p in people_numbers:
+        people[p.people_category_id] = people.get(p.people_category_id, 0) + p.number
+    return (
+        product_id,
+        start_time.timestamp(),
+        end_time.timestamp(),
+        tuple(sorted((c, n) for c, n in people.items() if n > 0)),
+        tuple(sorted(o.model_dump_json(exclude_none=True) for o in options)),
+        tuple(sorted(r.model_dump_json(exclude_none=True) for r in resources)),
+        mode,
+        items_per_page,
+    )
+
+
+def _slot_key(slot: BookeoMatchingSlot) -> tuple:
+    return (
+        slot.event_id,
+        slot.start_time,
+        slot.end_time,
+        tuple(r.id for r in slot.resources or ()),
+    )
+
+
+class BookeoSlotSearch:
+    """A matching-slot search whose pages are fetched lazily and kept.
+
+    The search's navigation token is reused until token_ttl seconds after it
+    was issued; after that, the search is started again on the server and
+    the pages fetched so far are dropped.
+    """
+
+    def __init__(
+        self,
+        availability: BookeoAvailability,
+        token_ttl: float,
+        product_id: str,
+        start_time: datetime,
+        end_time: datetime,
+        people_numbers: list[BookeoPeopleNumber],
+        options: list[BookeoBookingOption] = [],
+        resources: list[BookeoResource] = [],
+        mode: str = None,
+        items_per_page: int = None,
+    ):
+        self._availability = availability
+        self._token_ttl = token_ttl
+        self._search_args = dict(
+            product_id=product_id,
+            start_time=start_time,
+            end_time=end_time,
+            people_numbers=people_numbers,
+            options=options,
+            resources=resources,
+            mode=mode,
+            items_per_page=items_per_page,
+        )
+        self._lock = threading.Lock()
+        self._pages: dict[int, list[BookeoMatchingSlot]] = {}
+        self._nav_token: Optional[str] = None
+        self._token_expires = 0.0
+        self._pager: Optional[BookeoPagination] = None
+        # Number of times the search was started on the server.
+        self._generation = 0
+
+    def _start(self):
+        slots, _, pager = self._availability.search_open_slots(**self._search_args)
+        self._nav_token = pager.page_navigation_token
+        self._token_expires = time.monotonic() + self._token_ttl
+        self._pager = pager
+        self._pages = {1: slots}
+        self._generation += 1
+
+    def expired(self) -> bool:
+        """Whether the navigation token can no longer be used."""
+        return self._pager is not None and time.monotonic() >= self._token_expires
+
+    def page(self, page_number: int) -> list[BookeoMatchingSlot]:
+        """Returns one page of matching slots, fetching it if necessary."""
+        return self._page(page_number)[0]
+
+    def _page(self, page_number: int) -> tuple[list[BookeoMatchingSlot], int, int]:
+        """Returns a page with the generation of the search and its page count."""
+        with self._lock:
+            if self._pager is None or self.expired():
+                self._start()
+            if page_number not in self._pages:
+                if page_number < 1 or page_number > self._pager.total_pages:
+                    raise IndexError(f"Search has no page {page_number}.")
+                slots, pager = self._availability.nav_slot_search(
+                    self._nav_token, page_number
+                )
+                self._pager = pager
+                self._pages[page_number] = slots
+            return (
+                self._pages[page_number],
+                self._generation,
+                self._pager.total_pages,
+            )
+
+    @property
+    def total_pages(self) -> int:
+        self.page(1)
+        return self._pager.total_pages
+
+    def __len__(self) -> int:
+        self.page(1)
+        return self._pager.total_items
+
+    def __iter__(self) -> Iterator[BookeoMatchingSlot]:
+        """Yields every matching slot, fetching pages only as they are reached.
+
+        If the search is started again while iterating, the new search is read
+        from its first page, skipping the slots already yielded.
+        """
+        seen = set()
+        generation = None
+        page_number = 1
+        while True:
+            slots, current, total_pages = self._page(page_number)
+            if page_number > 1 and current != generation:
+                # Pages of two server searches must not be mixed.
+                generation = current
+                page_number = 1
+                continue
+            generation = current
+            for slot in slots:
+                key = _slot_key(slot)
+                if key not in seen:
+                    seen.add(key)
+                    yield slot
+            if page_number >= total_pages:
+                return
+            page_number += 1
+
+
+class BookeoSlotSearches:
+    """Shares matching-slot searches between callers that ask the same question.
+
+    Searches are keyed by search_key() and kept in an LRU cache of at most
+    max_searches entries. A search is dropped from the cache once its
+    navigation token expires, so that results are never older than token_ttl.
+    """
+
+    def __init__(
+        self,
+        availability: BookeoAvailability,
+        max_searches: int = 256,
+        token_ttl: float = 600,
+    ):
+        self._availability = availability
+        self._token_ttl = token_ttl
+        self._searches = BookeoLRUCache(max_searches)
+        self._lock = threading.Lock()
+
+    def search(
+        self,
+        product_id: str,
+        start_time: datetime,
+        end_time: datetime,
+        people_numbers: list[BookeoPeopleNumber],
+        options: list[BookeoBookingOption] = [],
+        resources: list[BookeoResource] = [],
+        mode: str = None,
+        items_per_page: int = None,
+    ) -> BookeoSlotSearch:
+        """Returns a live search for the parameters, reusing one if possible."""
+        key = search_key(
+            product_id,
+            start_time,
+            end_time,
+            people_numbers,
+            options,
+            resources,
+            mode,
+            items_per_page,
+        )
+        with self._lock:
+            search = self._searches.get(key)
+            if search is None or search.expired():
+                search = BookeoSlotSearch(
+                    self._availability,
+                    self._token_ttl,
+                    product_id,
+                    start_time,
+                    end_time,
+                    people_numbers,
+                    options,
+                    resources,
+                    mode,
+                    items_per_page,
+                )
+                self._searches.put(key, search)
+        return search
+
+    def clear(self):
+        """Forgets every search, e.g. after availability has changed."""
+        self._searches.clear()
@@ -0,0 +1,59 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class BookeoSqlite:
+    """SQLite connection that is safe to share between threads and across forks.
+
+    The connection is opened lazily, reopened in a child process after a fork
+    (SQLite connections must not cross one), and runs schema (a script of
+    CREATE ... IF NOT EXISTS statements) when it is opened.
+    """
+
+    def __init__(self, path: str, schema: str = ""):
+        self.path = path
+        self.schema = schema
+        self.lock = threading.RLock()
+        self._pid = None
+        self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            self._conn = sqlite3.connect(
+                self.path, timeout=30, isolation_level=None, check_same_thread=False
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(self.schema)
+            self._pid = os.getpid()
+        return self._conn
+
+    def execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self.lock:
+            return self._connection().execute(sql, params)
+
+    def query(self, sql: str, params: tuple = ()) -> list[tuple]:
+        with self.lock:
+            return self._connection().execute(sql, params).fetchall()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Runs the enclosed statements atomically, holding the write lock."""
+        with self.lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def close(self):
+        with self.lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+            self._pid = None
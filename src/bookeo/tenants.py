@@ -0,0 +1,251 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Callable, Iterator
+
+from .client import BookeoClient, BookeoClientException
+from .core import paginate
+from .ratelimit import BookeoRateLimiter
+from .schemas import BookeoSubaccount
+
+if TYPE_CHECKING:
+    import requests
+
+
+class BookeoClientPool:
+    """Per-subaccount clients created on demand over one shared connection pool.
+
+    Every client uses the same requests.Session, so the number of open
+    sockets is bounded by max_connections rather than by the number of
+    subaccounts. At most max_tenants clients are kept; the least recently
+    used ones, and those unused for idle_ttl seconds, are dropped and
+    rebuilt when next needed. Each API key has its own BookeoRateLimiter,
+    kept apart from the clients so that rebuilding a client does not reset
+    the key's budget; the limiter of a dropped client is dropped too once
+    it is idle, since a fresh one then behaves the same.
+
+    API keys come from api_keys (subaccount id -> API key) or, for
+    subaccounts without one, are created through parent, the client of the
+    portal account. Only one key is created at a time per subaccount;
+    concurrent callers wait for it.
+    """
+
+    def __init__(
+        self,
+        secret_key: str,
+        api_keys: dict[str, str] = None,
+        parent: BookeoClient = None,
+        max_tenants: int = 256,
+        idle_ttl: float = 600,
+        max_connections: int = 32,
+        rate_limiter_factory: Callable[[], BookeoRateLimiter] = None,
+        timeout: float = None,
+        session: "requests.Session" = None,
+    ):
+        if secret_key is None:
+            raise TypeError("secret_key cannot be None.")
+        self._secret_key = secret_key
+        self._api_keys = dict(api_keys or {})
+        self.parent = parent
+        self.max_tenants = max_tenants
+        self.idle_ttl = idle_ttl
+        self.rate_limiter_factory = rate_limiter_factory or BookeoRateLimiter
+        self.timeout = timeout
+        self._owns_session = session is None
+        self.session = session if session is not None else _session(max_connections)
+        self._lock = threading.Lock()
+        # subaccount id -> (last used, client), least recently used first.
+        self._clients: OrderedDict[str, tuple[float, BookeoClient]] = OrderedDict()
+        # API key -> its limiter, shared by every client built for the key.
+        self._limiters: dict[str, BookeoRateLimiter] = {}
+        # subaccount id -> the new API key being created for it.
+        self._creating: dict[str, Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def __contains__(self, account_id: str) -> bool:
+        return account_id in self._clients
+
+    @property
+    def api_keys(self) -> dict[str, str]:
+        """Copy of the known API keys, by subaccount id, for persisting."""
+        with self._lock:
+            return dict(self._api_keys)
+
+    def _evict(self, now: float):
+        evicted = False
+        while self._clients:
+            account_id, (used, _) = next(iter(self._clients.items()))
+            if len(self._clients) <= self.max_tenants and now - used <= self.idle_ttl:
+                break
+            del self._clients[account_id]
+            evicted = True
+        if evicted:
+            self._prune_limiters()
+
+    def _prune_limiters(self):
+        """Drops the idle limiters of keys that have no client."""
+        in_use = {self._api_keys.get(account_id) for account_id in self._clients}
+        for api_key, limiter in list(self._limiters.items()):
+            if api_key not in in_use and limiter.idle():
+                del self._limiters[api_key]
+
+    def client(self, account_id: str) -> BookeoClient:
+        """Returns the client of a subaccount, creating it (and its key) if needed."""
+        if account_id is None:
+            raise TypeError("account_id cannot be None.")
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                entry = self._clients.get(account_id)
+                api_key = self._api_keys.get(account_id)
+                if entry is not None or api_key is not None:
+                    client = entry[1] if entry is not None else self._build(api_key)
+                    self._clients[account_id] = (now, client)
+                    self._clients.move_to_end(account_id)
+                    self._evict(now)
+                    return client
+            # No key yet: create one, or wait for the caller creating it,
+            # then look the client up again.
+            self._new_key(account_id)
+
+    __getitem__ = client
+
+    def _build(self, api_key: str) -> BookeoClient:
+        limiter = self._limiters.get(api_key)
+        if limiter is None:
+            limiter = self._limiters[api_key] = self.rate_limiter_factory()
+        return BookeoClient(
+            self._secret_key,
+            api_key,
+            rate_limiter=limiter,
+            timeout=self.timeout,
+            session=self.session,
+        )
+
+    def _new_key(self, account_id: str, replace: str = None) -> tuple[str, bool]:
+        """Creates an API key for a subaccount and records it.
+
+        If another thread is already creating one for the subaccount, waits
+        for it and returns its key instead. replace is the key being rotated
+        out, if any. Returns the key and whether this call created it.
+        """
+        with self._lock:
+            future = self._creating.get(account_id)
+            owner = future is None
+            if owner:
+                future = self._creating[account_id] = Future()
+        if not owner:
+            return (future.result(), False)
+        try:
+            api_key = self._create_key(account_id)
+        except BaseException as e:
+            with self._lock:
+                del self._creating[account_id]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._creating[account_id]
+            self._api_keys[account_id] = api_key
+            self._clients.pop(account_id, None)
+            if replace is not None:
+                self._limiters.pop(replace, None)
+        future.set_result(api_key)
+        return (api_key, True)
+
+    def _create_key(self, account_id: str) -> str:
+        if self.parent is None:
+            raise BookeoClientException(
+                f"No API key for subaccount {account_id} and no parent client to create one."
+            )
+        location = self.parent.subaccounts.create_new_subaccount_key(account_id)
+        # The Location header is the URL of the new key.
+        return location.rstrip("/").rsplit("/", 1)[-1]
+
+    def set_key(self, account_id: str, api_key: str):
+        """Records a subaccount's API key, replacing its client if the key changed."""
+        if account_id is None:
+            raise TypeError("account_id cannot be None.")
+        if api_key is None:
+            raise TypeError("api_key cannot be None.")
+        with self._lock:
+            old_key = self._api_keys.get(account_id)
+            if old_key != api_key:
+                self._api_keys[account_id] = api_key
+                self._clients.pop(account_id, None)
+                self._limiters.pop(old_key, None)
+
+    def rotate_key(
+        self, account_id: str, delete_old: bool = True, drain_timeout: float = 60
+    ) -> str:
+        """Creates a new API key for a subaccount and switches its client to it.
+
+        Unless delete_old is False, the old key is then uninstalled, once the
+        requests in flight with it have finished or after drain_timeout
+        seconds. Requests started later through an old client reference fail.
+        Concurrent rotations of one subaccount create a single key. Returns
+        the new key.
+        """
+        with self._lock:
+            old_key = self._api_keys.get(account_id)
+            old_limiter = self._limiters.get(old_key)
+        new_key, created = self._new_key(account_id, replace=old_key)
+        if created and delete_old and old_key is not None:
+            if old_limiter is not None:
+                old_limiter.drain(drain_timeout)
+            self.parent.subaccounts.delete_subaccount_key(account_id, old_key)
+        return new_key
+
+    def remove(self, account_id: str, delete_key: bool = False):
+        """Forgets a subaccount, optionally uninstalling its API key."""
+        with self._lock:
+            self._clients.pop(account_id, None)
+            api_key = self._api_keys.pop(account_id, None)
+            self._limiters.pop(api_key, None)
+        if delete_key and api_key is not None:
+            if self.parent is None:
+                raise BookeoClientException(
+                    f"Cannot delete the API key of subaccount {account_id} without a parent client."
+                )
+            self.parent.subaccounts.delete_subaccount_key(account_id, api_key)
+
+    def evict_idle(self) -> int:
+        """Drops the clients unused for idle_ttl seconds; returns how many.
+
+        Idle limiters of keys without a client are dropped as well.
+        """
+        with self._lock:
+            before = len(self._clients)
+            self._evict(time.monotonic())
+            self._prune_limiters()
+            return before - len(self._clients)
+
+    def subaccounts(self) -> Iterator[BookeoSubaccount]:
+        """Lists the portal's subaccounts through the parent client."""
+        if self.parent is None:
+            raise BookeoClientException("Listing subaccounts requires a parent client.")
+        return paginate(self.parent.subaccounts.get_subaccounts, items_per_page=100)
+
+    def close(self):
+        """Drops every client and closes the session if the pool created it."""
+        with self._lock:
+            self._clients.clear()
+            self._limiters.clear()
+        if self._owns_session:
+            self.session.close()
+
+
+def _session(max_connections: int) -> "requests.Session":
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    # Every tenant talks to the same host, so one pool of max_connections
+    # sockets serves them all; requests wait for a free socket.
+    adapter = HTTPAdapter(
+        pool_connections=1, pool_maxsize=max_connections, pool_block=True
+    )
+    session.mount("https://", adapter)
+    return session
@@ -2,8 +2,59 @@ import os
 import sys
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
 
 import src
-
+import bookeo
 
 # https://docs.python-guide.org/writing/structure/ (see "test suite")
+
+
+class FakeResponse:
+    """Stands in for a requests.Response in tests."""
+
+    def __init__(self, status_code: int = 200, data=None, headers: dict = None):
+        self.status_code = status_code
+        self._data = data
+        self.headers = headers or {}
+        self.request = type("FakeRequest", (), {"url": "https://api.bookeo.com"})()
+
+    def json(self):
+        return self._data
+
+
+class FakePager:
+    """A single-page BookeoPagination stand-in for paginate()."""
+
+    page_navigation_token = None
+    current_page = 1
+    total_pages = 1
+
+
+def page(data: list, current_page: int = 1, total_pages: int = 1, token=None):
+    """JSON body of one page of a paged Bookeo response."""
+    return {
+        "data": data,
+        "info": {
+            "totalItems": len(data),
+            "totalPages": total_pages,
+            "currentPage": current_page,
+            "pageNavigationToken": token,
+        },
+    }
+
+
+def booking_data(number: str, **fields) -> dict:
+    """JSON of a minimal valid booking."""
+    data = {
+        "bookingNumber": number,
+        "title": f"Booking {number}",
+        "participants": {"numbers": []},
+        "creationTime": "2024-01-01T00:00:00Z",
+        "creationAgent": "test",
+        "productId": "P1",
+    }
+    data.update(fields)
+    return data
@@ -0,0 +1,196 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import context  # noqa: F401
+
+from bookeo.analytics import resource_utilization, seat_occupancy
+from bookeo.schemas import (
+    BookeoBooking,
+    BookeoParticipants,
+    BookeoPeopleCategory,
+    BookeoPeopleNumber,
+    BookeoResource,
+    BookeoResourceBlock,
+    BookeoSeatBlock,
+    BookeoSlot,
+)
+
+T0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _booking(product_id, hour, numbers, canceled=False):
+    participants = BookeoParticipants.model_construct(
+        numbers=[
+            BookeoPeopleNumber.model_construct(people_category_id=c, number=n)
+            for c, n in numbers
+        ]
+    )
+    return BookeoBooking.model_construct(
+        product_id=product_id,
+        start_time=T0 + timedelta(hours=hour),
+        participants=participants,
+        canceled=canceled,
+    )
+
+
+def test_seat_occupancy_matches_a_reference_count():
+    rng = random.Random(5)
+    categories = [
+        BookeoPeopleCategory.model_construct(id="adult", num_seats=1),
+        BookeoPeopleCategory.model_construct(id="family", num_seats=4),
+    ]
+    seats = {"adult": 1, "family": 4, "unknown": 1}
+    bookings, blocks, slots = [], [], []
+    for _ in range(300):
+        product_id = rng.choice(["P1", "P2", "P3"])
+        hour = rng.uniform(-5, 53)
+        numbers = [(rng.choice(list(seats)), rng.randint(0, 3)) for _ in range(2)]
+        bookings.append(_booking(product_id, hour, numbers, rng.random() < 0.1))
+        blocks.append(
+            BookeoSeatBlock.model_construct(
+                product_id=product_id,
+                start_time=T0 + timedelta(hours=rng.uniform(-5, 53)),
+                num_seats=rng.randint(1, 5),
+            )
+        )
+        slots.append(
+            BookeoSlot.model_construct(
+                product_id=product_id,
+                start_time=T0 + timedelta(hours=rng.uniform(-5, 53)),
+                num_seats_available=rng.randint(0, 10),
+            )
+        )
+
+    occupancy = seat_occupancy(
+        T0,
+        T0 + timedelta(hours=48),
+        timedelta(hours=6),
+        slots,
+        bookings,
+        blocks,
+        categories,
+        product_ids=["P1", "P2"],
+    )
+
+    def bucket(t):
+        b = int((t - T0) // timedelta(hours=6))
+        return b if 0 <= b < 8 else None
+
+    expected = {k: np.zeros((2, 8), np.int64) for k in ("booked", "blocked", "free")}
+    rows = {"P1": 0, "P2": 1}
+    for b in bookings:
+        if not b.canceled and b.product_id in rows and bucket(b.start_time) is not None:
+            total = sum(
+                seats[n.people_category_id] * n.number for n in b.participants.numbers
+            )
+            expected["booked"][rows[b.product_id], bucket(b.start_time)] += total
+    for items, kind, field in (
+        (blocks, "blocked", "num_seats"),
+        (slots, "free", "num_seats_available"),
+    ):
+        for item in items:
+            if item.product_id in rows and bucket(item.start_time) is not None:
+                expected[kind][
+                    rows[item.product_id], bucket(item.start_time)
+                ] += getattr(item, field)
+
+    assert occupancy.product_ids == ["P1", "P2"]
+    assert len(occupancy.bucket_starts) == 8
+    assert (occupancy.booked == expected["booked"]).all()
+    assert (occupancy.blocked == expected["blocked"]).all()
+    assert (occupancy.available == expected["free"]).all()
+    capacity = expected["booked"] + expected["blocked"] + expected["free"]
+    assert (occupancy.capacity == capacity).all()
+    used = occupancy.utilization
+    assert np.isnan(used[capacity == 0]).all()
+    assert np.allclose(
+        used[capacity > 0],
+        ((expected["booked"] + expected["blocked"]) / np.maximum(capacity, 1))[
+            capacity > 0
+        ],
+    )
+
+
+def test_seat_occupancy_finds_products_and_rejects_empty_buckets():
+    occupancy = seat_occupancy(
+        T0,
+        T0 + timedelta(hours=1),
+        timedelta(hours=1),
+        bookings=[_booking("P2", 0, [("x", 2)]), _booking(None, 0, [("x", 1)])],
+    )
+    assert occupancy.product_ids == ["P2"]
+    assert occupancy.booked.tolist() == [[2]]
+    with pytest.raises(ValueError):
+        seat_occupancy(T0, T0 + timedelta(hours=1), timedelta(0))
+
+
+def _resources(ids):
+    return [BookeoResource.model_construct(id=r) for r in ids]
+
+
+def test_resource_utilization_matches_minute_by_minute_coverage():
+    rng = random.Random(9)
+    minutes = 6 * 60
+    bookings, blocks = [], []
+    covered = {"booking": {}, "block": {}}
+    for i in range(120):
+        start = rng.randrange(-60, minutes + 30)
+        length = rng.randrange(0, 90)
+        resource_ids = rng.sample(["r1", "r2", "r3"], rng.randint(1, 2))
+        kind = rng.choice(["booking", "block"])
+        canceled = kind == "booking" and rng.random() < 0.1
+        fields = dict(
+            start_time=T0 + timedelta(minutes=start),
+            end_time=T0 + timedelta(minutes=start + length),
+            resources=_resources(resource_ids),
+        )
+        if kind == "booking":
+            bookings.append(BookeoBooking.model_construct(canceled=canceled, **fields))
+        else:
+            blocks.append(BookeoResourceBlock.model_construct(**fields))
+        if not canceled:
+            for r in resource_ids:
+                covered[kind].setdefault(r, set()).update(
+                    m for m in range(start, start + length) if 0 <= m < minutes
+                )
+
+    result = resource_utilization(
+        T0,
+        T0 + timedelta(minutes=minutes),
+        timedelta(hours=1),
+        resources=_resources(["r0", "r1"]),
+        resource_blocks=blocks,
+        bookings=bookings,
+    )
+    assert result.resource_ids[:2] == ["r0", "r1"]
+    assert sorted(result.resource_ids) == ["r0", "r1", "r2", "r3"]
+    for row, r in enumerate(result.resource_ids):
+        busy = covered["booking"].get(r, set())
+        blocked = covered["block"].get(r, set()) - busy
+        for b in range(6):
+            hour = set(range(b * 60, (b + 1) * 60))
+            assert result.busy[row, b] == 60 * len(hour & busy)
+            assert result.blocked[row, b] == 60 * len(hour & blocked)
+            assert result.idle[row, b] == 60 * len(hour - busy - blocked)
+    assert (result.busy[0] == 0).all() and (result.idle[0] == 3600).all()
+    open_time = result.busy + result.idle
+    assert np.isnan(result.utilization[open_time == 0]).all()
+
+
+def test_resource_utilization_partial_last_bucket():
+    booking = BookeoBooking.model_construct(
+        canceled=False,
+        start_time=T0 + timedelta(minutes=80),
+        end_time=T0 + timedelta(minutes=200),
+        resources=_resources(["r1"]),
+    )
+    result = resource_utilization(
+        T0, T0 + timedelta(minutes=90), timedelta(hours=1), bookings=[booking]
+    )
+    assert result.busy.tolist() == [[0, 600]]
+    assert result.idle.tolist() == [[3600, 1200]]
+    assert result.utilization.tolist() == [[0.0, 600 / 1800]]
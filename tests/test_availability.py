@@ -0,0 +1,61 @@
+from datetime import datetime, timezone
+
+from context import FakeResponse, page
+
+from bookeo.client import BookeoClient
+from bookeo.ratelimit import BookeoRateLimiter
+from bookeo.request import BookeoRequest
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+END = datetime(2024, 1, 2, tzinfo=timezone.utc)
+
+
+def _slot(event_id: str, start: str, seats: int = 1) -> dict:
+    return {
+        "eventId": event_id,
+        "startTime": start,
+        "endTime": start.replace("T10", "T11"),
+        "numSeatsAvailable": seats,
+    }
+
+
+SLOTS = {
+    "P1": [_slot("e1", "2024-01-01T10:00:00Z"), _slot("e2", "2024-01-01T10:00:00Z", 2)],
+    "P2": [_slot("e3", "2024-01-01T10:00:00Z", 4)],
+}
+
+
+def _send(request):
+    product_id = request.params["productId"]
+    if product_id not in SLOTS:
+        return FakeResponse(status_code=500)
+    return FakeResponse(data=page(SLOTS[product_id], token="token"))
+
+
+def test_timeline_keeps_every_slot_and_reports_failures(monkeypatch):
+    monkeypatch.setattr(BookeoRequest, "_send", _send)
+    availability = BookeoClient("secret", "key").availability
+    timeline, failures = availability.multi_product_availability(
+        ["P1", "missing", "P2"], START, END
+    )
+    assert len(timeline) == 1
+    assert timeline[0].seats == {"P1": 3, "P2": 4}
+    assert [s.event_id for s in timeline[0].slots["P1"]] == ["e1", "e2"]
+    assert [(f.index, f.item, f.ok) for f in failures] == [(1, "missing", False)]
+
+
+def test_requests_are_throttled_only_with_a_limiter(monkeypatch):
+    entered = []
+
+    class Limiter(BookeoRateLimiter):
+        def __enter__(self):
+            entered.append(True)
+            return super().__enter__()
+
+    monkeypatch.setattr(BookeoRequest, "_send", _send)
+    client = BookeoClient("secret", "key")
+    assert client.rate_limiter is None
+    client.availability.product_availability_info("P1", START, END)
+    client = BookeoClient("secret", "key", rate_limiter=Limiter())
+    client.availability.product_availability_info("P1", START, END)
+    assert entered == [True]
@@ -0,0 +1,71 @@
+import os
+
+from context import FakePager, booking_data
+
+from bookeo.bulk import BookeoBulkBookingJob
+from bookeo.schemas import BookeoBooking
+
+
+class FakeBookings:
+    def __init__(self, numbers, failing=()):
+        self.bookings = [BookeoBooking(**booking_data(n)) for n in numbers]
+        self.failing = set(failing)
+        self.canceled = []
+
+    def get_bookings(self, **kwargs):
+        return (self.bookings, FakePager())
+
+    def cancel_booking(self, booking_number, **kwargs):
+        if booking_number in self.failing:
+            raise RuntimeError(f"cannot cancel {booking_number}")
+        self.canceled.append((booking_number, kwargs))
+
+
+def test_interrupted_job_resumes_from_its_progress_log(tmp_path):
+    path = str(tmp_path / "job.json")
+    api = FakeBookings(["1", "2", "3", "4"], failing={"3"})
+    job = BookeoBulkBookingJob(api, state_path=path)
+    assert len(job.select(product_id="P1")) == 4
+
+    dry = job.cancel(dry_run=True, notify_customer=False)
+    assert [r.value for r in dry] == [{"notify_customer": False}] * 4
+    assert api.canceled == []
+
+    results = job.cancel(notify_customer=False)
+    assert [(r.item.booking_number, r.ok) for r in results] == [
+        ("1", True),
+        ("2", True),
+        ("3", False),
+        ("4", True),
+    ]
+    # A line cut short by an interruption is ignored on resume.
+    with open(f"{path}.progress", "a") as f:
+        f.write('{"booking_number": "3", "err')
+
+    api.failing = set()
+    api.canceled = []
+    resumed = BookeoBulkBookingJob(api, state_path=path)
+    assert sorted(resumed.bookings) == ["1", "2", "3", "4"]
+    assert resumed.done == {"1", "2", "4"}
+    assert resumed.errors == {"3": "cannot cancel 3"}
+    assert [b.booking_number for b in resumed.pending()] == ["3"]
+    progress = []
+    resumed.cancel(progress=lambda done, total, result: progress.append((done, total)))
+    assert [n for n, _ in api.canceled] == ["3"]
+    assert progress == [(1, 1)]
+    assert resumed.pending() == []
+    assert resumed.errors == {}
+
+    # A new selection starts over.
+    resumed.select(product_id="P1")
+    assert len(resumed.pending()) == 4
+    assert not os.path.exists(f"{path}.progress")
+
+
+def test_job_without_state_keeps_progress_in_memory():
+    api = FakeBookings(["1", "2"], failing={"2"})
+    job = BookeoBulkBookingJob(api)
+    job.select()
+    job.cancel()
+    assert job.done == {"1"}
+    assert [b.booking_number for b in job.pending()] == ["2"]
@@ -0,0 +1,189 @@
+import threading
+import time
+
+import pytest
+from context import FakeResponse, page
+
+from bookeo.cache import BookeoSettingsCache
+from bookeo.client import BookeoClient
+from bookeo.request import BookeoRequest
+
+
+class Fetcher:
+    """Counts calls and returns successive values, optionally slowly."""
+
+    def __init__(self, value="v", delay=0.0):
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        time.sleep(self.delay)
+        with self._lock:
+            self.calls += 1
+            return f"{self.value}{self.calls}"
+
+
+def _cache(**kwargs):
+    return BookeoSettingsCache(ttls={"products": 0.1}, **kwargs)
+
+
+def test_fresh_entries_are_served_from_memory():
+    cache = _cache()
+    fetch = Fetcher()
+    assert cache.get("ns/products", fetch) == "v1"
+    assert cache.get("ns/products", fetch) == "v1"
+    assert fetch.calls == 1
+    # Keys of other items do not share the entry.
+    assert cache.get("ns/products/lang=fr", fetch) == "v2"
+
+
+def test_parse_runs_once_per_fetch():
+    cache = _cache()
+    parsed = []
+    parse = lambda raw: parsed.append(raw) or raw.upper()
+    assert cache.get("ns/products", Fetcher(), parse) == "V1"
+    assert cache.get("ns/products", Fetcher(), parse) == "V1"
+    assert parsed == ["v1"]
+
+
+def test_stale_entries_are_served_while_refreshing():
+    cache = _cache(stale_ttl=10)
+    assert cache.get("ns/products", Fetcher()) == "v1"
+    time.sleep(0.15)
+    slow = Fetcher("new", delay=0.1)
+    started = time.monotonic()
+    assert cache.get("ns/products", slow) == "v1"
+    assert time.monotonic() - started < 0.05
+    # Further stale reads join the refresh already running.
+    assert cache.get("ns/products", slow) == "v1"
+    time.sleep(0.2)
+    assert slow.calls == 1
+    assert cache.get("ns/products", slow) == "new1"
+
+
+def test_expired_entries_are_refetched():
+    cache = _cache(stale_ttl=0.05)
+    fetch = Fetcher()
+    assert cache.get("ns/products", fetch) == "v1"
+    time.sleep(0.2)
+    assert cache.get("ns/products", fetch) == "v2"
+
+
+def test_force_and_invalidate_refetch():
+    cache = _cache()
+    fetch = Fetcher()
+    cache.get("ns/products", fetch)
+    assert cache.get("ns/products", fetch, force=True) == "v2"
+    cache.get("other/products", fetch)
+    cache.invalidate("ns/")
+    assert cache.get("ns/products", fetch) == "v4"
+    assert cache.get("other/products", fetch) == "v3"
+
+
+def test_concurrent_misses_share_one_fetch():
+    cache = _cache()
+    fetch = Fetcher(delay=0.1)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get("ns/products", fetch)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert fetch.calls == 1
+    assert results == ["v1"] * 8
+
+
+def test_failed_fetch_is_not_cached():
+    cache = _cache()
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        cache.get("ns/products", fail)
+    assert cache.get("ns/products", Fetcher()) == "v1"
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = _cache(max_entries=2)
+    fetch = Fetcher()
+    cache.get("ns/products/a", fetch)
+    cache.get("ns/products/b", fetch)
+    cache.get("ns/products/a", fetch)
+    cache.get("ns/products/c", fetch)
+    assert fetch.calls == 3
+    assert cache.get("ns/products/a", fetch) == "v1"
+    assert cache.get("ns/products/b", fetch) == "v4"
+
+
+def test_processes_share_entries_and_one_refresh(tmp_path):
+    path = str(tmp_path / "settings.db")
+    first, second = _cache(path=path), _cache(path=path)
+    slow = Fetcher("first", delay=0.3)
+    other = Fetcher("second")
+    thread = threading.Thread(target=lambda: first.get("ns/products", slow))
+    thread.start()
+    time.sleep(0.1)
+    # The second cache waits for the lease holder's result instead of fetching.
+    assert second.get("ns/products", other) == "first1"
+    thread.join()
+    assert (slow.calls, other.calls) == (1, 0)
+
+    # A fresh cache on the same path starts from the stored entry.
+    assert _cache(path=path).get("ns/products", other) == "first1"
+    assert other.calls == 0
+
+
+def _product(id: str) -> dict:
+    return {
+        "name": f"Product {id}",
+        "productId": id,
+        "productCode": id,
+        "bookingLimits": [{"min": 1, "max": 10}],
+        "duration": {"days": 0, "hours": 1, "minutes": 0},
+        "type": "fixed",
+        "membersOnly": False,
+        "prepaidOnly": False,
+        "acceptDeny": False,
+        "apiBookingsAllowed": True,
+        "dropInOnly": False,
+    }
+
+
+def test_product_listing_caches_the_list_not_the_pages(monkeypatch):
+    sent = []
+
+    def send(request):
+        sent.append(dict(request.params))
+        page_number = request.params.get("pageNumber") or 1
+        return FakeResponse(
+            data=page(
+                [_product(f"P{page_number}")],
+                current_page=page_number,
+                total_pages=3,
+                token="token",
+            )
+        )
+
+    monkeypatch.setattr(BookeoRequest, "_send", send)
+    cache = _cache()
+    settings = BookeoClient("secret", "key", settings_cache=cache).settings
+
+    products = settings.all_products()
+    assert [p.product_id for p in products] == ["P1", "P2", "P3"]
+    assert [p.get("pageNavigationToken") for p in sent] == [None, "token", "token"]
+    assert [p.product_id for p in settings.all_products()] == ["P1", "P2", "P3"]
+    assert len(sent) == 3
+    assert len(cache._entries) == 1
+    assert all("token" not in key for key in cache._entries)
+
+    # Single pages always go to the server.
+    settings.get_products(nav_token="token", page_number=2)
+    settings.get_products(nav_token="token", page_number=2)
+    assert len(sent) == 5
+    assert len(cache._entries) == 1
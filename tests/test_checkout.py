@@ -0,0 +1,168 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import context  # noqa: F401
+
+from bookeo.checkout import BookeoCheckout
+from bookeo.schemas import (
+    BookeoBooking,
+    BookeoCustomer,
+    BookeoHold,
+    BookeoMatchingSlot,
+    BookeoParticipants,
+    BookeoPeopleNumber,
+)
+
+T0 = datetime(2024, 1, 1, 10, tzinfo=timezone.utc)
+PARTICIPANTS = BookeoParticipants(
+    numbers=[BookeoPeopleNumber(peopleCategoryId="Cadults", number=2)]
+)
+
+
+class FakeClient:
+    """Records the calls of a checkout; delays and failures are per call."""
+
+    def __init__(self, delays=None, fail_booking=False, customers=()):
+        self.delays = delays or {}
+        self.fail_booking = fail_booking
+        self.known_customers = list(customers)
+        self.calls = []
+        self.deleted = []
+        self.availability = self.holds = self.bookings = self.customers = self
+
+    def _call(self, name, **kwargs):
+        self.calls.append((name, kwargs))
+        time.sleep(self.delays.get(name, 0))
+
+    def search_open_slots(self, product_id, start_time, end_time, numbers, **kwargs):
+        self._call("search", product_id=product_id)
+        slot = BookeoMatchingSlot.model_construct(
+            event_id="e1", start_time=T0, end_time=T0 + timedelta(hours=1)
+        )
+        return ([slot], "search", None)
+
+    def create_hold(self, product_id, **kwargs):
+        self._call("hold", **kwargs)
+        return ("/holds/h1", BookeoHold.model_construct(id="h1"))
+
+    def delete_hold(self, hold_id):
+        self.deleted.append(hold_id)
+
+    def create_booking(self, product_id, **kwargs):
+        self._call("booking", **kwargs)
+        if self.fail_booking:
+            raise RuntimeError("booking failed")
+        return ("/bookings/1", BookeoBooking.model_construct(booking_number="1"))
+
+    def get_customers(self, **kwargs):
+        self._call("get_customers", **kwargs)
+        return (self.known_customers, None)
+
+    def create_new_customer(self, customer):
+        self._call("create_customer")
+        return ("/customers/new", BookeoCustomer.model_construct(id="new"))
+
+
+def _checkout(client, **kwargs):
+    return BookeoCheckout(client, **kwargs)
+
+
+def _stages(client):
+    return [name for name, _ in client.calls]
+
+
+def test_checkout_books_the_held_slot():
+    client = FakeClient()
+    checkout = _checkout(client)
+    result = checkout.checkout(
+        "P1", T0, T0 + timedelta(days=1), PARTICIPANTS, source="web", title="Mine"
+    )
+    assert result.location == "/bookings/1"
+    assert _stages(client) == ["search", "hold", "booking"]
+    hold_args, booking_args = client.calls[1][1], client.calls[2][1]
+    assert hold_args["event_id"] == booking_args["event_id"] == "e1"
+    assert booking_args["previous_hold_id"] == "h1"
+    assert booking_args["title"] == "Mine"
+    assert client.deleted == []
+    stats = checkout.stats()
+    assert stats["booking"]["failures"] == 0
+    checkout.close()
+
+
+def test_existing_customer_is_booked_by_id():
+    known = BookeoCustomer.model_construct(id="c7", email_address="ann@example.com")
+    client = FakeClient(customers=[known], delays={"get_customers": 0.1})
+    checkout = _checkout(client)
+    customer = BookeoCustomer.model_construct(email_address=" Ann@Example.com ")
+    result = checkout.checkout(
+        "P1", T0, T0 + timedelta(days=1), PARTICIPANTS, customer=customer
+    )
+    assert result.customer_id == "c7"
+    booking_args = dict(client.calls)["booking"]
+    assert booking_args["customer_id"] == "c7"
+    assert booking_args["customer"] is None
+    assert "create_customer" not in _stages(client)
+    checkout.close()
+
+
+def test_failed_booking_releases_the_hold():
+    client = FakeClient(fail_booking=True)
+    checkout = _checkout(client)
+    with pytest.raises(RuntimeError):
+        checkout.checkout("P1", T0, T0 + timedelta(days=1), PARTICIPANTS)
+    checkout.close()
+    assert client.deleted == ["h1"]
+    assert checkout.failures["booking"] == 1
+
+
+def test_late_hold_is_released_after_its_timeout():
+    client = FakeClient(delays={"hold": 0.3})
+    checkout = _checkout(client, timeouts={"hold": 0.1})
+    with pytest.raises(TimeoutError):
+        checkout.checkout("P1", T0, T0 + timedelta(days=1), PARTICIPANTS)
+    checkout.close()
+    assert client.deleted == ["h1"]
+    assert checkout.failures["hold"] == 1
+
+
+def test_queued_time_does_not_count_against_stage_timeouts():
+    client = FakeClient(delays={"search": 0.05})
+    checkout = _checkout(client, timeouts={"search": 0.2}, max_workers=1)
+    busy = threading.Event()
+    # Another checkout's stage occupies the only worker for longer than the
+    # search timeout.
+    checkout._executor.submit(lambda: (busy.set(), time.sleep(0.4)))
+    busy.wait()
+    result = checkout.checkout("P1", T0, T0 + timedelta(days=1), PARTICIPANTS)
+    assert result.location == "/bookings/1"
+    assert checkout.failures["search"] == 0
+    assert checkout.latencies["search"].summary()["max"] < 0.2
+    checkout.close()
+
+
+def test_checkout_many_reports_each_result():
+    client = FakeClient()
+    checkout = _checkout(client, max_workers=2)
+    results = list(
+        checkout.checkout_many(
+            [
+                {
+                    "product_id": "P1",
+                    "start_time": T0,
+                    "end_time": T0,
+                    "participants": PARTICIPANTS,
+                },
+                {
+                    "product_id": "P2",
+                    "start_time": T0,
+                    "end_time": T0,
+                    "participants": None,
+                },
+            ]
+        )
+    )
+    checkout.close()
+    assert [(r.index, r.ok) for r in results] == [(0, True), (1, False)]
+    assert isinstance(results[1].error, TypeError)
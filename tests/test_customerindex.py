@@ -0,0 +1,70 @@
+import random
+
+from context import FakePager
+
+from bookeo.customers import BookeoCustomers
+from bookeo.customerindex import BookeoCustomerIndex
+from bookeo.schemas import BookeoCustomer
+
+
+def customer(id: str, first_name: str, last_name: str) -> BookeoCustomer:
+    return BookeoCustomer.model_construct(
+        id=id, first_name=first_name, last_name=last_name
+    )
+
+
+NAMES = ["ada", "adam", "alan", "bea", "ben", "cleo", "dora", "eve", "zoe"]
+
+
+def random_customers(rng: random.Random, count: int) -> list[BookeoCustomer]:
+    return [
+        customer(f"C{rng.randrange(count // 2)}", rng.choice(NAMES), f"x{i % 7}")
+        for i in range(count)
+    ]
+
+
+def test_update_sorts_new_words_once_and_matches_upserts():
+    rng = random.Random(7)
+    customers = random_customers(rng, 200)
+    bulk = BookeoCustomerIndex()
+    bulk.upsert(customer("C0", "zed", "old"))
+    bulk.update(customers)
+    incremental = BookeoCustomerIndex()
+    incremental.upsert(customer("C0", "zed", "old"))
+    for c in customers:
+        incremental.upsert(c)
+    assert bulk._sorted_words == sorted(bulk._words)
+    assert bulk._sorted_words == incremental._sorted_words
+    assert bulk._new_words is None
+    for query in ["a", "ad", "be x3", "zed", "old"]:
+        assert [c.id for c in bulk.search(query, limit=500)] == [
+            c.id for c in incremental.search(query, limit=500)
+        ]
+
+
+def test_remove_after_update_keeps_the_word_list_consistent():
+    index = BookeoCustomerIndex()
+    index.update([customer("C1", "ada", "lovelace"), customer("C2", "alan", "turing")])
+    index.remove("C1")
+    index.upsert(customer("C2", "alan", "kay"))
+    assert index._sorted_words == ["alan", "kay"]
+    assert [c.id for c in index.search("al")] == ["C2"]
+
+
+class FakeCustomers(BookeoCustomers):
+    def __init__(self, customers: list[BookeoCustomer]):
+        self.customers = customers
+
+    def get_customers(self, **kwargs):
+        return (self.customers, FakePager())
+
+
+def test_sync_indexes_every_customer():
+    customers = [customer(f"C{i}", NAMES[i % len(NAMES)], f"n{i}") for i in range(50)]
+    index = BookeoCustomerIndex(FakeCustomers(customers))
+    assert index.sync(full=True) == 50
+    assert len(index) == 50
+    assert index._sorted_words == sorted(index._words)
+    assert {c.id for c in index.search("n4")} == {"C4"} | {
+        f"C{i}" for i in range(40, 50)
+    }
@@ -0,0 +1,40 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+import context  # noqa: F401
+
+from bookeo.encoding import BookeoFragment, _dumps, compact, encode_body
+from bookeo.schemas import BookeoParticipants, BookeoPeopleNumber, BookeoProductType
+
+
+def _reference(data) -> bytes:
+    return _dumps(compact(data)).encode("utf-8")
+
+
+def test_fragments_encode_like_their_values():
+    participants = BookeoParticipants(
+        numbers=[BookeoPeopleNumber(peopleCategoryId="Cadults", number=2)]
+    )
+    shared = BookeoFragment(participants)
+    bodies = [
+        {"participants": shared, "productId": "P1", "note": None},
+        {
+            "items": [shared, {"x": shared, "y": [1, None]}],
+            "type": BookeoProductType.Fixed,
+        },
+        [shared, "é", datetime(2024, 1, 2, 3, 4, tzinfo=timezone.utc)],
+        shared,
+        {"plain": [1, 2.5, True, None, {"a": None}]},
+    ]
+    for body in bodies:
+        assert encode_body(body) == _reference(body)
+        json.loads(encode_body(body))
+    assert json.loads(shared.json) == {
+        "numbers": [{"peopleCategoryId": "Cadults", "number": 2}]
+    }
+
+
+def test_unknown_types_are_rejected():
+    with pytest.raises(TypeError):
+        encode_body({"x": object()})
@@ -0,0 +1,188 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import context  # noqa: F401
+
+from bookeo import holdmanager
+from bookeo.holdmanager import BookeoHoldManager, _TimerWheel
+from bookeo.request import BookeoRequestException
+from bookeo.schemas import BookeoHold
+
+
+class FakeClock:
+    """Stands in for the time module in bookeo.holdmanager."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(holdmanager, "time", clock)
+    return clock
+
+
+class FakeHolds:
+    """Creates holds lasting lifetime seconds; failures are raised in order first."""
+
+    def __init__(self, lifetime=60, failures=()):
+        self.lifetime = lifetime
+        self.failures = list(failures)
+        self.created = []
+        self.deleted = []
+        self._lock = threading.Lock()
+
+    def create_hold(self, **kwargs):
+        with self._lock:
+            self.created.append(kwargs)
+            if len(self.created) > 1 and self.failures:
+                raise self.failures.pop(0)
+            hold = BookeoHold.model_construct(
+                id=f"h{len(self.created)}",
+                expiration=datetime.now(timezone.utc)
+                + timedelta(seconds=self.lifetime),
+            )
+        return (f"/holds/{hold.id}", hold)
+
+    def delete_hold(self, hold_id):
+        self.deleted.append(hold_id)
+
+
+def _eventually(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.005)
+
+
+def _manager(holds, **kwargs):
+    return BookeoHoldManager(holds, tick=0.01, **kwargs)
+
+
+def test_timer_wheel_orders_deadlines(clock):
+    wheel = _TimerWheel(1.0, 8)
+    wheel.schedule("a", 3)
+    wheel.schedule("b", 10)  # more than one revolution away
+    wheel.schedule("c", 3.5)
+    wheel.schedule("d", -5)  # already due
+    wheel.schedule("e", 6)
+    wheel.cancel("e")
+    assert len(wheel) == 4
+    assert wheel.advance(1) == ["d"]
+    assert wheel.advance(2) == []
+    assert wheel.advance(3) == ["a"]
+    assert wheel.advance(4) == ["c"]
+    assert wheel.advance(9) == []
+    assert wheel.advance(10) == ["b"]
+    assert len(wheel) == 0
+
+
+def test_timer_wheel_reschedules_items(clock):
+    wheel = _TimerWheel(1.0, 8)
+    wheel.schedule("a", 2)
+    wheel.schedule("a", 5)
+    assert wheel.advance(4) == []
+    assert wheel.advance(5) == ["a"]
+
+
+def test_holds_are_renewed_before_they_expire(clock):
+    holds = FakeHolds(lifetime=60)
+    manager = _manager(holds, renew_before=30)
+    managed = manager.create(product_id="P1", previous_hold_id="ignored")
+    assert managed.hold_id == "h1"
+    clock.now = 29
+    time.sleep(0.05)
+    assert len(holds.created) == 1
+
+    clock.now = 31
+    _eventually(lambda: managed.hold_id == "h2")
+    assert holds.created[1] == {"product_id": "P1", "previous_hold_id": "h1"}
+    # The renewed hold is scheduled again from its own expiration.
+    managed.touch()
+    clock.now = 59
+    time.sleep(0.05)
+    assert len(holds.created) == 2
+    clock.now = 62
+    _eventually(lambda: managed.hold_id == "h3")
+    assert managed.complete() == "h3"
+    assert len(manager) == 0
+    manager.close()
+    assert holds.deleted == []
+
+
+def test_abandoned_holds_are_released(clock):
+    holds = FakeHolds(lifetime=60)
+    manager = _manager(holds, renew_before=30, abandon_after=10)
+    managed = manager.create(product_id="P1")
+    clock.now = 31
+    _eventually(lambda: not managed.active)
+    assert holds.deleted == ["h1"]
+    assert len(holds.created) == 1
+    assert len(manager) == 0
+    manager.close()
+
+
+def test_transient_failures_are_retried_with_backoff(clock):
+    unavailable = BookeoRequestException("Unavailable", status_code=503)
+    holds = FakeHolds(lifetime=60, failures=[unavailable, TimeoutError()])
+    manager = _manager(holds, renew_before=30, retry_backoff=1)
+    managed = manager.create(product_id="P1")
+    clock.now = 31
+    _eventually(lambda: len(holds.created) == 2)
+    assert managed.active and managed.error is unavailable
+    clock.now = 31.5
+    time.sleep(0.05)
+    assert len(holds.created) == 2
+    clock.now = 32.1
+    _eventually(lambda: len(holds.created) == 3)
+    assert isinstance(managed.error, TimeoutError)
+    # The second retry waits twice as long.
+    clock.now = 33
+    time.sleep(0.05)
+    assert len(holds.created) == 3
+    clock.now = 34.2
+    _eventually(lambda: managed.hold_id == "h4")
+    assert managed.active and managed.error is None
+    manager.close()
+
+
+def test_definitive_failures_stop_tracking(clock):
+    rejected = BookeoRequestException("Bad request", status_code=400)
+    holds = FakeHolds(lifetime=60, failures=[rejected])
+    manager = _manager(holds, renew_before=30)
+    managed = manager.create(product_id="P1")
+    clock.now = 31
+    _eventually(lambda: not managed.active)
+    assert managed.error is rejected
+    assert len(manager) == 0
+    manager.close()
+
+
+def test_retries_stop_when_the_hold_would_expire_first(clock):
+    unavailable = BookeoRequestException("Unavailable", status_code=503)
+    holds = FakeHolds(lifetime=60, failures=[unavailable])
+    manager = _manager(holds, renew_before=30, retry_backoff=120)
+    managed = manager.create(product_id="P1")
+    clock.now = 31
+    _eventually(lambda: not managed.active)
+    assert managed.error is unavailable
+    assert len(holds.created) == 2
+    manager.close()
+
+
+def test_close_can_release_every_hold(clock):
+    holds = FakeHolds()
+    manager = _manager(holds)
+    first = manager.create(product_id="P1")
+    second = manager.create(product_id="P2")
+    second.release()
+    manager.close(release=True)
+    assert holds.deleted == ["h2", "h1"]
+    assert not first.active
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta, timezone
+
+import context  # noqa: F401
+
+from bookeo.cache import BookeoLRUCache
+from bookeo.hydration import BookeoCustomerHydrator
+from bookeo.schemas import BookeoBooking, BookeoCustomer, BookeoPagination
+
+T0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _booking(number, customer_id, with_customer=False):
+    customer = BookeoCustomer.model_construct(id=customer_id) if with_customer else None
+    return BookeoBooking.model_construct(
+        booking_number=number,
+        customer_id=customer_id,
+        customer=customer,
+        product_id="P1",
+        start_time=T0 + timedelta(hours=int(number)),
+        canceled=False,
+    )
+
+
+class FakeClient:
+    """Serves the re-query from pages of expanded bookings."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.searches = []
+        self.fetched = []
+        self.bookings = self.customers = self
+
+    def get_bookings(self, page_number=1, **kwargs):
+        self.searches.append(page_number)
+        pager = BookeoPagination.model_construct(
+            total_items=len(self.pages) * 100,
+            total_pages=len(self.pages),
+            current_page=page_number,
+            page_navigation_token="token",
+        )
+        return (self.pages[page_number - 1], pager)
+
+    def get_customer(self, id):
+        self.fetched.append(id)
+        return BookeoCustomer.model_construct(id=id)
+
+
+BOOKINGS = [_booking(str(i), f"c{i}") for i in range(1, 6)]
+
+
+def test_customers_come_from_a_cheap_requery():
+    expanded = [_booking(str(i), f"c{i}", with_customer=True) for i in range(1, 6)]
+    client = FakeClient([expanded[:3], expanded[3:]])
+    hydrated = BookeoCustomerHydrator(client).hydrate(BOOKINGS)
+    assert [b.customer.id for b in hydrated] == ["c1", "c2", "c3", "c4", "c5"]
+    assert client.searches == [1, 2]
+    assert client.fetched == []
+
+
+def test_requery_stops_when_the_period_holds_many_other_bookings():
+    others = [_booking("9", "other", with_customer=True)]
+    first = [_booking("1", "c1", with_customer=True)] + others
+    client = FakeClient([first] + [others] * 40)
+    hydrated = BookeoCustomerHydrator(client).hydrate(BOOKINGS)
+    assert [b.customer.id for b in hydrated] == ["c1", "c2", "c3", "c4", "c5"]
+    # One page revealed 40 pages; fetching the four others is cheaper.
+    assert client.searches == [1]
+    assert client.fetched == ["c2", "c3", "c4", "c5"]
+
+
+def test_cached_and_present_customers_need_no_requests():
+    cache = BookeoLRUCache()
+    for i in range(1, 5):
+        cache.put(f"c{i}", BookeoCustomer.model_construct(id=f"c{i}"))
+    client = FakeClient([[]])
+    bookings = BOOKINGS[:4] + [_booking("5", "c5", with_customer=True)]
+    hydrated = BookeoCustomerHydrator(client, cache=cache).hydrate(bookings)
+    assert [b.customer.id for b in hydrated] == ["c1", "c2", "c3", "c4", "c5"]
+    assert client.searches == client.fetched == []
@@ -0,0 +1,179 @@
+import threading
+import time
+
+import pytest
+from context import FakePager, booking_data
+
+from bookeo.idempotency import BookeoIdempotencyStore, BookeoIdempotentBookings
+from bookeo.request import BookeoRequestException
+from bookeo.schemas import BookeoBooking
+
+
+class FakeBookings:
+    """Records create_booking calls; failures are raised in order, then bookings made."""
+
+    def __init__(self, failures=(), delay=0.0, lands=False, timeout=10):
+        self.client = type("FakeClient", (), {"timeout": timeout})()
+        self.failures = list(failures)
+        self.delay = delay
+        # Whether a failed request still created the booking.
+        self.lands = lands
+        self.created = []
+        self.lookups = 0
+        self._lock = threading.Lock()
+
+    def create_booking(self, **kwargs):
+        time.sleep(self.delay)
+        with self._lock:
+            booking = BookeoBooking(
+                **booking_data(
+                    str(len(self.created) + 1), externalRef=kwargs["external_ref"]
+                )
+            )
+            if self.failures:
+                error = self.failures.pop(0)
+                if self.lands:
+                    self.created.append(booking)
+                raise error
+            self.created.append(booking)
+        return (f"/bookings/{booking.booking_number}", booking)
+
+    def get_bookings(self, **kwargs):
+        self.lookups += 1
+        return (list(self.created), FakePager())
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BookeoIdempotencyStore(str(tmp_path / "requests.db"))
+
+
+def test_books_once_per_key(store):
+    bookings = FakeBookings()
+    idempotent = BookeoIdempotentBookings(bookings, store)
+    location, booking = idempotent.create_booking(external_ref="ref1", product_id="P1")
+    assert location == "/bookings/1"
+    assert booking.external_ref == "ref1"
+
+    # A completed key returns the recorded booking without a request.
+    again = idempotent.create_booking(external_ref="ref1", product_id="P1")
+    assert again == (location, booking)
+    assert len(bookings.created) == 1
+    assert bookings.lookups == 0
+
+
+def test_key_and_product_are_required(store):
+    idempotent = BookeoIdempotentBookings(FakeBookings(), store)
+    with pytest.raises(TypeError):
+        idempotent.create_booking(product_id="P1")
+    with pytest.raises(TypeError):
+        idempotent.create_booking(external_ref="ref1")
+
+
+def test_lease_must_outlast_the_client_timeout(store):
+    with pytest.raises(ValueError):
+        BookeoIdempotentBookings(FakeBookings(timeout=None), store)
+    with pytest.raises(ValueError):
+        BookeoIdempotentBookings(FakeBookings(timeout=120), store, lease=120)
+    BookeoIdempotentBookings(FakeBookings(timeout=30), store, lease=120)
+
+
+def test_concurrent_callers_wait_for_the_lease(store):
+    bookings = FakeBookings(delay=0.2, timeout=1)
+    idempotent = BookeoIdempotentBookings(bookings, store, lease=5, poll_interval=0.02)
+    results = []
+
+    def book():
+        results.append(idempotent.create_booking(idempotency_key="k", product_id="P1"))
+
+    threads = [threading.Thread(target=book) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(bookings.created) == 1
+    assert {booking.booking_number for _, booking in results} == {"1"}
+
+
+def test_expired_lease_looks_up_before_sending(store):
+    bookings = FakeBookings()
+    # A caller that recorded the key and then died after its booking went through.
+    state, _, _, _ = store.begin("k", "dead", lease=0.01)
+    assert state == "new"
+    bookings.created.append(BookeoBooking(**booking_data("7", externalRef="k")))
+    time.sleep(0.02)
+
+    idempotent = BookeoIdempotentBookings(bookings, store)
+    location, booking = idempotent.create_booking(idempotency_key="k", product_id="P1")
+    assert (location, booking.booking_number) == (None, "7")
+    assert len(bookings.created) == 1
+    assert bookings.lookups == 1
+    assert store.begin("k", "other", lease=1)[0] == "completed"
+
+
+def test_pending_key_is_not_taken_over(store):
+    assert store.begin("k", "a", lease=60)[0] == "new"
+    assert store.begin("k", "b", lease=60)[0] == "pending"
+    assert store.begin("k", "a", lease=60)[0] == "expired"
+    assert store.renew("k", "a", lease=60)
+    assert not store.renew("k", "b", lease=60)
+
+
+def test_ambiguous_failure_looks_up_before_retrying(store):
+    # The first request timed out at the server but created the booking.
+    bookings = FakeBookings(
+        failures=[BookeoRequestException("Bad gateway", status_code=502)], lands=True
+    )
+    idempotent = BookeoIdempotentBookings(bookings, store)
+    location, booking = idempotent.create_booking(idempotency_key="k", product_id="P1")
+    assert location is None
+    assert booking.booking_number == "1"
+    assert len(bookings.created) == 1
+    assert bookings.lookups == 1
+
+
+def test_ambiguous_failure_retries_when_not_found(store):
+    bookings = FakeBookings(
+        failures=[BookeoRequestException("Unavailable", status_code=503)]
+    )
+    idempotent = BookeoIdempotentBookings(bookings, store)
+    location, _ = idempotent.create_booking(idempotency_key="k", product_id="P1")
+    assert location == "/bookings/1"
+    assert len(bookings.created) == 1
+    assert bookings.lookups == 1
+
+
+def test_retries_are_bounded(store):
+    error = BookeoRequestException("Unavailable", status_code=503)
+    bookings = FakeBookings(failures=[error] * 5)
+    idempotent = BookeoIdempotentBookings(bookings, store, retries=2)
+    with pytest.raises(BookeoRequestException):
+        idempotent.create_booking(idempotency_key="k", product_id="P1")
+    assert len(bookings.failures) == 2
+    # The outcome is unknown, so the key stays pending for later callers.
+    assert store.begin("k", "other", lease=1)[0] == "pending"
+
+
+@pytest.mark.parametrize(
+    "error",
+    [KeyError("Location"), ValueError("invalid booking"), RuntimeError("hook failed")],
+)
+def test_errors_after_the_request_keep_the_key(store, error):
+    # The booking was created, then reading the response failed.
+    bookings = FakeBookings(failures=[error], lands=True)
+    idempotent = BookeoIdempotentBookings(bookings, store)
+    location, booking = idempotent.create_booking(idempotency_key="k", product_id="P1")
+    assert (location, booking.booking_number) == (None, "1")
+    assert len(bookings.created) == 1
+    assert bookings.lookups == 1
+
+
+def test_definitive_failure_forgets_the_key(store):
+    bookings = FakeBookings(
+        failures=[BookeoRequestException("Bad request", status_code=400)]
+    )
+    idempotent = BookeoIdempotentBookings(bookings, store)
+    with pytest.raises(BookeoRequestException):
+        idempotent.create_booking(idempotency_key="k", product_id="P1")
+    assert bookings.lookups == 0
+    assert store.begin("k", "other", lease=1)[0] == "new"
@@ -0,0 +1,67 @@
+import random
+
+import context  # noqa: F401
+
+from bookeo.intervals import BookeoIntervalIndex
+
+
+def _brute_overlapping(intervals, start, end, min_weight=None):
+    return sorted(
+        key
+        for key, (s, e, w) in intervals.items()
+        if s < end
+        and (e > start or s == start)
+        and (min_weight is None or w >= min_weight)
+    )
+
+
+def test_interval_index_matches_brute_force():
+    rng = random.Random(7)
+    index = BookeoIntervalIndex()
+    intervals = {}
+    for step in range(3000):
+        key = rng.randrange(400)
+        if key in intervals and rng.random() < 0.3:
+            index.remove(key)
+            del intervals[key]
+        else:
+            start = rng.uniform(0, 10000)
+            end = start + rng.choice([0, rng.uniform(0, 50), rng.uniform(0, 500)])
+            weight = rng.randrange(10)
+            index.add(key, start, end, value=key, weight=weight)
+            intervals[key] = (start, end, weight)
+        if step % 10 == 0:
+            start = rng.uniform(-100, 10100)
+            end = start + rng.uniform(1, 300)
+            min_weight = rng.choice([None, 0, 5, 9])
+            assert sorted(
+                index.overlapping(start, end, min_weight)
+            ) == _brute_overlapping(intervals, start, end, min_weight)
+    assert len(index) == len(intervals)
+
+
+def test_interval_index_next_after():
+    index = BookeoIntervalIndex()
+    for key, (start, weight) in enumerate([(10, 1), (20, 5), (30, 2)]):
+        index.add(key, start, start + 5, value=key, weight=weight)
+    assert index.next_after(0) == 0
+    assert index.next_after(11) == 1
+    assert index.next_after(11, min_weight=3) == 1
+    assert index.next_after(21, min_weight=3) is None
+    assert index.next_after(31) is None
+
+
+def test_interval_index_long_intervals():
+    index = BookeoIntervalIndex()
+    index.add("long", 0, 1000, value="long")
+    for i in range(100):
+        index.add(i, i * 10, i * 10 + 5, value=i)
+    assert index.overlapping(502, 503) == ["long", 50]
+    assert index.overlapping(500, 500.5) == ["long", 50]
+    index.remove("long")
+    assert index.overlapping(502, 503) == [50]
+    assert index.overlapping(506, 509) == []
+    # A zero-length interval overlaps a window starting at it.
+    index.add("point", 506, 506, value="point")
+    assert index.overlapping(506, 509) == ["point"]
+    assert index.overlapping(505, 506) == []
@@ -0,0 +1,129 @@
+import random
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import context  # noqa: F401
+
+from bookeo.money import (
+    BookeoMoneyColumn,
+    currency_exponent,
+    from_minor_units,
+    payments_by_day,
+    payments_by_method,
+    tax_breakdown,
+    to_minor_units,
+)
+from bookeo.schemas import (
+    BookeoMoney,
+    BookeoPayment,
+    BookeoPaymentMethod,
+    BookeoPrice,
+    BookeoPriceTax,
+)
+
+
+def _money(amount: str, currency: str = "USD") -> BookeoMoney:
+    return BookeoMoney.model_construct(amount=amount, currency=currency)
+
+
+def test_currency_exponent():
+    assert currency_exponent("USD") == 2
+    assert currency_exponent("JPY") == 0
+    assert currency_exponent("BHD") == 3
+
+
+def test_minor_units_round_trip():
+    assert to_minor_units("12.34", 2) == 1234
+    assert to_minor_units("12.3", 2) == 1230
+    assert to_minor_units("12", 2) == 1200
+    assert to_minor_units("-0.05", 2) == -5
+    assert to_minor_units("12.340", 2) == 1234
+    assert to_minor_units("1500", 0) == 1500
+    assert from_minor_units(1234, 2) == Decimal("12.34")
+    assert from_minor_units(-5, 2) == Decimal("-0.05")
+    assert from_minor_units(1500, 0) == Decimal("1500")
+
+
+def test_minor_units_reject_extra_precision():
+    with pytest.raises(ValueError):
+        to_minor_units("0.005", 2)
+    with pytest.raises(ValueError):
+        to_minor_units("1.5", 0)
+
+
+def test_totals_match_decimal_reference():
+    rng = random.Random(11)
+    amounts = []
+    for _ in range(20000):
+        currency = rng.choice(["USD", "EUR", "JPY", "BHD"])
+        exponent = {"USD": 2, "EUR": 2, "JPY": 0, "BHD": 3}[currency]
+        minor = rng.randint(-(10**6), 10**8)
+        amount = str(Decimal(minor).scaleb(-exponent))
+        amounts.append(_money(amount, currency))
+    # Many small amounts that drift in binary floating point.
+    amounts.extend(_money("0.10") for _ in range(1000))
+
+    expected = {}
+    for money in amounts:
+        expected[money.currency] = expected.get(money.currency, 0) + Decimal(
+            money.amount
+        )
+    totals = BookeoMoneyColumn.from_money(amounts).totals()
+    assert totals == expected
+    assert str(totals["JPY"]) == str(totals["JPY"].to_integral_value())
+
+
+def test_sum_by_never_mixes_currencies():
+    column = BookeoMoneyColumn.from_money(
+        [_money("1.10"), _money("2.20", "EUR"), _money("3.30"), _money("0.01")]
+    )
+    assert column.sum_by(["a", "a", "a", "b"]) == {
+        ("a", "USD"): Decimal("4.40"),
+        ("a", "EUR"): Decimal("2.20"),
+        ("b", "USD"): Decimal("0.01"),
+    }
+    assert BookeoMoneyColumn.from_money([]).sum_by([]) == {}
+
+
+def test_payment_groupings():
+    received = datetime(2024, 3, 1, 23, 30, tzinfo=timezone.utc)
+    payments = [
+        BookeoPayment.model_construct(
+            amount=_money(amount),
+            payment_method=method,
+            received_time=received + timedelta(hours=hours),
+        )
+        for amount, method, hours in [
+            ("10.00", BookeoPaymentMethod.CreditCard, 0),
+            ("0.10", BookeoPaymentMethod.CreditCard, 1),
+            ("5.05", BookeoPaymentMethod.Cash, 1),
+        ]
+    ]
+    by_method = payments_by_method(payments)
+    assert by_method[(BookeoPaymentMethod.CreditCard.value, "USD")] == Decimal("10.10")
+    assert by_method[(BookeoPaymentMethod.Cash.value, "USD")] == Decimal("5.05")
+    by_day = payments_by_day(payments)
+    assert by_day == {
+        (received.date(), "USD"): Decimal("10.00"),
+        (received.date() + timedelta(days=1), "USD"): Decimal("5.15"),
+    }
+
+
+def test_tax_breakdown():
+    def price(*taxes):
+        return BookeoPrice.model_construct(
+            taxes=[
+                BookeoPriceTax.model_construct(tax_id=tax_id, amount=_money(amount))
+                for tax_id, amount in taxes
+            ]
+        )
+
+    prices = [price(("vat", "0.10"), ("city", "0.20")), price(("vat", "0.20")), price()]
+    assert tax_breakdown(prices) == {
+        ("vat", "USD"): Decimal("0.30"),
+        ("city", "USD"): Decimal("0.20"),
+    }
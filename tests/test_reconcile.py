@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import context  # noqa: F401
+from context import FakePager
+
+from bookeo.reconcile import BookeoPaymentReconciler
+from bookeo.schemas import BookeoBooking, BookeoMoney, BookeoPayment, BookeoPrice
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+END = START + timedelta(days=70)
+BEFORE = START - timedelta(days=3)
+DURING = START + timedelta(days=40)
+
+
+def _money(amount: str) -> BookeoMoney:
+    return BookeoMoney.model_construct(amount=amount, currency="USD")
+
+
+def _payment(id, amount, customer_id, received_time=DURING):
+    return BookeoPayment.model_construct(
+        id=id,
+        amount=_money(amount),
+        customer_id=customer_id,
+        received_time=received_time,
+    )
+
+
+def _booking(number, customer_id, gross, paid, canceled=False):
+    price = BookeoPrice.model_construct(
+        total_gross=_money(gross), total_paid=_money(paid)
+    )
+    return BookeoBooking.model_construct(
+        booking_number=number, customer_id=customer_id, price=price, canceled=canceled
+    )
+
+
+class FakeClient:
+    def __init__(self, received, bookings, listed):
+        self.received = received
+        self.booking_list = bookings
+        self.listed = listed
+        self.payment_windows = []
+        self.booking_windows = []
+        self.lists = []
+        self.payments = self.bookings = self
+
+    def get_payments_received(self, start_time, end_time, **kwargs):
+        self.payment_windows.append((start_time, end_time))
+        # Everything is received in the second window.
+        found = self.received if start_time <= DURING < end_time else []
+        return (found, FakePager())
+
+    def get_bookings(self, last_updated_start_time, last_updated_end_time, **kwargs):
+        self.booking_windows.append((last_updated_start_time, last_updated_end_time))
+        found = self.booking_list if last_updated_start_time == START else []
+        return (found, FakePager())
+
+    def get_received_payments(self, booking_number, **kwargs):
+        self.lists.append(booking_number)
+        return (self.listed.get(booking_number, []), FakePager())
+
+
+def test_reconcile_matches_lists_and_suggests():
+    received = [
+        _payment("pA", "100.00", "c1"),
+        _payment("pB1", "100.00", "c2"),
+        _payment("pX", "50.00", "c2"),
+        _payment("pG1", "100.00", "c4"),
+    ]
+    bookings = [
+        # Paid by its customer's only payment of that amount: not listed.
+        _booking("A", "c1", "100.00", "100.00"),
+        # Partly paid before the period; 50 outstanding.
+        _booking("B", "c2", "200.00", "150.00"),
+        # A payment received in the period but missing from the payments.
+        _booking("C", "c3", "80.00", "80.00"),
+        # Canceled after being paid.
+        _booking("D", "c5", "30.00", "30.00", canceled=True),
+        # total_paid disagrees with its payments.
+        _booking("E", "c6", "60.00", "60.00"),
+        # Looks paid by pG1, which turns out to be G's.
+        _booking("F", "c4", "100.00", "100.00"),
+        _booking("G", "c4", "150.00", "150.00"),
+        _booking("unpaid", "c7", "10.00", "0"),
+    ]
+    listed = {
+        "B": [_payment("pB1", "100.00", "c2"), _payment("pB0", "50.00", "c2", BEFORE)],
+        "C": [_payment("pC", "80.00", "c3")],
+        "D": [_payment("pD", "30.00", "c5", BEFORE)],
+        "E": [_payment("pE", "40.00", "c6", BEFORE)],
+        "F": [_payment("pF", "100.00", "c4", BEFORE)],
+        "G": [_payment("pG1", "100.00", "c4"), _payment("pG0", "50.00", "c4", BEFORE)],
+    }
+    client = FakeClient(received, bookings, listed)
+    result = BookeoPaymentReconciler(client, max_workers=2).reconcile(START, END)
+
+    assert len(client.payment_windows) == len(client.booking_windows) == 3
+    assert all(e - s <= timedelta(days=31) for s, e in client.payment_windows)
+    assert sorted(client.lists) == ["B", "C", "D", "E", "F", "G"]
+    assert result.matched == {"pA": "A", "pB1": "B", "pG1": "G"}
+    assert [p.id for p in result.unmatched_payments] == ["pX"]
+    assert [(n, p.id) for n, p in result.missing_payments] == [("C", "pC")]
+    assert [b.booking_number for b in result.paid_mismatch] == ["E"]
+    assert [b.booking_number for b in result.overpaid] == ["D"]
+    assert [(b.booking_number, b.balance) for b in result.underpaid] == [
+        ("B", Decimal("50.00")),
+        ("unpaid", Decimal("10.00")),
+    ]
+    assert result.suggestions == [("pX", "B")]
+
+
+def test_reconcile_lists_bookings_sharing_an_amount():
+    received = [_payment("p1", "20.00", "c1")]
+    bookings = [
+        _booking("A", "c1", "20.00", "20.00"),
+        _booking("B", "c1", "20.00", "20.00"),
+    ]
+    listed = {"B": [_payment("p1", "20.00", "c1")]}
+    client = FakeClient(received, bookings, listed)
+    result = BookeoPaymentReconciler(client).reconcile(START, END, bookings=bookings)
+    assert sorted(client.lists) == ["A", "B"]
+    assert client.booking_windows == []
+    assert result.matched == {"p1": "B"}
+    assert [b.booking_number for b in result.paid_mismatch] == ["A"]
@@ -0,0 +1,187 @@
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from context import FakePager
+
+from bookeo.resourceindex import BookeoResourceConflictException, BookeoResourceIndex
+from bookeo.schemas import BookeoBooking, BookeoResource, BookeoResourceBlock
+
+T0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _resource(id: str) -> BookeoResource:
+    return BookeoResource.model_construct(id=id)
+
+
+def _block(id, start, hours, resource_ids):
+    return BookeoResourceBlock.model_construct(
+        id=id,
+        start_time=T0 + timedelta(hours=start),
+        end_time=T0 + timedelta(hours=start + hours),
+        resources=[_resource(r) for r in resource_ids],
+    )
+
+
+def _booking(number, start, hours, resource_ids, canceled=False):
+    return BookeoBooking.model_construct(
+        booking_number=number,
+        start_time=T0 + timedelta(hours=start),
+        end_time=T0 + timedelta(hours=start + hours),
+        resources=[_resource(r) for r in resource_ids],
+        canceled=canceled,
+    )
+
+
+def test_resource_index_conflicts_match_brute_force():
+    rng = random.Random(3)
+    index = BookeoResourceIndex()
+    items = {}
+    for i in range(500):
+        start, hours = rng.uniform(0, 1000), rng.uniform(0, 12)
+        resource_ids = rng.sample(["r1", "r2", "r3", "r4"], rng.randint(1, 2))
+        if rng.random() < 0.5:
+            index.add_block(_block(str(i), start, hours, resource_ids))
+            items[("block", str(i))] = (start, start + hours, resource_ids)
+        else:
+            canceled = rng.random() < 0.1
+            index.add_booking(_booking(str(i), start, hours, resource_ids, canceled))
+            if not canceled:
+                items[("booking", str(i))] = (start, start + hours, resource_ids)
+    for _ in range(200):
+        start = rng.uniform(0, 1000)
+        end = start + rng.uniform(0.1, 24)
+        found = index.conflicts(
+            [_resource("r1"), _resource("r3")],
+            T0 + timedelta(hours=start),
+            T0 + timedelta(hours=end),
+        )
+        expected = sorted(
+            (r, kind, id)
+            for (kind, id), (s, e, resource_ids) in items.items()
+            for r in ("r1", "r3")
+            if r in resource_ids and s < end and e > start
+        )
+        assert sorted((c.resource_id, c.kind, c.id) for c in found) == expected
+
+
+def test_resource_index_load_splits_into_windows():
+    calls = []
+
+    class Blocks:
+        def get_resource_blocks(self, start_time, end_time, **kwargs):
+            calls.append((start_time, end_time))
+            blocks = [_block("b1", 1, 2, ["r1"])] if start_time == T0 else []
+            return (blocks, FakePager())
+
+    class Bookings:
+        def get_bookings(self, start_time, end_time, **kwargs):
+            return ([], FakePager())
+
+    class Client:
+        resourceblocks = Blocks()
+        bookings = Bookings()
+
+    index = BookeoResourceIndex(Client())
+    index.load(T0, T0 + timedelta(days=70))
+    assert len(calls) == 3
+    assert all(end - start <= timedelta(days=31) for start, end in calls)
+    assert len(index) == 1
+
+
+def test_resource_index_create_block_checks_and_webhooks_are_safe():
+    created = []
+
+    class Blocks:
+        def create_new_resource_block(self, start_time, end_time, resources, reason):
+            block = BookeoResourceBlock.model_construct(
+                id=f"new{len(created)}",
+                start_time=start_time,
+                end_time=end_time,
+                resources=resources,
+            )
+            created.append(block)
+            return ("location", block)
+
+    class Client:
+        resourceblocks = Blocks()
+
+    index = BookeoResourceIndex(Client())
+    index.add_booking(_booking("1", 0, 2, ["r1"]))
+    with pytest.raises(BookeoResourceConflictException) as e:
+        index.create_block(T0, T0 + timedelta(hours=1), [_resource("r1")])
+    assert [c.id for c in e.value.conflicts] == ["1"]
+
+    # Concurrent creates of the same period: only one passes the check.
+    errors = []
+
+    def create():
+        try:
+            index.create_block(
+                T0 + timedelta(hours=5), T0 + timedelta(hours=6), [_resource("r2")]
+            )
+        except BookeoResourceConflictException as e:
+            errors.append(e)
+
+    def webhooks():
+        for i in range(200):
+            index.handle_webhook(
+                {"domain": "bookings", "type": "deleted", "itemId": str(i)}
+            )
+
+    threads = [threading.Thread(target=create) for _ in range(4)]
+    threads.append(threading.Thread(target=webhooks))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(created) == 1
+    assert len(errors) == 3
+
+
+def test_resource_index_queries_run_during_create_requests():
+    started, release = threading.Event(), threading.Event()
+
+    class Blocks:
+        fail = False
+
+        def create_new_resource_block(self, start_time, end_time, resources, reason):
+            started.set()
+            release.wait(5)
+            if self.fail:
+                raise RuntimeError("request failed")
+            block = BookeoResourceBlock.model_construct(
+                id="new", start_time=start_time, end_time=end_time, resources=resources
+            )
+            return ("location", block)
+
+    class Client:
+        resourceblocks = Blocks()
+
+    index = BookeoResourceIndex(Client())
+    period = (T0, T0 + timedelta(hours=1))
+    thread = threading.Thread(
+        target=lambda: index.create_block(*period, [_resource("r1")])
+    )
+    thread.start()
+    assert started.wait(5)
+    # The lock is free while the request runs, and the period is reserved.
+    found = index.conflicts([_resource("r1")], *period)
+    assert [c.kind for c in found] == ["pending"]
+    with pytest.raises(BookeoResourceConflictException):
+        index.create_block(*period, [_resource("r1")])
+    release.set()
+    thread.join()
+    assert [(c.kind, c.id) for c in index.conflicts([_resource("r1")], *period)] == [
+        ("block", "new")
+    ]
+
+    # A failed request releases its reservation.
+    Client.resourceblocks.fail = True
+    with pytest.raises(RuntimeError):
+        index.create_block(
+            T0 + timedelta(hours=3), T0 + timedelta(hours=4), [_resource("r2")]
+        )
+    assert index.conflicts([_resource("r2")], T0, T0 + timedelta(days=1)) == []
+    assert len(index) == 1
@@ -0,0 +1,155 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import context  # noqa: F401
+
+from bookeo import slotsearch
+from bookeo.schemas import (
+    BookeoBookingOption,
+    BookeoMatchingSlot,
+    BookeoPagination,
+    BookeoPeopleNumber,
+    BookeoResource,
+)
+from bookeo.slotsearch import BookeoSlotSearch, BookeoSlotSearches, search_key
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+END = START + timedelta(days=7)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+
+def slot(hour: int) -> BookeoMatchingSlot:
+    start = START + timedelta(hours=hour)
+    return BookeoMatchingSlot.model_construct(
+        event_id=f"E{hour}", start_time=start, end_time=start + timedelta(hours=1)
+    )
+
+
+class FakeAvailability:
+    """Serves searches over a list of hours that can change between searches."""
+
+    def __init__(self, hours: list[int], per_page: int = 2):
+        self.hours = hours
+        self.per_page = per_page
+        self.searches = {}
+        self.started = 0
+
+    def _pager(self, token: str, page_number: int) -> BookeoPagination:
+        hours = self.searches[token]
+        return BookeoPagination.model_construct(
+            total_items=len(hours),
+            total_pages=-(-len(hours) // self.per_page),
+            current_page=page_number,
+            page_navigation_token=token,
+        )
+
+    def _slots(self, token: str, page_number: int) -> list[BookeoMatchingSlot]:
+        first = (page_number - 1) * self.per_page
+        return [slot(h) for h in self.searches[token][first : first + self.per_page]]
+
+    def search_open_slots(self, **kwargs):
+        self.started += 1
+        token = f"token{self.started}"
+        self.searches[token] = list(self.hours)
+        return (self._slots(token, 1), token, self._pager(token, 1))
+
+    def nav_slot_search(self, nav_token, page_number):
+        return (
+            self._slots(nav_token, page_number),
+            self._pager(nav_token, page_number),
+        )
+
+
+def _search(availability, token_ttl=600):
+    return BookeoSlotSearch(
+        availability,
+        token_ttl,
+        "P1",
+        START,
+        END,
+        [BookeoPeopleNumber(peopleCategoryId="Cadults", number=2)],
+    )
+
+
+def test_key_covers_every_option_and_resource_field():
+    people = [BookeoPeopleNumber(peopleCategoryId="Cadults", number=2)]
+    base = search_key("P1", START, END, people)
+    same = search_key(
+        "P1",
+        START,
+        END,
+        people + [BookeoPeopleNumber(peopleCategoryId="Cchildren", number=0)],
+    )
+    assert base == same
+
+    def with_options(*options):
+        return search_key("P1", START, END, people, options)
+
+    a = BookeoBookingOption(name="Lunch", value="yes")
+    b = BookeoBookingOption(name="Dinner", value="yes")
+    assert with_options(a) != with_options(b)
+    assert with_options(a, b) == with_options(b, a)
+    assert with_options(a) != base
+
+    room1 = BookeoResource(id="R1", name="Room")
+    room2 = BookeoResource(id="R2", name="Room")
+    assert search_key("P1", START, END, people, (), [room1]) != search_key(
+        "P1", START, END, people, (), [room2]
+    )
+    assert search_key("P1", START, END, people, mode="a") != base
+    assert search_key("P1", START, END, people, items_per_page=5) != base
+
+
+def test_pages_are_fetched_lazily_and_kept():
+    availability = FakeAvailability(list(range(5)))
+    search = _search(availability)
+    assert [s.event_id for s in search.page(2)] == ["E2", "E3"]
+    assert search.page(2) is search.page(2)
+    assert search.total_pages == 3
+    assert len(search) == 5
+    with pytest.raises(IndexError):
+        search.page(4)
+    assert [s.event_id for s in search] == [f"E{h}" for h in range(5)]
+    assert availability.started == 1
+
+
+def test_iteration_restarts_when_the_token_is_refreshed(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(slotsearch, "time", clock)
+    availability = FakeAvailability([0, 1, 2, 3, 4, 5])
+    search = _search(availability, token_ttl=10)
+    found = []
+    for s in search:
+        found.append(s.event_id)
+        if s.event_id == "E1":
+            # Slot 0 gets booked and slot 9 opens while the token expires.
+            availability.hours = [1, 2, 3, 4, 5, 9]
+            clock.now = 10
+    assert availability.started == 2
+    # Nothing is yielded twice and no slot of the new search is skipped.
+    assert found == ["E0", "E1", "E2", "E3", "E4", "E5", "E9"]
+
+
+def test_searches_are_shared_until_they_expire(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(slotsearch, "time", clock)
+    availability = FakeAvailability([0, 1, 2])
+    searches = BookeoSlotSearches(availability, token_ttl=10)
+    people = [BookeoPeopleNumber(peopleCategoryId="Cadults", number=2)]
+    first = searches.search("P1", START, END, people)
+    first.page(1)
+    assert searches.search("P1", START, END, people) is first
+    other = searches.search(
+        "P1", START, END, people, [BookeoBookingOption(name="Lunch", value="yes")]
+    )
+    assert other is not first
+    clock.now = 10
+    assert searches.search("P1", START, END, people) is not first
@@ -0,0 +1,216 @@
+import threading
+import time
+
+import pytest
+from context import FakePager
+
+from bookeo.client import BookeoClientException
+from bookeo.ratelimit import BookeoRateLimiter
+from bookeo.tenants import BookeoClientPool
+
+
+class FakeSession:
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSubaccounts:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.created = []
+        self.deleted = []
+        self._lock = threading.Lock()
+
+    def create_new_subaccount_key(self, id):
+        time.sleep(self.delay)
+        with self._lock:
+            self.created.append(id)
+            key = f"{id}-key{len(self.created)}"
+        return f"https://api.bookeo.com/v2/subaccounts/{id}/apikeys/{key}"
+
+    def delete_subaccount_key(self, account_id, api_key):
+        self.deleted.append((account_id, api_key))
+
+    def get_subaccounts(self, **kwargs):
+        return (["a", "b"], FakePager())
+
+
+class FakeParent:
+    def __init__(self, delay=0.0):
+        self.subaccounts = FakeSubaccounts(delay)
+
+
+def _pool(**kwargs):
+    return BookeoClientPool("secret", session=FakeSession(), **kwargs)
+
+
+def _run(target, count):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def test_known_keys_need_no_parent():
+    pool = _pool(api_keys={"a": "key-a"})
+    client = pool.client("a")
+    assert client.query_dict()["apiKey"] == "key-a"
+    assert pool["a"] is client
+    assert client.session is pool.session
+    with pytest.raises(BookeoClientException):
+        pool.client("b")
+    with pytest.raises(TypeError):
+        pool.client(None)
+
+
+def test_concurrent_callers_create_one_key():
+    parent = FakeParent(delay=0.1)
+    pool = _pool(parent=parent)
+    clients = []
+    _run(lambda: clients.append(pool.client("a")), 8)
+    assert parent.subaccounts.created == ["a"]
+    assert len({id(c) for c in clients}) == 1
+    assert pool.api_keys == {"a": "a-key1"}
+
+
+def test_failed_creation_is_raised_to_every_waiter():
+    class Failing(FakeSubaccounts):
+        def create_new_subaccount_key(self, id):
+            time.sleep(0.1)
+            raise BookeoClientException("boom")
+
+    parent = FakeParent()
+    parent.subaccounts = Failing()
+    pool = _pool(parent=parent)
+    errors = []
+
+    def get():
+        try:
+            pool.client("a")
+        except BookeoClientException as e:
+            errors.append(e)
+
+    _run(get, 4)
+    assert len(errors) == 4
+    # Nothing is left in flight, so a later call tries again.
+    parent.subaccounts = FakeSubaccounts()
+    assert pool.client("a").query_dict()["apiKey"] == "a-key1"
+
+
+def test_least_recently_used_clients_are_evicted():
+    pool = _pool(api_keys={k: f"key-{k}" for k in "abc"}, max_tenants=2)
+    a = pool.client("a")
+    pool.client("b")
+    pool.client("a")
+    pool.client("c")
+    assert "b" not in pool
+    assert len(pool) == 2
+    assert pool.client("a") is a
+
+
+def test_idle_clients_are_evicted():
+    pool = _pool(api_keys={"a": "key-a", "b": "key-b"}, idle_ttl=0.05)
+    pool.client("a")
+    pool.client("b")
+    time.sleep(0.1)
+    assert pool.evict_idle() == 2
+    assert len(pool) == 0
+
+
+def _slow_limiter():
+    return BookeoRateLimiter(requests_per_second=0.1, burst=5)
+
+
+def test_rebuilt_clients_keep_their_rate_limiter():
+    pool = _pool(
+        api_keys={"a": "key-a", "b": "key-b"},
+        max_tenants=1,
+        rate_limiter_factory=_slow_limiter,
+    )
+    limiter = pool.client("a").rate_limiter
+    # A limiter with tokens spent still holds budget, so it is kept.
+    with limiter:
+        pass
+    pool.client("b")
+    assert "a" not in pool
+    assert pool.client("a").rate_limiter is limiter
+    assert pool.client("b").rate_limiter is not limiter
+
+
+def test_idle_limiters_of_evicted_clients_are_dropped():
+    keys = {k: f"key-{k}" for k in "abc"}
+    pool = _pool(api_keys=keys, max_tenants=1, rate_limiter_factory=_slow_limiter)
+    for account_id in "abc":
+        pool.client(account_id)
+    assert set(pool._limiters) == {"key-c"}
+    with pool.client("c").rate_limiter:
+        pool.client("a")
+    assert set(pool._limiters) == {"key-a", "key-c"}
+
+
+def test_rotation_creates_and_deletes_one_key():
+    parent = FakeParent(delay=0.1)
+    pool = _pool(api_keys={"a": "old"}, parent=parent)
+    old_client = pool.client("a")
+    keys = []
+    _run(lambda: keys.append(pool.rotate_key("a")), 3)
+    assert keys == ["a-key1"] * 3
+    assert parent.subaccounts.deleted == [("a", "old")]
+    new_client = pool.client("a")
+    assert new_client is not old_client
+    assert new_client.query_dict()["apiKey"] == "a-key1"
+    assert new_client.rate_limiter is not old_client.rate_limiter
+
+
+def test_rotation_waits_for_requests_in_flight():
+    parent = FakeParent()
+    pool = _pool(api_keys={"a": "old"}, parent=parent)
+    limiter = pool.client("a").rate_limiter
+    limiter.acquire()
+    rotation = threading.Thread(target=pool.rotate_key, args=("a",))
+    rotation.start()
+    time.sleep(0.1)
+    assert parent.subaccounts.created == ["a"]
+    assert parent.subaccounts.deleted == []
+    limiter.release()
+    rotation.join()
+    assert parent.subaccounts.deleted == [("a", "old")]
+
+
+def test_rotation_gives_up_waiting_after_drain_timeout():
+    parent = FakeParent()
+    pool = _pool(api_keys={"a": "old"}, parent=parent)
+    pool.client("a").rate_limiter.acquire()
+    assert pool.rotate_key("a", drain_timeout=0.05) == "a-key1"
+    assert parent.subaccounts.deleted == [("a", "old")]
+
+
+def test_set_key_and_remove():
+    parent = FakeParent()
+    pool = _pool(api_keys={"a": "key-a"}, parent=parent)
+    client = pool.client("a")
+    pool.set_key("a", "key-a")
+    assert pool.client("a") is client
+    pool.set_key("a", "key-b")
+    assert pool.client("a").query_dict()["apiKey"] == "key-b"
+    pool.remove("a", delete_key=True)
+    assert "a" not in pool
+    assert parent.subaccounts.deleted == [("a", "key-b")]
+
+
+def test_close_only_closes_an_owned_session():
+    session = FakeSession()
+    pool = BookeoClientPool("secret", api_keys={"a": "key-a"}, session=session)
+    pool.client("a")
+    pool.close()
+    assert len(pool) == 0
+    assert not session.closed
+
+
+def test_subaccounts_require_a_parent():
+    with pytest.raises(BookeoClientException):
+        _pool().subaccounts()
+    assert list(_pool(parent=FakeParent()).subaccounts()) == ["a", "b"]